@@ -1,5 +1,41 @@
-from .client import Client
-from .deposits import Deposits
-from .withdrawals import Withdrawals
-from .metadata import Metadata
 from ._types import *
+
+# public classes are imported on first access, so importing the package does not load requests,
+# socketio or aiohttp until something that needs them is used
+lazy_exports = {
+    "Client": ".client",
+    "AsyncClient": ".async_client",
+    "Deposits": ".deposits",
+    "Withdrawals": ".withdrawals",
+    "Metadata": ".metadata",
+    "MarketBook": ".market",
+    "Metrics": ".metrics",
+    "Sniper": ".sniper",
+    "Rule": ".sniper",
+    "ClientPool": ".pool",
+    "MarketSnapshot": ".columnar",
+}
+
+
+def __getattr__(name):
+    if name in lazy_exports:
+        from importlib import import_module
+        value = getattr(import_module(lazy_exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(lazy_exports))
+
+
+def patch_gevent():
+    """
+    Applies gevent's monkey patching, which the library no longer does on import.
+
+    Call it before anything else is imported, including the rest of this package, when running the
+    blocking Client under gevent.
+    """
+    from gevent import monkey
+    monkey.patch_all()
@@ -1,5 +1,6 @@
+from .model import Model
 from .meta import Meta
-from .deposit import Deposit
+from .deposit import Deposit, AsyncDeposit
 from .withdrawal import Withdrawal
 from .item import Item
 from .user import User
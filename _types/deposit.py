@@ -1,54 +1,60 @@
-import requests
-from .exceptions import handle_error
-from os import environ as env
-from json import dumps
+from .model import Model
 
 
-class Deposit(dict):
-    def __init__(self, api_key, api_base_url, *args, **kwargs):
-        super(Deposit, self).__init__(*args, **kwargs)
-        self.__dict__ = self
-        self.api_key = api_key
-        self.api_base_url = api_base_url
-        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+class Deposit(Model):
+    fields = (
+        "id", "asset_id", "item_id", "market_name", "market_value", "suggested_price", "custom_price_percentage",
+        "tradable", "tradelock", "invalid", "icon_url", "name_color", "preview_id", "wear", "stickers",
+        "is_commodity", "price_is_unreliable", "status", "status_message", "total_value", "item",
+        "created_at", "updated_at"
+    )
+    # transport and inventory are shared client state held by reference and are not part of the item data
+    __slots__ = fields + ("transport", "inventory")
 
-    def __getattr__(self, attr):
-        return self[attr]
+    def __init__(self, transport, data=None, inventory=None, **kwargs):
+        self.transport = transport
+        # the InventoryCache invalidated once the item is listed, cancelled or sold, if any
+        self.inventory = inventory
+        super().__init__(data, **kwargs)
 
-    def cancel(self):
-        url = f"{self.api_base_url}trading/deposits/{self.id}/cancel"
-        response = requests.post(url, headers=self.headers)
-
-        status = response.status_code
-        response = response.json()
+    def invalidate_inventory(self):
+        if self.inventory is not None:
+            self.inventory.invalidate()
 
-        if status == 200:
-            return True
-        else:
-            handle_error(status, response, "Deposit", "cancel")
+    def cancel(self):
+        self.transport.post(f"trading/deposits/{self.id}/cancel", "Deposit", "cancel")
+        self.invalidate_inventory()
+        return True
 
     def sell_now(self):
-        url = f"{self.api_base_url}trading/deposits/{self.id}/sell"
-        response = requests.post(url, headers=self.headers)
-
-        status = response.status_code
-        response = response.json()
-
-        if status == 200:
-            return True
-        else:
-            handle_error(status, response, "Deposit", "sell_now")
+        self.transport.post(f"trading/deposits/{self.id}/sell", "Deposit", "sell_now")
+        self.invalidate_inventory()
+        return True
 
     def list_item(self, percentage):
-        url = self.api_base_url+"trading/deposit"
         coin_value = round(self.market_value * (percentage/100+1))
-        params = dumps({"items": [{"id": self.id, "custom_price_percentage": percentage, "coin_value": coin_value}]})
-        response = requests.post(url, headers=self.headers, data=params)
+        data = {"items": [{"id": self.id, "custom_price_percentage": percentage, "coin_value": coin_value}]}
+        self.transport.post("trading/deposit", "Deposit", "list_item", data=data, budget="listing")
+        self.invalidate_inventory()
+        return True
 
-        status = response.status_code
-        response = response.json()
 
-        if status == 200:
-            return True
-        else:
-            handle_error(status, response, "Deposit", "list_item")
+class AsyncDeposit(Deposit):
+    __slots__ = ()
+
+    async def cancel(self):
+        await self.transport.post(f"trading/deposits/{self.id}/cancel", "Deposit", "cancel")
+        self.invalidate_inventory()
+        return True
+
+    async def sell_now(self):
+        await self.transport.post(f"trading/deposits/{self.id}/sell", "Deposit", "sell_now")
+        self.invalidate_inventory()
+        return True
+
+    async def list_item(self, percentage):
+        coin_value = round(self.market_value * (percentage/100+1))
+        data = {"items": [{"id": self.id, "custom_price_percentage": percentage, "coin_value": coin_value}]}
+        await self.transport.post("trading/deposit", "Deposit", "list_item", data=data, budget="listing")
+        self.invalidate_inventory()
+        return True
@@ -16,12 +16,16 @@ class ApiKeyMissing(CustomError):
 
 class InvalidApiKey(CustomError):
     sys.tracebacklimit = 0
-    def __init__(self):
-        super().__init__("Invalid token provided, please generate a token at https://csgoempire.com/trading/apikey")
+    def __init__(self, message=None):
+        # handle_error passes the API's message for a 401, the client raises it without one
+        super().__init__(message or "Invalid token provided, please generate a token at https://csgoempire.com/trading/apikey")
 
 
 class RequestError(CustomError):
-    pass
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        # the HTTP status the API answered with, None when raised by the library itself
+        self.status = status
 
 
 class InvalidDomain(CustomError):
@@ -31,13 +35,22 @@ class InvalidDomain(CustomError):
 
 class ExceedsRatelimit(CustomError):
     sys.tracebacklimit = 0
-    pass
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
-def handle_error(status, response, class_name, function_name):
+def handle_error(status, response, class_name, function_name, retry_after=None):
     exception_mapping = {
         401: InvalidApiKey,
         429: ExceedsRatelimit
     }
     exception_class = exception_mapping.get(status, RequestError)
-    raise exception_class(f"{class_name}:{function_name}:{status}: {response['message']}")
+    # error bodies may be empty or lack a message, e.g. from a proxy in front of the API
+    detail = response.get("message") if isinstance(response, dict) else None
+    message = f"{class_name}:{function_name}:{status}: {detail if detail is not None else 'no error message'}"
+    if exception_class is ExceedsRatelimit:
+        raise ExceedsRatelimit(message, retry_after)
+    if exception_class is RequestError:
+        raise RequestError(message, status)
+    raise exception_class(message)
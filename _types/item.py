@@ -1,9 +1,11 @@
+from .model import Model
 
 
-class Item(dict):
-    def __init__(self, *args, **kwargs):
-        super(Item, self).__init__(*args, **kwargs)
-        self.__dict__ = self
-
-    def __getattr__(self, attr):
-        return self[attr]
+class Item(Model):
+    fields = (
+        "id", "market_name", "market_value", "suggested_price", "above_recommended_price", "custom_price_percentage",
+        "auction_ends_at", "auction_highest_bid", "auction_highest_bidder", "auction_number_of_bids",
+        "published_at", "icon_url", "name_color", "preview_id", "wear", "stickers", "is_commodity",
+        "price_is_unreliable", "depositor_stats"
+    )
+    __slots__ = fields
@@ -1,9 +1,6 @@
+from .model import Model
 
 
-class Meta(dict):
-    def __init__(self, *args, **kwargs):
-        super(Meta, self).__init__(*args, **kwargs)
-        self.__dict__ = self
-
-    def __getattr__(self, attr):
-        return self[attr]
+class Meta(Model):
+    fields = ("user", "socket_token", "socket_signature")
+    __slots__ = fields
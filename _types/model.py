@@ -0,0 +1,91 @@
+class Model:
+    """
+    Compact base class for objects returned by the API.
+
+    Fields listed in a subclass's `fields` are stored in __slots__; any other key the API sends is kept
+    in `extra`, so unknown fields are never lost. Both are readable as attributes or with item access.
+    """
+
+    __slots__ = ("extra",)
+    fields = ()
+    field_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.field_set = frozenset(cls.fields)
+
+    def __init__(self, data=None, **kwargs):
+        self.extra = None
+        if data is not None:
+            self.set_fields(data)
+        if kwargs:
+            self.set_fields(kwargs)
+
+    def set_fields(self, data):
+        field_set = self.field_set
+        for key, value in data.items():
+            if key in field_set:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def __getattr__(self, attr):
+        # only reached for unset slots and fields kept in extra
+        if attr == "extra":
+            raise AttributeError(attr)
+        extra = self.extra
+        if extra is not None and attr in extra:
+            return extra[attr]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {attr!r}")
+
+    def __getitem__(self, key):
+        if key in self.field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.set_fields({key: value})
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, data):
+        self.set_fields(data)
+
+    def to_dict(self):
+        data = {}
+        for key in self.fields:
+            try:
+                data[key] = getattr(self, key)
+            except AttributeError:
+                pass
+        if self.extra is not None:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Model):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
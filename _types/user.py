@@ -1,7 +1,9 @@
-class User(dict):
-    def __init__(self, *args, **kwargs):
-        super(User, self).__init__(*args, **kwargs)
-        self.__dict__ = self
+from .model import Model
 
-    def __getattr__(self, attr):
-        return self[attr]
+
+class User(Model):
+    fields = (
+        "id", "steam_id", "steam_name", "avatar", "profile_url", "balance", "steam_api_key", "trade_url",
+        "trade_offer_token", "level", "xp", "country", "whitelisted", "muted_until", "registration_timestamp"
+    )
+    __slots__ = fields
@@ -1,9 +1,9 @@
+from .model import Model
 
 
-class Withdrawal(dict):
-    def __init__(self, *args, **kwargs):
-        super(Withdrawal, self).__init__(*args, **kwargs)
-        self.__dict__ = self
-
-    def __getattr__(self, attr):
-        return self[attr]
+class Withdrawal(Model):
+    fields = (
+        "id", "item_id", "item", "status", "status_message", "total_value", "tradeoffer_id",
+        "created_at", "updated_at", "metadata"
+    )
+    __slots__ = fields
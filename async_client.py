@@ -0,0 +1,303 @@
+import asyncio
+from collections import deque
+
+from ._types import *
+from .async_transport import AsyncTransport
+from .domains import accepted_domains, normalize_domain
+from .deposits import Deposits
+from .metadata import AsyncMetadata
+from .metrics import Metrics
+from .inventory import InventoryCache
+from .withdrawals import Withdrawals
+
+
+class AsyncClient():
+    """
+    The asyncio counterpart of Client.
+
+    Every endpoint is a coroutine, requests share one pooled aiohttp session and the socket runs on
+    socketio.AsyncClient, so any number of calls and socket events can be in flight on a single event loop.
+
+    Usage:
+        async with AsyncClient(token) as client:
+            inventory = await client.get_inventory()
+    """
+
+    accepted_domains = accepted_domains
+
+    def __init__(self, token=None, domain="https://csgoempire.com", ws_url=None, socket_enabled=True, socket_logger_enabled=False, engineio_logger_enabled=False, pool_size=AsyncTransport.default_pool_size, timeout=AsyncTransport.default_timeout, handler_workers=0, metrics=False):
+        if token is None:
+            raise ApiKeyMissing()
+        if len(token) != 32:
+            raise InvalidApiKey()
+
+        self.socket_enabled = socket_enabled
+        self.socket_logger_enabled = socket_logger_enabled
+        self.engineio_logger_enabled = engineio_logger_enabled
+        self.ws_url = ws_url
+        self.handler_workers = handler_workers
+        # a Metrics instance, or True for a new one, records REST and socket measurements
+        self.metrics = Metrics() if metrics is True else metrics or None
+        # tracks trade statuses from the socket once it is initialised
+        self.trades = None
+
+        self.api_key = token
+        self.domain = self.normalize_domain(domain)
+        self.api_base_url = f"{self.domain}/api/v2/"
+        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+
+        self.transport = AsyncTransport(self.api_key, self.api_base_url, pool_size=pool_size, timeout=timeout, metrics=self.metrics)
+        self.metadata = AsyncMetadata(self.transport)
+        self.user = None
+        self.can_refresh = False
+        self.inventory = InventoryCache()
+
+        self.gateway = None
+        self.socket = None
+        self.events = None
+
+    normalize_domain = staticmethod(normalize_domain)
+
+    async def start(self):
+        """
+        Fetches metadata, validates the API key and connects the socket if enabled.
+
+        Returns:
+        - AsyncClient: The started client.
+        """
+        await self.metadata.set_metadata()
+        self.user = self.metadata.user
+
+        # validate api key using set metadata
+        self.validate_api_key()
+
+        if self.socket_enabled:
+            await self.initalise_socket(logger=self.socket_logger_enabled, engineio_logger=self.engineio_logger_enabled)
+        return self
+
+    async def close(self):
+        """
+        Disconnects the socket, if any, and closes all pooled connections.
+        """
+        if self.gateway is not None and self.gateway.sio is not None:
+            await self.gateway.disconnect()
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # metadata related functions
+
+    async def refresh_metadata(self):
+        await self.metadata.set_metadata()
+        self.user = self.metadata.user
+        return self.metadata
+
+    def get_metadata(self):
+        return self.metadata
+
+    def get_balance(self):
+        return self.metadata.balance
+
+    def get_socket_token(self):
+        return self.metadata.socket_token
+
+    def get_socket_signature(self):
+        return self.metadata.socket_signature
+
+    def get_api_token(self):
+        return self.api_key
+
+    def get_domain(self):
+        return self.domain
+
+    def get_auth_headers(self):
+        return self.headers
+
+    def validate_api_key(self):
+        if self.metadata.user is None:
+            raise InvalidApiKey()
+
+    # user related functions
+
+    def get_user_id(self):
+        return self.metadata.user_id
+
+    def get_user(self):
+        return self.metadata.user
+
+    def get_steam_api_key(self):
+        return self.metadata.user.steam_api_key
+
+    # deposit related functions
+
+    async def get_active_deposits(self):
+        response = await self.transport.get("trading/user/trades", "Deposits", "get_active_deposits")
+        return [AsyncDeposit(self.transport, item, inventory=self.inventory) for item in response['data']['deposits']]
+
+    async def get_inventory(self, filter: bool = True, force_refresh=False, max_age=None):
+        if force_refresh or not self.inventory.is_fresh(max_age if max_age is not None else Deposits.inventory_ttl):
+            await self.refresh_inventory(force_refresh)
+        return self.inventory.view("sellable" if filter else "listable")
+
+    async def refresh_inventory(self, force_refresh=False):
+        # if refresh is requested but server hasn't allowed refresh
+        if force_refresh and not self.can_refresh:
+            force_refresh = False
+
+        params = {"update": str(force_refresh)}
+        response = await self.transport.get("trading/user/inventory", "Deposits", "get_inventory", params=params, budget="inventory")
+        self.can_refresh = response['allowUpdate']
+        return self.inventory.apply(response['data'], lambda item: AsyncDeposit(self.transport, item, inventory=self.inventory))
+
+    def get_inventory_changes(self):
+        return self.inventory.changes
+
+    async def list_item(self, deposit, percentage):
+        result = await deposit.list_item(percentage)
+        # the deposit may not come from this client's inventory
+        self.inventory.invalidate()
+        return result
+
+    async def list_items(self, items_with_percentages, batch_size=Deposits.listing_batch_size):
+        # rejected batches, rate limits and failures are handled as by Deposits.list_items
+        results = []
+        pending = deque(Deposits.listing_batches(items_with_percentages, batch_size))
+        while pending:
+            ids, data = pending.popleft()
+            try:
+                await self.transport.post("trading/deposit", "Deposits", "list_items", data=data, budget="listing")
+            except Exception as e:
+                Deposits.listing_failed(e, ids, data, pending, results)
+            else:
+                results.extend(Deposits.listing_results(ids))
+                # listed items leave the listable inventory
+                self.inventory.invalidate()
+        return results
+
+    async def cancel(self, deposit):
+        result = await deposit.cancel()
+        self.inventory.invalidate()
+        return result
+
+    async def sell_now(self, deposit):
+        result = await deposit.sell_now()
+        self.inventory.invalidate()
+        return result
+
+    async def run_many(self, action, deposits, predicate, max_workers):
+        if deposits is None:
+            deposits = await self.get_active_deposits()
+        deposits = Deposits.select_deposits(deposits, predicate)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def run(deposit):
+            async with semaphore:
+                # every failure is recorded against its deposit, so one timeout does not lose the outcome of the others
+                try:
+                    await getattr(deposit, action)()
+                except Exception as e:
+                    return Deposits.error_message(e)
+                return None
+
+        errors = await asyncio.gather(*[run(deposit) for deposit in deposits])
+        return Deposits.report(deposits, errors)
+
+    async def cancel_many(self, deposits=None, predicate=None, max_workers=8):
+        return await self.run_many("cancel", deposits, predicate, max_workers)
+
+    async def sell_now_many(self, deposits=None, predicate=None, max_workers=8):
+        return await self.run_many("sell_now", deposits, predicate, max_workers)
+
+    # withdrawal related functions
+
+    async def bid(self, item_id: int, amount: int):
+        data = {"bid_value": amount}
+        await self.transport.post(f"trading/deposit/{item_id}/bid", "Withdrawal", "bid", data=data, budget="bid")
+        return True
+
+    async def get_page(self, base_params, page):
+        budget = "search" if "search" in base_params else "items"
+        return await self.transport.get("trading/items", "Withdrawal", "get_items", params={**base_params, "page": page}, budget=budget)
+
+    async def get_items(self, per_page: int = 2500, page: int = 1, search: str = "", order: str = "market_value", sort="desc", auction: str = "yes", price_min: int = 1, price_max: int = 100000, price_max_above: int = 15, concurrent: bool = False, max_workers: int = 4, columnar: bool = False, compact: bool = False):
+        base_params = Withdrawals.build_params(per_page, search, order, sort, auction, price_min, price_max, price_max_above)
+
+        response = await self.get_page(base_params, page)
+        items = Withdrawals.page_items(response, compact)
+        pages = range(page + 1, response['last_page'] + 1)
+
+        if concurrent:
+            semaphore = asyncio.Semaphore(max_workers)
+
+            async def get_page(i):
+                async with semaphore:
+                    return await self.get_page(base_params, i)
+
+            for response in await asyncio.gather(*[get_page(i) for i in pages]):
+                items.extend(Withdrawals.page_items(response, compact))
+        else:
+            for i in pages:
+                items.extend(Withdrawals.page_items(await self.get_page(base_params, i), compact))
+
+        if columnar:
+            from .columnar import MarketSnapshot
+            return MarketSnapshot.from_items(items)
+        return items
+
+    get_auctions = get_items
+    get_withdrawals = get_items
+
+    async def iter_items(self, per_page: int = 2500, page: int = 1, search: str = "", order: str = "market_value", sort="desc", auction: str = "yes", price_min: int = 1, price_max: int = 100000, price_max_above: int = 15, by_page: bool = False):
+        base_params = Withdrawals.build_params(per_page, search, order, sort, auction, price_min, price_max, price_max_above)
+
+        last_page = page
+        while page <= last_page:
+            response = await self.get_page(base_params, page)
+            last_page = response['last_page']
+            if by_page:
+                yield response['data']
+            else:
+                for item in response['data']:
+                    yield item
+            page += 1
+
+    iter_auctions = iter_items
+    iter_withdrawals = iter_items
+
+    # gateway related functions
+
+    async def disconnect(self):
+        await self.gateway.disconnect()
+
+    async def wait_for_trade(self, trade_id, statuses, timeout=None):
+        return await self.trades.wait(trade_id, statuses, timeout)
+
+    async def initalise_socket(self, logger=False, engineio_logger=False):
+        # the socket stack is only loaded once a socket is actually created
+        from .async_gateway import AsyncGateway
+        from .trades import TradeTracker
+
+        # use ws_url if exists, otherwise use domain
+        websocket_url = self.ws_url if self.ws_url is not None else self.domain
+        # setup gateway
+        self.gateway = AsyncGateway(self.metadata, logger, engineio_logger, domain=websocket_url, custom_ws_url=self.ws_url is not None, handler_workers=self.handler_workers, metrics=self.metrics)
+        await self.gateway.setup()
+        self.socket = self.gateway.socket
+        self.events = self.gateway.get_events()
+        # the tracker outlives reconnects, only its handlers are registered on the new gateway
+        if self.trades is None:
+            self.trades = TradeTracker()
+            # trades move items in and out of the inventory
+            self.trades.on_change(self.inventory.invalidate)
+        self.trades.attach(self.gateway)
+
+    async def reconnect(self):
+        await self.gateway.dc()
+        self.gateway = None
+        self.socket = None
+        self.events = None
+        await self.initalise_socket(logger=self.socket_logger_enabled, engineio_logger=self.engineio_logger_enabled)
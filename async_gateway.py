@@ -0,0 +1,105 @@
+import asyncio
+import socketio
+from .dispatcher import Dispatcher
+from .gateway import Gateway
+from .codec import socket_json
+
+
+class AsyncGateway(Gateway):
+    """
+    The asyncio counterpart of Gateway, backed by socketio.AsyncClient.
+
+    Frame handlers and events are shared with Gateway; only connecting, identifying and sending differ,
+    and are coroutines here.
+    """
+
+    def __init__(self, metadata, logger=False, engineio_logger=False, domain="csgoempire.com", custom_ws_url=False, handler_workers=0, metrics=None):
+        """
+        Constructor method for AsyncGateway class.
+
+        Parameters:
+        - metadata (AsyncMetadata): Metadata used to identify the socket, already populated.
+        - logger (bool): Whether to enable debug logging or not. Defaults to False.
+        - engineio_logger (bool): Whether to enable engineio logging or not. Defaults to False.
+        - domain (str): Domain name for the server. Defaults to "csgoempire.com".
+        - custom_ws_url (bool): Whether domain is a full websocket host rather than the site domain. Defaults to False.
+        - handler_workers (int): Number of worker threads event handlers run on, 0 to run them on the event loop. Defaults to 0.
+        - metrics (Metrics): If set, frames received and the time spent in each event's handler are recorded. Defaults to None.
+        """
+        transport = metadata.transport
+        super().__init__(transport.api_key, transport.api_base_url, logger, engineio_logger, domain=domain, custom_ws_url=custom_ws_url, metadata=metadata, handler_workers=handler_workers, metrics=metrics)
+
+    async def setup(self):
+        """
+        Method that registers event handlers and sets up the WebSocket connection.
+        """
+        user_agent = f"{self.metadata.user_id} API Bot | Python Library"
+        self.events = Dispatcher(self.handler_executor)
+        if self.is_connected is False and self.socket is None:
+            self.sio = socketio.AsyncClient(
+                logger=self.debug_logger,
+                engineio_logger=self.debug_engineio_logger,
+                reconnection=True,
+                json=socket_json,
+            )
+
+            self.sio.on("connect", handler=self.connected)
+            self.sio.on("disconnect", handler=self.disconnected)
+            self.sio.on("connect_error", handler=self.connect_error)
+            for event, handler in self.handlers.items():
+                self.sio.on(event, handler=self.receiver(event, handler), namespace="/trade")
+
+            try:
+                options = {
+                    "url": self.websocket_url(),
+                    "socketio_path": "/s/",
+                    "headers": {"User-agent": user_agent},
+                    "transports": ["websocket"],
+                    "namespaces": ["/trade"],
+                }
+                self.socket = await self.sio.connect(**options)
+            except Exception as e:
+                print(f"WS Connection error (gateway): {e} | {options}")
+
+    async def identify(self):
+        """
+        Method that sends an "identify" frame to the server to authenticate the user.
+        """
+        if self.is_authed is False:
+            self.auth = await self.metadata.get_identify()
+            self.identify_pending = True
+            await self.send("identify", self.auth, namespace="/trade")
+
+    def send(self, event, data, namespace="/trade"):
+        """
+        Method that schedules data to be sent to the server using the specified event and namespace.
+
+        Parameters:
+        - event (str): Name of the event to be sent.
+        - data (dict): Data to be sent with the event.
+        - namespace (str): Namespace to send the event to. Defaults to "/trade".
+
+        Returns:
+        - asyncio.Task: The task sending the frame, which may be awaited.
+        """
+        return asyncio.ensure_future(self.sio.emit(event, data, namespace))
+
+    async def dc(self):
+        """
+        Method that disconnects the socket without updating has_disconnected, used in reconnection logic.
+        """
+        self.is_authed = False  # reset auth
+        await self.sio.disconnect()
+
+    async def disconnect(self):
+        """
+        Method that disconnects the socket and updates the has_disconnected flag.
+        """
+        self.has_disconnected = True
+        await self.sio.disconnect()
+
+    async def wait(self):
+        """
+        Method that waits until the connection is closed.
+        """
+        await self.sio.wait()
@@ -0,0 +1,177 @@
+import aiohttp
+import asyncio
+from time import perf_counter
+from ._types import handle_error
+from .ratelimit import RateLimiter
+from .transport import Transport
+from .codec import codec as default_codec
+
+
+class AsyncTransport:
+    """
+    The asyncio counterpart of Transport, backed by a pooled aiohttp session.
+
+    The session is opened lazily on the first request so the transport can be constructed outside of a running event loop.
+    Rate limits and 429 retries behave as in Transport, except that waiting yields to the event loop.
+
+    Attributes:
+    - api_key (str): The API key used for authentication.
+    - api_base_url (str): The base URL for API requests.
+    - headers (dict): The headers sent with every request.
+    - pool_size (int): The maximum number of simultaneous connections, 0 for no limit.
+    - timeout (float | tuple): The (connect, read) timeout applied to every request.
+    - session (aiohttp.ClientSession): The underlying session holding the connection pool.
+    - ratelimiter (RateLimiter): The rate limits applied to every request.
+    - max_retries (int): The number of times a request rejected with HTTP 429 is retried.
+    - metrics (Metrics): Records latency, status codes, retries, rate limit waits and decode time when set.
+    - codec (Codec): Encodes request bodies and decodes responses.
+
+    Methods:
+    - request(method, endpoint, class_name, function_name, params=None, data=None, budget="default"): Sends a request and returns the decoded response.
+    - get(endpoint, class_name, function_name, params=None, budget="default"): Sends a GET request.
+    - post(endpoint, class_name, function_name, data=None, budget="default"): Sends a POST request.
+    - close(): Closes all pooled connections.
+    """
+
+    default_pool_size = 100
+    default_timeout = Transport.default_timeout
+    default_max_retries = Transport.default_max_retries
+
+    def __init__(self, api_key, api_base_url, pool_size=default_pool_size, timeout=default_timeout, ratelimiter=None, max_retries=default_max_retries, metrics=None, codec=None):
+        """
+        Initializes a new instance of the AsyncTransport class.
+
+        Parameters:
+        - api_key (str): The API key used for authentication.
+        - api_base_url (str): The base URL for API requests.
+        - pool_size (int): The maximum number of simultaneous connections, 0 for no limit. Defaults to 100.
+        - timeout (float | tuple): The (connect, read) timeout in seconds. Defaults to (3.05, 10).
+        - ratelimiter (RateLimiter): The rate limits to apply. A new one with the default budgets is created if not provided.
+        - max_retries (int): The number of times a request rejected with HTTP 429 is retried. Defaults to 3.
+        - metrics (Metrics): Records every request when set. Defaults to None.
+        - codec (Codec): The JSON codec to use. Defaults to the fastest installed backend.
+
+        Returns:
+        - None
+        """
+        self.api_key = api_key
+        self.api_base_url = api_base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.ratelimiter = ratelimiter if ratelimiter is not None else RateLimiter()
+        self.max_retries = max_retries
+        self.metrics = metrics
+        self.codec = codec if codec is not None else default_codec
+        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+        self.session = None
+
+    def client_timeout(self):
+        """
+        Converts the configured timeout into an aiohttp.ClientTimeout.
+
+        Returns:
+        - aiohttp.ClientTimeout: The timeout used by the session.
+        """
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    async def open(self):
+        """
+        Opens the underlying session if it is not already open.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=self.client_timeout())
+
+    async def request(self, method, endpoint, class_name, function_name, params=None, data=None, budget="default"):
+        """
+        Sends a request to the API and returns the decoded response.
+
+        Parameters:
+        - method (str): The HTTP method to use.
+        - endpoint (str): The endpoint, relative to api_base_url.
+        - class_name (str): The name of the calling class, used in error messages.
+        - function_name (str): The name of the calling function, used in error messages.
+        - params (dict): Query string parameters. Defaults to None.
+        - data (dict): The JSON body to send. Defaults to None.
+        - budget (str): The rate limit budget the request counts against. Defaults to "default".
+
+        Returns:
+        - dict: The decoded response if the request is successful, otherwise raises an error.
+        """
+        await self.open()
+        url = self.api_base_url + endpoint
+        body = self.codec.dumps(data) if data is not None else None
+
+        metrics = self.metrics
+        for attempt in range(self.max_retries + 1):
+            delay = self.ratelimiter.reserve(budget)
+            await asyncio.sleep(delay)
+            sent = perf_counter()
+            async with self.session.request(method, url, params=params, data=body) as response:
+                status = response.status
+                headers = response.headers
+                if metrics is not None:
+                    metrics.wait(budget, delay)
+                    metrics.request(method, endpoint, status, perf_counter() - sent)
+                if status == 429:
+                    self.ratelimiter.throttled(budget, headers)
+                    if attempt < self.max_retries:
+                        if metrics is not None:
+                            metrics.retry(method, endpoint)
+                        continue
+                content = await response.read()
+                if metrics is None:
+                    response = self.codec.loads(content) if content else None
+                else:
+                    started = perf_counter()
+                    response = self.codec.loads(content) if content else None
+                    metrics.decode(method, endpoint, perf_counter() - started)
+                break
+
+        if status == 200:
+            self.ratelimiter.succeeded(budget, headers)
+            return response
+        else:
+            handle_error(status, response if response is not None else {}, class_name, function_name, RateLimiter.retry_after(headers))
+
+    async def get(self, endpoint, class_name, function_name, params=None, budget="default"):
+        """
+        Sends a GET request to the API.
+
+        Parameters:
+        - endpoint (str): The endpoint, relative to api_base_url.
+        - class_name (str): The name of the calling class, used in error messages.
+        - function_name (str): The name of the calling function, used in error messages.
+        - params (dict): Query string parameters. Defaults to None.
+        - budget (str): The rate limit budget the request counts against. Defaults to "default".
+
+        Returns:
+        - dict: The decoded response.
+        """
+        return await self.request("GET", endpoint, class_name, function_name, params=params, budget=budget)
+
+    async def post(self, endpoint, class_name, function_name, data=None, budget="default"):
+        """
+        Sends a POST request to the API.
+
+        Parameters:
+        - endpoint (str): The endpoint, relative to api_base_url.
+        - class_name (str): The name of the calling class, used in error messages.
+        - function_name (str): The name of the calling function, used in error messages.
+        - data (dict): The JSON body to send. Defaults to None.
+        - budget (str): The rate limit budget the request counts against. Defaults to "default".
+
+        Returns:
+        - dict: The decoded response.
+        """
+        return await self.request("POST", endpoint, class_name, function_name, data=data, budget=budget)
+
+    async def close(self):
+        """
+        Closes all pooled connections.
+        """
+        if self.session is not None:
+            await self.session.close()
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the library, run as modules, e.g.
+
+    python -m csgoempire.benchmarks.models
+"""
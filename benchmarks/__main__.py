@@ -0,0 +1,60 @@
+"""
+Runs the benchmark suites and writes their results as one JSON document, for tracking over time:
+
+    python -m csgoempire.benchmarks --output results/$(git rev-parse --short HEAD).json
+    python -m csgoempire.benchmarks --only rest gateway --frames burst.jsonl.gz
+"""
+import argparse
+import platform
+import subprocess
+import sys
+import time
+from importlib import import_module
+from json import dump, dumps
+from os.path import dirname
+
+suites = ("rest", "gateway", "memory", "models", "codec", "fanout", "columnar", "imports")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=dirname(dirname(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the benchmark suites and prints their results as JSON.")
+    parser.add_argument("--only", nargs="+", choices=suites, default=suites, help="suites to run")
+    parser.add_argument("--frames", help="a FrameRecorder file replayed by the gateway suite instead of generated frames")
+    parser.add_argument("--output", help="write the results to this file instead of printing them")
+    options = parser.parse_args()
+
+    results = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "results": {},
+    }
+    for name in options.only:
+        suite = import_module(f"{__package__}.{name}")
+        if name == "gateway" and options.frames:
+            frames = [(event, data) for _, event, data in suite.read_frames(options.frames)]
+            results["results"][name] = suite.run(frames)
+        else:
+            results["results"][name] = suite.run()
+        print(f"{name} done", file=sys.stderr)
+
+    if options.output:
+        with open(options.output, "w") as file:
+            dump(results, file, indent=4)
+    else:
+        print(dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
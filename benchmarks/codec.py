@@ -0,0 +1,50 @@
+"""
+Compares decoding a 2,500 item get_items page with requests' Response.json(), the previous path,
+against each installed codec backend, and encoding a bid body with each. Also reports decoding a page
+into Item models, as get_items(compact=True) does.
+"""
+import json
+from timeit import repeat
+
+import requests
+
+from .. import codec
+from ..mockserver import MockServer
+from ..withdrawals import Withdrawals
+
+
+def sample_page(count=2500):
+    server = MockServer(market_size=count, inventory_size=0, seed=0)
+    page = {"current_page": 1, "per_page": count, "last_page": 1, "total": count, "data": list(server.items.values())}
+    return json.dumps(page).encode("utf-8")
+
+
+def response_json(content):
+    response = requests.Response()
+    response._content = content
+    response.encoding = None
+    return response.json()
+
+
+def best_of(function, number):
+    return min(repeat(function, number=number, repeat=5)) / number
+
+
+def run():
+    content = sample_page()
+    body = {"bid_value": 123456}
+    results = {"page_bytes": len(content), "decode_page_ms": {"response_json": round(best_of(lambda: response_json(content), 10) * 1000, 3)}, "decode_page_to_items_ms": {}, "encode_bid_us": {}}
+    for name in codec.backends:
+        try:
+            backend = codec.select(name)
+        except ImportError:
+            continue
+        results["decode_page_ms"][name] = round(best_of(lambda: backend.loads(content), 10) * 1000, 3)
+        results["decode_page_to_items_ms"][name] = round(best_of(lambda: Withdrawals.page_items(backend.loads(content), compact=True), 10) * 1000, 3)
+        results["encode_bid_us"][name] = round(best_of(lambda: backend.dumps(body), 10000) * 1e6, 3)
+    results["default_backend"] = codec.codec.name
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
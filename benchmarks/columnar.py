@@ -0,0 +1,45 @@
+"""
+Compares pricing and filtering 20,000 listed items against a price list by looping over the dicts,
+against the same expression over a MarketSnapshot, and measures building the snapshot.
+"""
+from timeit import repeat
+
+from ..columnar import MarketSnapshot
+from ..mockserver import MockServer
+
+
+def sample_listing(count):
+    server = MockServer(market_size=count, inventory_size=0, seed=0)
+    return list(server.items.values())
+
+
+def best_of(function, number):
+    return min(repeat(function, number=number, repeat=5)) / number
+
+
+def run(count=20000):
+    items = sample_listing(count)
+    prices = {item["market_name"]: item["market_value"] * 1.05 for item in items[::2]}
+
+    def loop():
+        return [item for item in items if item["market_name"] in prices and (prices[item["market_name"]] - item["market_value"]) / item["market_value"] > 0.03 and item["above_recommended_price"] < 5]
+
+    snapshot = MarketSnapshot.from_items(items)
+
+    def vectorized():
+        market_value = snapshot["market_value"]
+        spread = (snapshot.lookup(prices) - market_value) / market_value
+        return snapshot.select((spread > 0.03) & (snapshot["above_recommended_price"] < 5))
+
+    assert len(loop()) == len(vectorized())
+    return {
+        "items": count,
+        "build_snapshot_ms": round(best_of(lambda: MarketSnapshot.from_items(items), 5) * 1000, 3),
+        "filter_dicts_ms": round(best_of(loop, 10) * 1000, 3),
+        "filter_snapshot_ms": round(best_of(vectorized, 10) * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    from json import dumps
+    print(dumps(run(), indent=4))
@@ -0,0 +1,77 @@
+"""
+Measures the shared memory fan-out: records published per second, and records read per second by a
+consumer receiving every record and by one receiving a quarter of the item ids.
+
+Before measuring, check_wraparound verifies that a consumer lagging about three quarters of a ring behind
+never returns a record torn by one that wraps around the end of the ring.
+"""
+from time import perf_counter
+
+from ..fanout import FanoutConsumer, FanoutPublisher, record_header
+from ..mockserver import MockServer
+
+
+def check_wraparound(capacity=64 * 1024):
+    with FanoutPublisher(capacity=capacity) as publisher:
+        small = 512
+        # a record of exactly small bytes, so positions stay on known boundaries
+        filler = "x" * (small - record_header.size - len(publisher.codec.dumps({"id": 0, "fill": ""})))
+        lagging = FanoutConsumer(publisher.name)
+        behind = FanoutConsumer(publisher.name)
+        # fill the ring until a record of max_record bytes no longer fits at its end
+        while publisher.capacity - publisher.write_position >= publisher.max_record:
+            publisher.publish("new_item", publisher.published, {"id": publisher.published, "fill": filler})
+        # lagging stops inside the part of the ring the wrapping record overwrites, about 3/4 of a ring behind
+        # the write position, behind stops just past it
+        lagging.poll((publisher.max_record - small) // small)
+        behind.poll(publisher.max_record // small)
+        assert publisher.write_position - lagging.read_position <= publisher.capacity * 3 // 4 + publisher.max_record
+
+        # the wrapping record, interrupted half way through its copy
+        size = publisher.max_record
+        start = publisher.reserve(size)
+        publisher.buffer[start:start + size // 2] = b"\xff" * (size // 2)
+        for consumer in (lagging, behind):
+            for event, item in consumer.poll(10000):
+                assert item["fill"] == filler, "torn record returned"
+        assert lagging.dropped == 1 and behind.dropped == 0
+
+        payload = publisher.codec.dumps({"id": -1, "fill": "y" * (size - record_header.size - len(publisher.codec.dumps({"id": -1, "fill": ""})))})
+        record_header.pack_into(publisher.buffer, start, len(payload), 0, 0, -1)
+        publisher.buffer[start + record_header.size:start + record_header.size + len(payload)] = payload
+        publisher.commit()
+        assert [item["id"] for _, item in behind.poll()] == [-1]
+        lagging.close()
+        behind.close()
+
+
+def sample_items(count):
+    server = MockServer(market_size=count, inventory_size=0, seed=0)
+    return list(server.items.values())
+
+
+def run(count=20000):
+    check_wraparound()
+    items = sample_items(count)
+    results = {"records": count}
+    with FanoutPublisher(capacity=64 * 1024 * 1024) as publisher:
+        consumers = {"all": FanoutConsumer(publisher.name), "quarter_shard": FanoutConsumer(publisher.name, events=["new_item"], shard=(0, 4))}
+
+        started = perf_counter()
+        publisher.publish_items("new_item", items)
+        elapsed = perf_counter() - started
+        results["publish_per_s"] = round(count / elapsed)
+        results["ring_bytes"] = publisher.write_position
+
+        for name, consumer in consumers.items():
+            started = perf_counter()
+            received = len(consumer.poll(count))
+            elapsed = perf_counter() - started
+            results[name] = {"received": received, "records_scanned_per_s": round(count / elapsed)}
+            consumer.close()
+    return results
+
+
+if __name__ == "__main__":
+    from json import dumps
+    print(dumps(run(), indent=4))
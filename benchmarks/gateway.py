@@ -0,0 +1,86 @@
+"""
+Measures how many socket frames per second Gateway passes from its receivers to event handlers.
+
+Frames are generated by MockServer, or read from a file written by FrameRecorder, and held in memory so
+decoding is not measured. Each dispatch mode is fed the same frames, first with no-op handlers and then
+with a MarketBook attached.
+"""
+import sys
+from time import perf_counter, sleep
+
+from ..gateway import Gateway
+from ..market import MarketBook
+from ..mockserver import MockServer
+from ..recorder import read_frames
+
+modes = {
+    "direct": {},
+    "handler_workers": {"handler_workers": 4},
+    "buffered": {"buffered": True},
+    "coalesced": {"coalesce_window": 0.05},
+}
+item_events = ("on_new_item", "on_updated_item", "on_auction_update", "on_deleted_item")
+
+
+def generate_frames(count, items_per_frame):
+    server = MockServer(market_size=10000, inventory_size=0, items_per_frame=items_per_frame, seed=0)
+    return [(event, data) for event, data in (server.next_frame() for _ in range(count))]
+
+
+def count_items(frames):
+    return sum(len(data) if isinstance(data, list) else 1 for _, data in frames)
+
+
+def drain(gateway):
+    if gateway.coalescer is not None:
+        gateway.coalescer.close()
+    if gateway.queue is not None:
+        while len(gateway.queue):
+            sleep(0.001)
+    if gateway.handler_executor is not None:
+        gateway.handler_executor.shutdown(wait=True)
+
+
+def feed(frames, options, book):
+    gateway = Gateway("0" * 32, "", metadata=object(), **options)
+    events = gateway.get_events()
+    if book:
+        MarketBook().attach(gateway)
+    else:
+        for event in item_events:
+            events.on(event, lambda item: None)
+    gateway.start_dispatch()
+    receivers = {event: gateway.receiver(event, handler) for event, handler in gateway.handlers.items()}
+
+    start = perf_counter()
+    for event, data in frames:
+        receivers[event](data)
+    received = perf_counter() - start
+    drain(gateway)
+    handled = perf_counter() - start
+    if gateway.queue is not None:
+        gateway.queue.close()
+    return received, handled
+
+
+def run(frames=None, count=20000, items_per_frame=1):
+    frames = frames if frames is not None else generate_frames(count, items_per_frame)
+    items = count_items(frames)
+    results = {"frames": len(frames), "items": items}
+    for handlers, book in (("noop", False), ("market_book", True)):
+        results[handlers] = {}
+        for mode, options in modes.items():
+            received, handled = feed(frames, options, book)
+            results[handlers][mode] = {
+                "receive_frames_per_s": round(len(frames) / received),
+                "frames_per_s": round(len(frames) / handled),
+                "items_per_s": round(items / handled),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    from json import dumps
+    # optionally replay a recorded file instead of generated frames
+    frames = [(event, data) for _, event, data in read_frames(sys.argv[1])] if len(sys.argv) > 1 else None
+    print(dumps(run(frames), indent=4))
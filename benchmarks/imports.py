@@ -0,0 +1,53 @@
+"""
+Measures how long importing the package takes, and checks that the socket stack and gevent are only
+loaded when they are used.
+
+Each scenario runs in a fresh interpreter. Exits with status 1 if a scenario loads a module it should not.
+"""
+import os
+import subprocess
+import sys
+from statistics import median
+
+package = __package__.rpartition(".")[0]
+package_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# modules that must not be loaded by a scenario, checked after it runs
+socket_stack = ["gevent", "socketio", "engineio", "observable", "aiohttp"]
+scenarios = {
+    "import_package": (f"import {package}", socket_stack + ["requests"]),
+    "rest_client": (f"from {package} import Client", socket_stack),
+    "async_client": (f"from {package} import AsyncClient", ["gevent", "socketio", "engineio"]),
+    "gateway": (f"from {package}.gateway import Gateway", ["gevent"]),
+}
+
+
+def run_scenario(statement, forbidden, runs):
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [name for name in {forbidden!r} if name in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [package_parent, os.environ.get("PYTHONPATH")]))}
+    timings = []
+    loaded = ""
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout.split(" ")
+        timings.append(float(output[0]))
+        loaded = output[1].strip()
+    return {"median_ms": round(median(timings) * 1000, 2), "unexpected_modules": loaded.split(",") if loaded else []}
+
+
+def run(runs=5):
+    return {name: run_scenario(statement, forbidden, runs) for name, (statement, forbidden) in scenarios.items()}
+
+
+if __name__ == "__main__":
+    from json import dumps
+    results = run()
+    print(dumps(results, indent=4))
+    if any(result["unexpected_modules"] for result in results.values()):
+        sys.exit(1)
@@ -0,0 +1,35 @@
+"""
+Measures the memory held by 10,000 listed items, as decoded dicts, as Item models and in a MarketBook.
+"""
+from .._types import Item
+from ..market import MarketBook
+from ..mockserver import MockServer
+from .models import measure_memory
+
+
+def sample_listing(count):
+    server = MockServer(market_size=count, inventory_size=0, seed=0)
+    return list(server.items.values())
+
+
+def load_book(items):
+    book = MarketBook()
+    # the book keeps its own copies of the items
+    book.load(items)
+    return book
+
+
+def run(count=10000):
+    listing = sample_listing(count)
+    candidates = {
+        # copies, so the measured dicts are not the ones already held by the listing
+        "dicts": lambda items: [dict(item) for item in items],
+        "item_models": lambda items: [Item(item) for item in items],
+        "market_book": load_book,
+    }
+    return {name: {"items": count, "bytes_per_10k_items": round(measure_memory(build, listing) * 10000)} for name, build in candidates.items()}
+
+
+if __name__ == "__main__":
+    from json import dumps
+    print(dumps(run(), indent=4))
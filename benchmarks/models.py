@@ -0,0 +1,90 @@
+"""
+Compares the __slots__ based item models against the dict-with-__dict__ wrappers they replaced.
+
+Reports the memory held per item and the time taken to construct items and read their attributes.
+"""
+import gc
+import tracemalloc
+from timeit import repeat
+
+from .._types import Deposit
+
+
+class LegacyDeposit(dict):
+    """The previous Deposit implementation, kept here as the baseline."""
+
+    def __init__(self, api_key, api_base_url, *args, **kwargs):
+        super(LegacyDeposit, self).__init__(*args, **kwargs)
+        self.__dict__ = self
+        self.api_key = api_key
+        self.api_base_url = api_base_url
+        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+
+    def __getattr__(self, attr):
+        return self[attr]
+
+
+def sample_items(count):
+    return [
+        {
+            "id": 1000000 + i,
+            "asset_id": 30000000000 + i,
+            "market_name": f"AK-47 | Redline (Field-Tested) #{i % 500}",
+            "market_value": 1000 + i % 2000,
+            "suggested_price": 1100 + i % 2000,
+            "tradable": True,
+            "tradelock": False,
+            "icon_url": "-9a81dlWLwJ2UUGcVs_nsVtzdOEdtWwKGZZLQHTxDZ7I56KU0Zwwo4NUX4oFJZEHLbXH5ApeO4YmlhxYQknCRvCo04DEVlxkKgpot7HxfDhjxszJemkV09-5lpKKqPrxN7LEmyVQ7MEpiLuSrYmnjQO3-UdsZGHyd4_Bd1RvNQ7T_FDrw-_ng5Pu75iY1zI97bhLsvQz",
+            "name_color": "D2D2D2",
+            "preview_id": None,
+            "wear": 0.25,
+            "stickers": [],
+            "is_commodity": False,
+            "price_is_unreliable": False,
+            "invalid": None,
+        }
+        for i in range(count)
+    ]
+
+
+def measure_memory(build, items):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    built = build(items)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del built
+    return size / len(items)
+
+
+def best_of(statement, number):
+    return min(repeat(statement, number=number, repeat=5)) / number
+
+
+def run(count=50000):
+    items = sample_items(count)
+    transport = object()
+
+    candidates = {
+        "legacy_dict": lambda data: [LegacyDeposit("0" * 32, "https://csgoempire.com/api/v2/", item) for item in data],
+        "slots": lambda data: [Deposit(transport, item) for item in data],
+    }
+
+    results = {}
+    for name, build in candidates.items():
+        built = build(items[:1000])
+        first = built[0]
+        results[name] = {
+            "bytes_per_item": round(measure_memory(build, items)),
+            "construct_us": round(best_of(lambda: build(items[:1000]), 5) * 1e6 / 1000, 3),
+            "attribute_ns": round(best_of(lambda: first.market_value, 100000) * 1e9, 1),
+            "item_access_ns": round(best_of(lambda: first["market_value"], 100000) * 1e9, 1),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    from json import dumps
+    print(dumps(run(), indent=4))
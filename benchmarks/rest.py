@@ -0,0 +1,108 @@
+"""
+Measures the REST paths against a local MockServer: a full get_items scan, bid round trips and get_inventory.
+
+Rate limits are lifted so the numbers reflect the library and the local round trip rather than the
+budgets. The server runs in a thread of the same process, so absolute numbers include its share of the GIL.
+"""
+from statistics import mean, quantiles
+from time import perf_counter
+
+from .._types import Deposit
+from ..deposits import Deposits
+from ..inventory import InventoryCache
+from ..mockserver import MockServer
+from ..ratelimit import RateLimiter
+from ..transport import Transport
+from ..withdrawals import Withdrawals
+
+api_key = "0" * 32
+unlimited = {name: (1e9, 1e9) for name in RateLimiter.default_budgets}
+# wide enough for get_items to return the whole mock market
+scan_filters = {"per_page": 2500, "price_min": 0, "price_max": 10 ** 9, "price_max_above": 10 ** 6}
+
+
+def summarize(samples):
+    """
+    Summarizes latency samples, given in seconds, in milliseconds.
+    """
+    cuts = quantiles(samples, n=100)
+    return {
+        "count": len(samples),
+        "mean_ms": round(mean(samples) * 1000, 3),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p90_ms": round(cuts[89] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+def timed(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = perf_counter()
+        function()
+        samples.append(perf_counter() - start)
+    return samples
+
+
+def scan(withdrawals, market_size, runs):
+    results = {}
+    for mode, concurrent in (("sequential", False), ("concurrent", True)):
+        samples = timed(lambda: withdrawals.get_items(concurrent=concurrent, **scan_filters), runs)
+        results[mode] = {**summarize(samples), "items": market_size, "items_per_s": round(market_size / min(samples))}
+    return results
+
+
+def bid_latency(withdrawals, server, count):
+    item_ids = list(server.items)[:count]
+    samples = []
+    for number, item_id in enumerate(item_ids):
+        start = perf_counter()
+        withdrawals.bid(item_id, 10 ** 9 + number)
+        samples.append(perf_counter() - start)
+    return summarize(samples)
+
+
+def inventory(deposits, transport, inventory_size, runs):
+    fetch = timed(lambda: transport.get("trading/user/inventory", "Deposits", "get_inventory", params={"update": "False"}), runs)
+    data = transport.get("trading/user/inventory", "Deposits", "get_inventory", params={"update": "False"})["data"]
+    construct = timed(lambda: [Deposit(transport, item) for item in data], runs)
+
+    def cold():
+        deposits.inventory = InventoryCache()
+        deposits.refresh_inventory()
+
+    full = timed(cold, runs)
+    # every item is unchanged, so nothing is wrapped again
+    incremental = timed(deposits.refresh_inventory, runs)
+    cached = timed(deposits.get_inventory, runs)
+    return {
+        "items": inventory_size,
+        "fetch_and_decode_us_per_item": round(min(fetch) * 1e6 / inventory_size, 3),
+        "construct_us_per_item": round(min(construct) * 1e6 / inventory_size, 3),
+        "get_inventory_us_per_item": round(min(full) * 1e6 / inventory_size, 3),
+        "refresh_unchanged_us_per_item": round(min(incremental) * 1e6 / inventory_size, 3),
+        "cached_us_per_item": round(min(cached) * 1e6 / inventory_size, 3),
+    }
+
+
+def run(market_size=10000, inventory_size=10000, bids=500, runs=5, latency=0.0):
+    with MockServer(market_size=market_size, inventory_size=inventory_size, latency=latency, seed=0) as server:
+        api_base_url = f"{server.url}/api/v2/"
+        transport = Transport(api_key, api_base_url, ratelimiter=RateLimiter(unlimited))
+        withdrawals = Withdrawals(api_key, api_base_url, transport=transport)
+        deposits = Deposits(api_key, api_base_url, transport)
+        # open the pooled connections before anything is timed
+        transport.get("metadata/socket", "Meta", "set_metadata")
+
+        results = {
+            "get_items_scan": scan(withdrawals, market_size, runs),
+            "bid": bid_latency(withdrawals, server, bids),
+            "get_inventory": inventory(deposits, transport, inventory_size, runs),
+        }
+        transport.close()
+    return results
+
+
+if __name__ == "__main__":
+    from json import dumps
+    print(dumps(run(), indent=4))
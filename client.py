@@ -1,32 +1,16 @@
-from gevent import monkey
-monkey.patch_all()
-
 from ._types import *
 from .withdrawals import Withdrawals
 from .deposits import Deposits
-from .gateway import Gateway
 from .metadata import Metadata
+from .domains import accepted_domains, normalize_domain
+from .transport import Transport
+from .metrics import Metrics
 
 
 class Client():
-    accepted_domains = [
-        "https://csgoempire.com",
-        "https://csgoempire.gg",
-        "https://csgoempire.tv",
-        "https://csgoempiretr.com",
-        "https://csgoempire88.com",
-        "https://csgoempire.cam",
-        "https://csgoempirev2.com",
-        "https://csgoempire.io",
-        "https://csgoempire.info",
-        "https://csgoempire.vip",
-        "https://csgoempire.fun",
-        "https://csgoempire.biz",
-        "https://csgoempire.vegas",
-        "https://csgoempire.link"
-    ]
-
-    def __init__(self, token=None, domain="https://csgoempire.com", ws_url=None, socket_enabled=True, socket_logger_enabled=False, engineio_logger_enabled=False):
+    accepted_domains = accepted_domains
+
+    def __init__(self, token=None, domain="https://csgoempire.com", ws_url=None, socket_enabled=True, socket_logger_enabled=False, engineio_logger_enabled=False, pool_size=Transport.default_pool_size, timeout=Transport.default_timeout, handler_workers=0, gateway_options=None, metrics=False, transport=None):
         if token is None:
             raise ApiKeyMissing()
         if len(token) != 32:
@@ -36,40 +20,39 @@ class Client():
         self.socket_logger_enabled = socket_logger_enabled
         self.engineio_logger_enabled = engineio_logger_enabled
         self.ws_url = ws_url
+        self.handler_workers = handler_workers
+        # extra keyword arguments for Gateway, e.g. {"buffered": True, "overflow": "coalesce"}
+        self.gateway_options = gateway_options or {}
+        # a Metrics instance, or True for a new one, records REST and socket measurements
+        self.metrics = Metrics() if metrics is True else metrics or None
+        # tracks trade statuses from the socket once it is initialised
+        self.trades = None
 
         self.api_key = token
         self.domain = self.normalize_domain(domain)
         self.api_base_url = f"{self.domain}/api/v2/"
         self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
 
+        # setup a single pooled transport shared by every subsystem, unless one is provided, e.g. by a ClientPool
+        self.transport = transport if transport is not None else Transport(self.api_key, self.api_base_url, pool_size=pool_size, timeout=timeout, metrics=self.metrics)
+
         # setup metadata
-        self.metadata = Metadata(self.api_key, self.api_base_url)
+        self.metadata = Metadata(self.api_key, self.api_base_url, self.transport)
         self.user = self.metadata.user
 
         # validate api key using set metadata
         self.validate_api_key()
 
         # if validated, setup deposits/withdrawals
-        self.deposits = Deposits(self.api_key, self.api_base_url)
-        self.withdrawals = Withdrawals(self.api_key, self.api_base_url)
+        self.deposits = Deposits(self.api_key, self.api_base_url, self.transport)
+        self.withdrawals = Withdrawals(self.api_key, self.api_base_url, transport=self.transport)
 
         # if client initialized with socket enabled, setup gateway
         if socket_enabled:
             # setup socket in background
             self.initalise_socket(logger=socket_logger_enabled, engineio_logger=engineio_logger_enabled)
 
-    @staticmethod
-    def normalize_domain(domain):
-        if "https://" not in domain.lower():
-            domain = f"https://{domain}"
-        
-        if domain[-1] == "/":
-            domain = domain[:-1]
-        
-        if domain.lower() not in Client.accepted_domains:
-            accepted_domains_hr = ',\n'.join(Client.accepted_domains)
-            raise InvalidDomain(f"Invalid domain provided\n\nDomain provided:\n{domain}\n\nAccepted domains:\n{accepted_domains_hr}\n\nPlease change your domain to one of these accepted domains.\n")
-        return domain
+    normalize_domain = staticmethod(normalize_domain)
 
     # metadata related functions
 
@@ -114,11 +97,20 @@ class Client():
     def get_active_deposits(self):
         return self.deposits.get_active_deposits()
 
-    def get_inventory(self, filter: bool = True, force_refresh=False):
-        if filter:
-            inventory = self.deposits.get_inventory(force_refresh)
-            return [item for item in inventory if item['tradable'] is True and item['market_value'] > 0]
-        return self.deposits.get_inventory(force_refresh)
+    def get_inventory(self, filter: bool = True, force_refresh=False, max_age=None):
+        return self.deposits.get_inventory(force_refresh, max_age, view="sellable" if filter else "listable")
+
+    def get_inventory_changes(self):
+        return self.deposits.inventory.changes
+
+    def list_items(self, items_with_percentages, batch_size=Deposits.listing_batch_size):
+        return self.deposits.list_items(items_with_percentages, batch_size)
+
+    def cancel_many(self, deposits=None, predicate=None, max_workers=8):
+        return self.deposits.cancel_many(deposits, predicate, max_workers)
+
+    def sell_now_many(self, deposits=None, predicate=None, max_workers=8):
+        return self.deposits.sell_now_many(deposits, predicate, max_workers)
 
     # withdrawal related functions
 
@@ -127,18 +119,36 @@ class Client():
 
     get_withdrawals = get_auctions
 
+    def iter_auctions(self, **kwargs):
+        return self.withdrawals.iter_items(**kwargs)
+
+    iter_withdrawals = iter_auctions
+
     # gateway related functions
 
     def disconnect(self):
         self.gateway.disconnect()
 
     def initalise_socket(self, logger=False, engineio_logger=False):
+        # the socket stack is only loaded once a socket is actually created
+        from .gateway import Gateway
+        from .trades import TradeTracker
+
         # use ws_url if exists, otherwise use domain
         websocket_url = self.ws_url if self.ws_url is not None else self.domain
         # setup gateway
-        self.gateway = Gateway(self.api_key, self.api_base_url, logger, engineio_logger, domain=websocket_url, custom_ws_url=self.ws_url is not None)
+        self.gateway = Gateway(self.api_key, self.api_base_url, logger, engineio_logger, domain=websocket_url, custom_ws_url=self.ws_url is not None, metadata=self.metadata, handler_workers=self.handler_workers, metrics=self.metrics, **self.gateway_options)
         self.socket = self.gateway.setup()
         self.events = self.gateway.get_events()
+        # the tracker outlives reconnects, only its handlers are registered on the new gateway
+        if self.trades is None:
+            self.trades = TradeTracker()
+            # trades move items in and out of the inventory
+            self.trades.on_change(self.deposits.inventory.invalidate)
+        self.trades.attach(self.gateway)
+
+    def wait_for_trade(self, trade_id, statuses, timeout=None):
+        return self.trades.wait_for(trade_id, statuses, timeout)
 
     def kill_connection(self):
         self.gateway.kill_connection()
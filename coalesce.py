@@ -0,0 +1,150 @@
+import threading
+import traceback
+
+from .dispatcher import Frame
+
+
+class UpdateCoalescer:
+    """
+    Merges item updates received within a time window, used by Gateway when coalesce_window is set.
+
+    Every update is merged into the pending state of its item, keyed by event and item id. Once per
+    window the merged states are passed on, one list per event in the order the items were first
+    updated, so an item updated many times within a window reaches the handlers once. Each list is a
+    Frame received when the earliest of its updates was.
+
+    Attributes:
+    - window (float): The number of seconds updates are held and merged for.
+    - flush (function): Called with (event, items) for each event once a window ends.
+    - received (int): The number of updates received.
+    - delivered (int): The number of merged updates passed on.
+    """
+
+    def __init__(self, window, flush):
+        """
+        Initializes a new instance of the UpdateCoalescer class.
+
+        Parameters:
+        - window (float): The number of seconds updates are held and merged for, greater than 0.
+        - flush (function): Called with (event, items) for each event once a window ends.
+
+        Returns:
+        - None
+        """
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        self.window = window
+        self.flush = flush
+        self.pending = {}
+        self.lock = threading.Lock()
+        # held while a window or a deletion is passed on, so they reach the handlers in the order they were taken
+        self.delivering = threading.RLock()
+        self.thread = None
+        self.stopped = None
+        self.received = 0
+        self.delivered = 0
+
+    def add(self, event, data):
+        """
+        Merges a frame of updates into the pending state.
+
+        Parameters:
+        - event (str): The name of the socket event.
+        - data (dict | list): The update, or list of updates, each including the item id.
+        """
+        received_at = getattr(data, "received_at", None)
+        data = data if isinstance(data, list) else [data]
+        with self.lock:
+            pending = self.pending
+            for item in data:
+                key = (event, item["id"])
+                previous = pending.get(key)
+                pending[key] = (item, received_at) if previous is None else ({**previous[0], **item}, previous[1])
+            self.received += len(data)
+        if self.thread is None:
+            self.start()
+
+    def discard(self, item_ids):
+        """
+        Drops pending updates for items that have been deleted, so they are not delivered afterwards.
+
+        Parameters:
+        - item_ids (int | list): The id, or list of ids, of the deleted items.
+        """
+        item_ids = item_ids if isinstance(item_ids, list) else [item_ids]
+        with self.lock:
+            if not self.pending:
+                return
+            for key in [key for key in self.pending if key[1] in item_ids]:
+                del self.pending[key]
+
+    def delete(self, event, item_ids):
+        """
+        Passes on a deletion once pending updates for the deleted items are dropped.
+
+        A window being passed on is finished first, so an update taken before the deletion arrived is never
+        delivered after it.
+
+        Parameters:
+        - event (str): The name of the socket event.
+        - item_ids (int | list): The id, or list of ids, of the deleted items.
+        """
+        with self.delivering:
+            self.discard(item_ids)
+            self.flush(event, item_ids)
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.stopped = threading.Event()
+            self.thread = threading.Thread(target=self.run, args=(self.stopped,), name="gateway-coalesce", daemon=True)
+            self.thread.start()
+
+    def run(self, stopped):
+        while not stopped.wait(self.window):
+            self.flush_pending()
+
+    def flush_pending(self):
+        """
+        Passes on every pending merged update.
+        """
+        with self.delivering:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            if not pending:
+                return
+
+            events = {}
+            for (event, _), (item, received_at) in pending.items():
+                # items are in the order they were first updated, so the first one was received earliest
+                frame = events.get(event)
+                if frame is None:
+                    frame = events[event] = Frame(received_at=received_at)
+                frame.append(item)
+            self.delivered += len(pending)
+
+            for event, items in events.items():
+                try:
+                    self.flush(event, items)
+                except Exception:
+                    traceback.print_exc()
+
+    def close(self):
+        """
+        Stops the window thread and passes on anything still pending.
+        """
+        with self.lock:
+            if self.stopped is not None:
+                self.stopped.set()
+            self.thread = None
+        self.flush_pending()
+
+    def stats(self):
+        """
+        Returns the coalescer's counters.
+
+        Returns:
+        - dict: The number of updates received, delivered and currently pending.
+        """
+        return {"received": self.received, "delivered": self.delivered, "pending": len(self.pending)}
@@ -0,0 +1,90 @@
+"""
+The JSON codec used for REST bodies and socket frames.
+
+The fastest installed backend is picked on import: orjson, then msgspec, then the standard library.
+Set the CSGOEMPIRE_JSON environment variable to "orjson", "msgspec" or "json" to choose one explicitly.
+"""
+import json
+from os import environ
+
+
+class Codec:
+    """
+    A JSON backend.
+
+    Attributes:
+    - name (str): The backend's name.
+    - loads (function): Decodes bytes or str into Python objects.
+    - dumps (function): Encodes Python objects into bytes.
+    """
+
+    __slots__ = ("name", "loads", "dumps")
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return f"Codec({self.name!r})"
+
+
+class SocketJSON:
+    """
+    Adapts a Codec to the json module interface python-socketio and python-engineio expect.
+
+    Their keyword arguments, such as separators, are ignored; every backend already encodes compactly.
+    """
+
+    def __init__(self, codec):
+        self.codec = codec
+
+    def dumps(self, obj, *args, **kwargs):
+        return self.codec.dumps(obj).decode("utf-8")
+
+    def loads(self, data, *args, **kwargs):
+        return self.codec.loads(data)
+
+
+def orjson_codec():
+    import orjson
+    return Codec("orjson", orjson.loads, orjson.dumps)
+
+
+def msgspec_codec():
+    import msgspec
+    return Codec("msgspec", msgspec.json.decode, msgspec.json.Encoder().encode)
+
+
+def json_codec():
+    return Codec("json", json.loads, lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+backends = {"orjson": orjson_codec, "msgspec": msgspec_codec, "json": json_codec}
+
+
+def select(name=None):
+    """
+    Returns a codec for the named backend, or the fastest installed one.
+
+    Parameters:
+    - name (str): One of backends. Defaults to None, trying each backend in order.
+
+    Returns:
+    - Codec: The codec.
+    """
+    if name is not None:
+        if name not in backends:
+            raise ValueError(f"Unknown JSON backend {name!r}, expected one of {tuple(backends)}")
+        return backends[name]()
+    for factory in backends.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+
+
+codec = select(environ.get("CSGOEMPIRE_JSON") or None)
+loads = codec.loads
+dumps = codec.dumps
+socket_json = SocketJSON(codec)
@@ -0,0 +1,164 @@
+import numpy as np
+
+
+class MarketSnapshot:
+    """
+    A listing of items held column by column in NumPy arrays, for whole-market filters and valuations.
+
+    Numeric fields become one array each, with missing values as NaN in float columns. Item names are
+    interned as category codes into names, so comparing, grouping or pricing by name works on integers.
+    Filters are boolean masks built from the columns, applied with select.
+
+    Usage:
+        snapshot = client.get_auctions(columnar=True)
+        ours = snapshot.lookup(our_prices)
+        spread = (ours - snapshot["market_value"]) / snapshot["market_value"]
+        cheap = snapshot.select((spread > 0.05) & (snapshot["above_recommended_price"] < 0))
+        cheap.to_items()
+
+    Attributes:
+    - columns (dict): An array per field, each with one value per item.
+    - codes (numpy.ndarray): The category code of each item's market_name, an index into names.
+    - names (list): The distinct market names, in the order they were first seen, None for items without one.
+    - items (list): The items the snapshot was built from, in the same order, if they were kept.
+    """
+
+    # field name and dtype of each column, float columns hold NaN where an item has no value, and integer
+    # columns fall back to float if any item has none, e.g. a partial item a MarketBook was updated with
+    fields = {
+        "id": np.int64,
+        "market_value": np.int64,
+        "suggested_price": np.float64,
+        "above_recommended_price": np.float64,
+        "auction_ends_at": np.float64,
+        "auction_highest_bid": np.float64,
+        "auction_number_of_bids": np.float64,
+        "wear": np.float64,
+    }
+
+    def __init__(self, columns, codes, names, items=None):
+        """
+        Initializes a new instance of the MarketSnapshot class from prebuilt columns, see from_items.
+
+        Parameters:
+        - columns (dict): An array per field, all of the same length.
+        - codes (numpy.ndarray): The category code of each item's market_name.
+        - names (list): The market name of each category code.
+        - items (list): The items the columns were built from. Defaults to None.
+
+        Returns:
+        - None
+        """
+        self.columns = columns
+        self.codes = codes
+        self.names = names
+        self.items = items
+        self.name_codes = None
+
+    @classmethod
+    def from_items(cls, items, keep_items=True):
+        """
+        Builds a snapshot from a list of items, such as get_items returns.
+
+        Parameters:
+        - items (list): The items.
+        - keep_items (bool): Whether to keep the items, so to_items can return them. Defaults to True.
+
+        Returns:
+        - MarketSnapshot: The snapshot.
+        """
+        columns = {}
+        for field, dtype in cls.fields.items():
+            if dtype is np.int64:
+                try:
+                    columns[field] = np.fromiter((item[field] for item in items), dtype, len(items))
+                    continue
+                except (KeyError, TypeError):
+                    dtype = np.float64
+            # None becomes NaN
+            columns[field] = np.array([item.get(field) for item in items], dtype)
+        interned = {}
+        codes = np.fromiter((interned.setdefault(item.get("market_name"), len(interned)) for item in items), np.int32, len(items))
+        return cls(columns, codes, list(interned), list(items) if keep_items else None)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, field):
+        if field == "market_name":
+            return self.market_names()
+        return self.columns[field]
+
+    def __repr__(self):
+        return f"MarketSnapshot({len(self)} items, {len(self.names)} names)"
+
+    def market_names(self):
+        """
+        Returns each item's market name, as an object array.
+        """
+        return np.array(self.names, dtype=object)[self.codes]
+
+    def code(self, name):
+        """
+        Returns the category code of a market name, or -1 if no item has it.
+        """
+        if self.name_codes is None:
+            self.name_codes = {name: code for code, name in enumerate(self.names)}
+        return self.name_codes.get(name, -1)
+
+    def has_name(self, names):
+        """
+        Returns a mask of the items whose market name is one of names.
+
+        Parameters:
+        - names (str | iterable): The market name, or names.
+
+        Returns:
+        - numpy.ndarray: A boolean mask.
+        """
+        names = [names] if isinstance(names, str) else names
+        return np.isin(self.codes, [self.code(name) for name in names])
+
+    def lookup(self, values, default=np.nan):
+        """
+        Maps each item to a value by its market name, e.g. to price the whole listing against a price list.
+
+        Parameters:
+        - values (dict): A value per market name.
+        - default (float): The value of items whose name is not in values. Defaults to NaN.
+
+        Returns:
+        - numpy.ndarray: A float value per item.
+        """
+        by_code = np.fromiter((values.get(name, default) for name in self.names), np.float64, len(self.names))
+        return by_code[self.codes]
+
+    def select(self, mask):
+        """
+        Returns a new snapshot of the items selected by a boolean mask or an array of positions.
+
+        Parameters:
+        - mask (numpy.ndarray): A boolean mask, or positions, e.g. from numpy.argsort.
+
+        Returns:
+        - MarketSnapshot: The selected items, sharing names with this snapshot.
+        """
+        columns = {field: column[mask] for field, column in self.columns.items()}
+        items = None
+        if self.items is not None:
+            positions = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else mask
+            items = [self.items[position] for position in positions]
+        snapshot = MarketSnapshot(columns, self.codes[mask], self.names, items)
+        snapshot.name_codes = self.name_codes
+        return snapshot
+
+    def to_items(self):
+        """
+        Returns the items of the snapshot as the original dictionaries.
+
+        Returns:
+        - list: The items, in the snapshot's order.
+        """
+        if self.items is None:
+            raise ValueError("The snapshot was built with keep_items=False")
+        return list(self.items)
@@ -1,5 +1,8 @@
-import requests
-from ._types import Deposit, handle_error
+from ._types import Deposit, CustomError, RequestError
+from .transport import Transport
+from .inventory import InventoryCache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Deposits(dict):
@@ -9,22 +12,35 @@ class Deposits(dict):
     Attributes:
     - api_key (str): The API key used for authentication.
     - api_base_url (str): The base URL for API requests.
-    - headers (dict): The headers to include in API requests.
+    - transport (Transport): The pooled HTTP transport used for API requests.
     - deposit (Deposit): An instance of the Deposit class.
     - can_refresh (bool): Whether or not the server allows for refreshing the inventory.
+    - inventory (InventoryCache): The inventory as last fetched.
 
     Methods:
     - get_active_deposits(): Retrieves a list of the user's active deposits.
-    - get_inventory(force_refresh=False): Retrieves the user's inventory.
+    - get_inventory(force_refresh=False, max_age=None, view="listable"): Retrieves the user's inventory, from the cache while it is fresh.
+    - refresh_inventory(force_refresh=False): Fetches the inventory and returns what changed.
+    - list_items(items_with_percentages, batch_size=20): Lists many inventory items in as few requests as possible.
+    - cancel_many(deposits=None, predicate=None, max_workers=8): Cancels many active deposits concurrently.
+    - sell_now_many(deposits=None, predicate=None, max_workers=8): Sells many active deposits concurrently.
     """
 
-    def __init__(self, api_key, api_base_url):
+    # the default number of items sent to trading/deposit in a single request. The endpoint documents no
+    # limit; batches are kept small because a rejected batch is sent again one request per item, so the
+    # size bounds the extra calls a single bad item costs the listing budget
+    listing_batch_size = 20
+    # seconds a fetched inventory is served from the cache unless invalidated
+    inventory_ttl = 30
+
+    def __init__(self, api_key, api_base_url, transport=None):
         """
         Initializes a new instance of the Deposits class.
 
         Parameters:
         - api_key (str): The API key used for authentication.
         - api_base_url (str): The base URL for API requests.
+        - transport (Transport): A shared transport to send requests with. A new one is created if not provided.
 
         Returns:
         - None
@@ -32,8 +48,9 @@ class Deposits(dict):
 
         self.api_key = api_key
         self.api_base_url = api_base_url
-        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
-        self.deposit = Deposit(api_key, api_base_url)
+        self.transport = transport if transport is not None else Transport(api_key, api_base_url)
+        self.inventory = InventoryCache()
+        self.deposit = Deposit(self.transport, inventory=self.inventory)
         self.can_refresh = False
 
     def get_active_deposits(self):
@@ -47,53 +64,230 @@ class Deposits(dict):
         - list: A list of the user's active deposits.
         """
 
-        url = self.api_base_url+"trading/user/trades"
-        response = requests.get(url, headers=self.headers)
-
-        status = response.status_code
-        response = response.json()
+        response = self.transport.get("trading/user/trades", "Deposits", "get_active_deposits")
 
         active_deposits = []
         app = active_deposits.append
 
-        if status == 200:
-            for item in response['data']['deposits']:
-                app(Deposit(self.api_key, self.api_base_url, item))
-            return active_deposits
-        else:
-            handle_error(status, response, "Deposits", "get_active_deposits")
+        for item in response['data']['deposits']:
+            app(Deposit(self.transport, item, inventory=self.inventory))
+        return active_deposits
 
-    def get_inventory(self, force_refresh=False):
+    def get_inventory(self, force_refresh=False, max_age=None, view="listable"):
         """
-        Retrieves the user's inventory.
+        Retrieves the user's inventory, fetching it only if the cached one is stale.
 
         Parameters:
-        - force_refresh (bool): Whether or not to force a refresh of the inventory.
+        - force_refresh (bool): Whether or not to fetch the inventory and ask the server to refresh it.
+        - max_age (float): The age in seconds up to which the cached inventory is used. Defaults to inventory_ttl.
+        - view (str): "listable" for every valid, tradable item, or "sellable" for those also priced above 0. Defaults to "listable".
 
         Returns:
         - list: A list of the user's inventory items.
         """
+        if force_refresh or not self.inventory.is_fresh(max_age if max_age is not None else self.inventory_ttl):
+            self.refresh_inventory(force_refresh)
+        return self.inventory.view(view)
+
+    def refresh_inventory(self, force_refresh=False):
+        """
+        Fetches the user's inventory into the cache.
+
+        Parameters:
+        - force_refresh (bool): Whether or not to ask the server to refresh the inventory, if it allows it.
+
+        Returns:
+        - dict: Lists of the items added, removed and changed since the previous fetch.
+        """
 
         # if refresh is requested but server hasn't allowed refresh
-        if force_refresh and not self.can_refresh:  
+        if force_refresh and not self.can_refresh:
             force_refresh = False
 
-        url = self.api_base_url+"trading/user/inventory?update="+str(force_refresh)
-        response = requests.get(url, headers=self.headers)
-
-        status = response.status_code
-        response = response.json()
-
-        inventory = []
-        app = inventory.append
-
-        if status == 200:
-            self.can_refresh = response['allowUpdate']
-            for item in response['data']:
-                # skip any invalid items or items that are not tradable
-                if "invalid" in item or item['market_value'] < 0 or item['tradable'] is False:
-                    continue
-                app(Deposit(self.api_key, self.api_base_url, item))
-            return inventory
-        else:
-            handle_error(status, response, "Deposits", "get_inventory")
+        params = {"update": str(force_refresh)}
+        response = self.transport.get("trading/user/inventory", "Deposits", "get_inventory", params=params, budget="inventory")
+
+        self.can_refresh = response['allowUpdate']
+        return self.inventory.apply(response['data'], lambda item: Deposit(self.transport, item, inventory=self.inventory))
+
+    @classmethod
+    def listing_batches(cls, items_with_percentages, batch_size=None):
+        """
+        Splits items into trading/deposit request bodies of at most batch_size items.
+
+        Parameters:
+        - items_with_percentages (iterable): (item, percentage) pairs, where percentage is the custom price percentage.
+        - batch_size (int): The largest number of items per request. Defaults to listing_batch_size.
+
+        Returns:
+        - list: (item ids, request body) pairs, one per batch.
+        """
+        batch_size = batch_size or cls.listing_batch_size
+        items_with_percentages = list(items_with_percentages)
+        ids = [item['id'] for item, _ in items_with_percentages]
+        percentages = [percentage for _, percentage in items_with_percentages]
+        coin_values = [round(item['market_value'] * (percentage/100+1)) for item, percentage in items_with_percentages]
+
+        batches = []
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            batch = [
+                {"id": item_id, "custom_price_percentage": percentage, "coin_value": coin_value}
+                for item_id, percentage, coin_value in zip(ids[start:end], percentages[start:end], coin_values[start:end])
+            ]
+            batches.append((ids[start:end], {"items": batch}))
+        return batches
+
+    @staticmethod
+    def listing_results(ids, error=None):
+        """
+        Returns the list_items result of every item of a batch.
+
+        Parameters:
+        - ids (list): The ids of the batch's items.
+        - error (str): The error message if the batch failed. Defaults to None, for a listed batch.
+
+        Returns:
+        - list: A dictionary per item with its id, whether it was listed and the error message if it was not.
+        """
+        return [{"id": item_id, "success": error is None, "error": error} for item_id in ids]
+
+    @classmethod
+    def listing_failed(cls, error, ids, data, pending, results):
+        """
+        Decides what follows a trading/deposit request that failed, for list_items of both clients.
+
+        The API accepts or rejects a batch as a whole, so a batch rejected with a 400 is put back at the front
+        of pending as one request per item, and each item gets its own result. Any other API error fails the
+        batch. A rate limit or authentication error, or a failure to reach the API, also fails every batch
+        still pending rather than spending the budget on requests that would fail the same way.
+
+        Parameters:
+        - error (Exception): What the request raised.
+        - ids (list): The ids of the batch's items.
+        - data (dict): The batch's request body.
+        - pending (collections.deque): The (item ids, request body) pairs still to send.
+        - results (list): The results so far, extended with those of the failed items.
+        """
+        if isinstance(error, RequestError) and error.status == 400 and len(ids) > 1:
+            pending.extendleft(reversed([([item["id"]], {"items": [item]}) for item in data["items"]]))
+            return
+        message = cls.error_message(error)
+        results.extend(cls.listing_results(ids, message))
+        if not isinstance(error, RequestError):
+            for pending_ids, _ in pending:
+                results.extend(cls.listing_results(pending_ids, message))
+            pending.clear()
+
+    def list_items(self, items_with_percentages, batch_size=listing_batch_size):
+        """
+        Lists many inventory items, sending them in batches rather than one request per item.
+
+        A batch the API rejects is sent again one request per item, so every item's result is its own rather
+        than that of the batch it was sent in. Rate limit and authentication errors, and failures to reach the
+        API, stop the listing: the items not listed by then are reported as failed with that error, and the
+        results of the batches already sent are kept.
+
+        Parameters:
+        - items_with_percentages (iterable): (item, percentage) pairs, where item is an inventory item and percentage is the custom price percentage.
+        - batch_size (int): The largest number of items per request. Defaults to 20.
+
+        Returns:
+        - list: A dictionary per item, in the order given, with its id, whether it was listed and the error message if it was not.
+        """
+        results = []
+        pending = deque(self.listing_batches(items_with_percentages, batch_size))
+        while pending:
+            ids, data = pending.popleft()
+            try:
+                self.transport.post("trading/deposit", "Deposits", "list_items", data=data, budget="listing")
+            except Exception as e:
+                self.listing_failed(e, ids, data, pending, results)
+            else:
+                results.extend(self.listing_results(ids))
+                # listed items leave the listable inventory
+                self.inventory.invalidate()
+        return results
+
+    @staticmethod
+    def select_deposits(deposits, predicate):
+        if predicate is not None:
+            deposits = [deposit for deposit in deposits if predicate(deposit)]
+        return deposits
+
+    @staticmethod
+    def report(deposits, errors):
+        """
+        Aggregates the outcome of a bulk action.
+
+        Parameters:
+        - deposits (list): The deposits the action was run on.
+        - errors (list): The error message for each deposit, or None if it succeeded.
+
+        Returns:
+        - dict: The ids that succeeded, and the error message for each id that failed.
+        """
+        report = {"succeeded": [], "failed": {}}
+        for deposit, error in zip(deposits, errors):
+            if error is None:
+                report["succeeded"].append(deposit['id'])
+            else:
+                report["failed"][deposit['id']] = error
+        return report
+
+    @staticmethod
+    def error_message(error):
+        """
+        Returns the message recorded in a bulk action's report for an exception.
+
+        API errors are reported by their message, anything else, such as a timeout or a dropped
+        connection, by its type as well, so it can be told apart from a rejection.
+        """
+        if isinstance(error, CustomError):
+            return str(error)
+        return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+    def run_many(self, action, deposits, predicate, max_workers):
+        if deposits is None:
+            deposits = self.get_active_deposits()
+        deposits = self.select_deposits(deposits, predicate)
+
+        def run(deposit):
+            # every failure is recorded against its deposit, so one timeout does not lose the outcome of the others
+            try:
+                getattr(deposit, action)()
+            except Exception as e:
+                return self.error_message(e)
+            return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            errors = list(executor.map(run, deposits))
+        return self.report(deposits, errors)
+
+    def cancel_many(self, deposits=None, predicate=None, max_workers=8):
+        """
+        Cancels many active deposits concurrently over the shared connection pool.
+
+        Parameters:
+        - deposits (list): The deposits to cancel. Defaults to all active deposits.
+        - predicate (callable): Only deposits for which this returns True are cancelled. Defaults to None.
+        - max_workers (int): Maximum number of requests in flight at once. Defaults to 8.
+
+        Returns:
+        - dict: The ids that were cancelled, and the error message for each id that was not.
+        """
+        return self.run_many("cancel", deposits, predicate, max_workers)
+
+    def sell_now_many(self, deposits=None, predicate=None, max_workers=8):
+        """
+        Sells many active deposits concurrently over the shared connection pool.
+
+        Parameters:
+        - deposits (list): The deposits to sell. Defaults to all active deposits.
+        - predicate (callable): Only deposits for which this returns True are sold. Defaults to None.
+        - max_workers (int): Maximum number of requests in flight at once. Defaults to 8.
+
+        Returns:
+        - dict: The ids that were sold, and the error message for each id that was not.
+        """
+        return self.run_many("sell_now", deposits, predicate, max_workers)
@@ -0,0 +1,245 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Frame(list):
+    """
+    The items of a market frame as passed to batch handlers, carrying the time the frame was received.
+
+    Attributes:
+    - received_at (float): The perf_counter time the frame was received, that of the earliest update merged into it when coalesced. None if unknown.
+    """
+
+    __slots__ = ("received_at",)
+
+    def __init__(self, items=(), received_at=None):
+        super().__init__(items)
+        self.received_at = received_at
+
+
+def event_key(payload):
+    """
+    Returns the id of the item or trade an event is about, the trade id for trade_status frames.
+
+    Parameters:
+    - payload (any): An item, a trade_status frame, a deleted item id or any other event argument.
+
+    Returns:
+    - hashable: The id, or None if the payload has none.
+    """
+    if isinstance(payload, dict):
+        data = payload.get("data")
+        if isinstance(data, dict) and "id" in data:
+            return data["id"]
+        return payload.get("id")
+    return payload if isinstance(payload, (int, str)) else None
+
+
+class OrderedExecutor:
+    """
+    Runs handlers on single-thread workers picked by key, used by Gateway when handler_workers is set.
+
+    Everything submitted for a key runs on the same worker, one call after another in the order submitted,
+    so the events of an item or trade reach their handlers in the order they were received while events
+    of different items run in parallel.
+
+    Attributes:
+    - workers (list): A single-thread executor per worker.
+    """
+
+    def __init__(self, workers, thread_name_prefix="gateway-handler"):
+        """
+        Initializes a new instance of the OrderedExecutor class.
+
+        Parameters:
+        - workers (int): The number of worker threads.
+        - thread_name_prefix (str): Prefix of the worker thread names. Defaults to "gateway-handler".
+
+        Returns:
+        - None
+        """
+        self.workers = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{thread_name_prefix}-{index}") for index in range(workers)]
+
+    def shard(self, key):
+        """
+        Returns the worker that runs everything submitted for a key.
+        """
+        return self.workers[hash(key) % len(self.workers)]
+
+    def shutdown(self, wait=True):
+        for worker in self.workers:
+            worker.shutdown(wait=wait)
+
+
+class Dispatcher:
+    """
+    Routes gateway events to their handlers, used by Gateway in place of Observable.
+
+    Handlers for each event are kept in a tuple that is rebuilt on registration, so dispatching never
+    takes a lock or copies a list. Besides per-item handlers, batch handlers receive a whole frame's list
+    of items in a single call. With an executor, handlers run on its workers instead of the socket
+    thread, so a slow handler does not hold up receiving, and the events of each item or trade run on
+    the same worker so they stay in order.
+
+    Attributes:
+    - handlers (dict): A tuple of per-item handlers per event.
+    - batch_handlers (dict): A tuple of batch handlers per event.
+    - executor (OrderedExecutor): Runs handlers when set, otherwise they run inline.
+
+    Methods:
+    - on(event, handler=None): Registers a per-item handler, usable as a decorator.
+    - on_batch(event, handler=None): Registers a batch handler, usable as a decorator.
+    - once(event, handler=None): Registers a per-item handler that is removed after its first call.
+    - off(event=None, handler=None): Removes handlers.
+    - trigger(event, *args): Calls the per-item handlers of an event.
+    - trigger_batch(event, items): Calls the batch handlers of an event once, then its per-item handlers for each item.
+    """
+
+    def __init__(self, executor=None):
+        """
+        Initializes a new instance of the Dispatcher class.
+
+        Parameters:
+        - executor (OrderedExecutor): Runs handlers when set. Defaults to None, running them inline.
+
+        Returns:
+        - None
+        """
+        self.handlers = {}
+        self.batch_handlers = {}
+        self.executor = executor
+        self.lock = threading.Lock()
+
+    def register(self, table, event, handler):
+        with self.lock:
+            table[event] = table.get(event, ()) + (handler,)
+
+    def on(self, event, handler=None):
+        if handler is None:
+            def decorator(handler):
+                self.register(self.handlers, event, handler)
+                return handler
+            return decorator
+        self.register(self.handlers, event, handler)
+        return handler
+
+    def on_batch(self, event, handler=None):
+        if handler is None:
+            def decorator(handler):
+                self.register(self.batch_handlers, event, handler)
+                return handler
+            return decorator
+        self.register(self.batch_handlers, event, handler)
+        return handler
+
+    def once(self, event, handler=None):
+        if handler is None:
+            return lambda handler: self.once(event, handler)
+
+        def wrapper(*args, **kwargs):
+            self.off(event, wrapper)
+            return handler(*args, **kwargs)
+
+        self.register(self.handlers, event, wrapper)
+        return handler
+
+    def off(self, event=None, handler=None):
+        with self.lock:
+            if event is None:
+                self.handlers = {}
+                self.batch_handlers = {}
+            elif handler is None:
+                self.handlers.pop(event, None)
+                self.batch_handlers.pop(event, None)
+            else:
+                for table in (self.handlers, self.batch_handlers):
+                    remaining = tuple(registered for registered in table.get(event, ()) if registered != handler)
+                    if remaining:
+                        table[event] = remaining
+                    else:
+                        table.pop(event, None)
+
+    def has_handlers(self, event):
+        return event in self.handlers or event in self.batch_handlers
+
+    def call(self, handler, *args, **kwargs):
+        if self.executor is None:
+            handler(*args, **kwargs)
+        else:
+            worker = self.executor.shard(event_key(args[0]) if args else None)
+            self.submit(worker, handler, *args, **kwargs)
+
+    def submit(self, worker, handler, *args, **kwargs):
+        worker.submit(handler, *args, **kwargs).add_done_callback(self.report_exception)
+
+    @staticmethod
+    def call_each(handlers, items):
+        # runs on a worker, where one failing call must not skip the items after it
+        for item in items:
+            for handler in handlers:
+                try:
+                    handler(item)
+                except Exception:
+                    traceback.print_exc()
+
+    @staticmethod
+    def report_exception(future):
+        exception = future.exception()
+        if exception is not None:
+            traceback.print_exception(type(exception), exception, exception.__traceback__)
+
+    def trigger(self, event, *args, **kwargs):
+        """
+        Calls the per-item handlers of an event.
+
+        Parameters:
+        - event (str): The name of the event.
+        - *args: Passed on to every handler.
+        - **kwargs: Passed on to every handler.
+
+        Returns:
+        - bool: Whether any handler was called.
+        """
+        handlers = self.handlers.get(event)
+        if not handlers:
+            return False
+        for handler in handlers:
+            self.call(handler, *args, **kwargs)
+        return True
+
+    def trigger_batch(self, event, items):
+        """
+        Calls the batch handlers of an event with every item at once, then its per-item handlers for each item.
+
+        Parameters:
+        - event (str): The name of the event.
+        - items (list): The items received in a single frame.
+
+        Returns:
+        - bool: Whether any handler was called.
+        """
+        batch_handlers = self.batch_handlers.get(event, ())
+        handlers = self.handlers.get(event, ())
+        if self.executor is None:
+            for handler in batch_handlers:
+                handler(items)
+            if handlers:
+                for item in items:
+                    for handler in handlers:
+                        handler(item)
+            return bool(batch_handlers or handlers)
+
+        # the frame is split by worker, and each worker's part runs as one task per batch handler and one for
+        # the per-item handlers, so an item's events never overtake each other across frames
+        shards = {}
+        for item in items:
+            shards.setdefault(self.executor.shard(event_key(item)), []).append(item)
+        received_at = getattr(items, "received_at", None)
+        for worker, part in shards.items():
+            part = Frame(part, received_at)
+            for handler in batch_handlers:
+                self.submit(worker, handler, part)
+            if handlers:
+                self.submit(worker, self.call_each, handlers, part)
+        return bool(batch_handlers or handlers)
@@ -0,0 +1,40 @@
+from urllib.parse import urlparse
+from ._types import InvalidDomain
+
+
+accepted_domains = [
+    "https://csgoempire.com",
+    "https://csgoempire.gg",
+    "https://csgoempire.tv",
+    "https://csgoempiretr.com",
+    "https://csgoempire88.com",
+    "https://csgoempire.cam",
+    "https://csgoempirev2.com",
+    "https://csgoempire.io",
+    "https://csgoempire.info",
+    "https://csgoempire.vip",
+    "https://csgoempire.fun",
+    "https://csgoempire.biz",
+    "https://csgoempire.vegas",
+    "https://csgoempire.link"
+]
+
+# hosts accepted over plain http on any port, e.g. a local MockServer
+local_hosts = ["localhost", "127.0.0.1", "::1"]
+
+
+def normalize_domain(domain):
+    local = urlparse(domain if "://" in domain else f"http://{domain}")
+    if local.hostname in local_hosts:
+        return f"{local.scheme}://{local.netloc}"
+
+    if "https://" not in domain.lower():
+        domain = f"https://{domain}"
+
+    if domain[-1] == "/":
+        domain = domain[:-1]
+
+    if domain.lower() not in accepted_domains:
+        accepted_domains_hr = ',\n'.join(accepted_domains)
+        raise InvalidDomain(f"Invalid domain provided\n\nDomain provided:\n{domain}\n\nAccepted domains:\n{accepted_domains_hr}\n\nPlease change your domain to one of these accepted domains.\n")
+    return domain
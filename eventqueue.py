@@ -0,0 +1,141 @@
+import threading
+from collections import deque
+
+
+class EventQueue:
+    """
+    A bounded queue between the socket receive thread and event dispatch, used by Gateway in buffered mode.
+
+    Frames are queued item by item so that a full queue can shed or merge individual items. What happens
+    when the queue is full depends on the overflow policy:
+
+    - "block": the receive thread waits until there is room, pushing back on the socket.
+    - "drop_oldest": the oldest queued item is discarded to make room.
+    - "coalesce": an update for an item that is already queued is merged into the queued update, whether
+      or not the queue is full. When the queue is full and nothing can be merged, the oldest item is dropped.
+
+    Attributes:
+    - maxsize (int): The maximum number of queued items.
+    - overflow (str): The overflow policy.
+    - enqueued (int): The number of items accepted into the queue.
+    - dispatched (int): The number of items taken off the queue.
+    - dropped (int): The number of items discarded because the queue was full.
+    - coalesced (int): The number of updates merged into an already queued update.
+    - max_depth (int): The largest number of items queued at once.
+    """
+
+    overflow_policies = ("block", "drop_oldest", "coalesce")
+
+    def __init__(self, maxsize=10000, overflow="block"):
+        """
+        Initializes a new instance of the EventQueue class.
+
+        Parameters:
+        - maxsize (int): The maximum number of queued items. Defaults to 10000.
+        - overflow (str): One of overflow_policies. Defaults to "block".
+
+        Returns:
+        - None
+        """
+        if overflow not in self.overflow_policies:
+            raise ValueError(f"overflow must be one of {self.overflow_policies}, not {overflow!r}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.entries = deque()
+        # queued entries that later updates may be merged into, keyed by (event, item id)
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.closed = False
+        self.enqueued = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, event, payload, key=None, received_at=None):
+        """
+        Queues a single item.
+
+        Parameters:
+        - event (str): The name of the socket event the item arrived with.
+        - payload (any): The item.
+        - key (hashable): Identifies updates that may be merged under the "coalesce" policy. Defaults to None.
+        - received_at (float): The perf_counter time the item's frame was received. Defaults to None.
+        """
+        with self.condition:
+            if key is not None and self.overflow == "coalesce":
+                entry = self.pending.get(key)
+                if entry is not None:
+                    entry[1] = {**entry[1], **payload}
+                    self.coalesced += 1
+                    return
+
+            while len(self.entries) >= self.maxsize and not self.closed:
+                if self.overflow == "block":
+                    self.condition.wait()
+                else:
+                    dropped = self.entries.popleft()
+                    if dropped[2] is not None:
+                        self.pending.pop(dropped[2], None)
+                    self.dropped += 1
+
+            # a merged update keeps the time of the earliest frame merged into it
+            entry = [event, payload, key, received_at]
+            self.entries.append(entry)
+            if key is not None:
+                self.pending[key] = entry
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self.entries))
+            self.condition.notify_all()
+
+    def get_batch(self, max_items=1000):
+        """
+        Waits for queued items and takes up to max_items of them off the queue.
+
+        Parameters:
+        - max_items (int): The maximum number of items returned. Defaults to 1000.
+
+        Returns:
+        - list: (event, payload, received_at) tuples in arrival order, or None once the queue is closed.
+        """
+        with self.condition:
+            while not self.entries and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            batch = []
+            for _ in range(min(max_items, len(self.entries))):
+                event, payload, key, received_at = self.entries.popleft()
+                if key is not None:
+                    self.pending.pop(key, None)
+                batch.append((event, payload, received_at))
+            self.dispatched += len(batch)
+            self.condition.notify_all()
+            return batch
+
+    def close(self):
+        """
+        Closes the queue, releasing any waiting producer and consumer.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self):
+        """
+        Returns the queue's counters.
+
+        Returns:
+        - dict: The current depth and every counter.
+        """
+        return {
+            "depth": len(self.entries),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dispatched": self.dispatched,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
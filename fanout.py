@@ -0,0 +1,416 @@
+"""
+Fans socket events out from the process owning the Gateway to worker processes, through a ring buffer
+in shared memory.
+
+The publisher encodes each item of a frame into its own record, headed by its event and item id, so
+consumers skip the records they did not subscribe to without decoding them, and decode the rest straight
+from shared memory. The ring is single producer, many consumers: every consumer reads every record at
+its own pace, and one that falls more than a ring behind skips ahead and counts what it missed.
+"""
+import multiprocessing
+import struct
+import threading
+from multiprocessing import shared_memory
+from time import sleep
+
+from .codec import codec as default_codec
+
+# magic, capacity, write position, closed, reserved position
+header = struct.Struct("<8sQQQQ")
+header_size = 64
+magic = b"CSGOFAN1"
+write_position_offset = 16
+closed_offset = 24
+reserved_position_offset = 32
+position = struct.Struct("<Q")
+# payload length, event code, unused, shard key
+record_header = struct.Struct("<IHHq")
+padding = 0xFFFF
+
+events = ("new_item", "updated_item", "auction_update", "deleted_item", "trade_status")
+event_codes = {event: code for code, event in enumerate(events)}
+default_events = ("new_item", "auction_update", "deleted_item", "trade_status")
+
+
+def align(size):
+    return (size + 7) & ~7
+
+
+def attach(name):
+    # consumers must not unlink the segment when they exit, which the resource tracker does before 3.13
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def shard_of(key, shards):
+    """
+    Returns the shard an item id belongs to.
+    """
+    return key % shards
+
+
+class FanoutPublisher:
+    """
+    Publishes a gateway's events into a shared memory ring buffer for FanoutConsumers in other processes.
+
+    Usage:
+        publisher = FanoutPublisher(capacity=64 * 1024 * 1024)
+        publisher.attach(client.gateway)
+        workers = publisher.start_workers(evaluate, workers=4, events=["new_item", "auction_update"])
+
+    Attributes:
+    - name (str): The name of the shared memory block, which consumers attach to.
+    - capacity (int): The size of the ring in bytes.
+    - events (tuple): The events published by attach.
+    - published (int): The number of records published.
+    - codec (Codec): Encodes the records.
+    """
+
+    def __init__(self, capacity=64 * 1024 * 1024, name=None, events=default_events, codec=None):
+        """
+        Initializes a new instance of the FanoutPublisher class, creating the shared memory block.
+
+        Parameters:
+        - capacity (int): The size of the ring in bytes. A record may take at most an eighth of it. Defaults to 64 MiB.
+        - name (str): The name of the shared memory block. Defaults to None, generating a unique name.
+        - events (list): The events published by attach, from fanout.events. Defaults to new_item, auction_update, deleted_item and trade_status.
+        - codec (Codec): The JSON codec records are encoded with. Defaults to the fastest installed backend.
+
+        Returns:
+        - None
+        """
+        unknown = set(events) - set(event_codes)
+        if unknown:
+            raise ValueError(f"Unknown events {sorted(unknown)}, expected some of {tuple(event_codes)}")
+        self.capacity = align(capacity)
+        self.max_record = self.capacity // 8
+        self.events = tuple(events)
+        self.codec = codec if codec is not None else default_codec
+        self.memory = shared_memory.SharedMemory(name=name, create=True, size=header_size + self.capacity)
+        self.name = self.memory.name
+        self.buffer = self.memory.buf
+        header.pack_into(self.buffer, 0, magic, self.capacity, 0, 0, 0)
+        self.write_position = 0
+        self.pending_position = 0
+        self.published = 0
+        self.lock = threading.Lock()
+        self.gateway = None
+        self.handlers = []
+        self.workers = []
+
+    # publishing
+
+    def publish(self, event, key, data):
+        """
+        Writes a record to the ring, visible to consumers once written in full.
+
+        Parameters:
+        - event (str): The event name, from fanout.events.
+        - key (int): The shard key, usually the item id.
+        - data: The record's data, encoded with the codec.
+        """
+        payload = self.codec.dumps(data)
+        size = record_header.size + len(payload)
+        if size > self.max_record:
+            raise ValueError(f"A record of {size} bytes does not fit a ring of {self.capacity} bytes")
+        with self.lock:
+            start = self.reserve(size)
+            record_header.pack_into(self.buffer, start, len(payload), event_codes[event], 0, key)
+            self.buffer[start + record_header.size:start + size] = payload
+            self.commit()
+
+    def reserve(self, size):
+        """
+        Claims the space for a record of size bytes and announces it before anything is overwritten.
+
+        Consumers compare the reserved position with their own, so a record they are reading is known to be
+        intact as long as it lies less than a ring behind it, including while the record being written wraps
+        around and overwrites the start of the ring.
+
+        Parameters:
+        - size (int): The size of the record, header included.
+
+        Returns:
+        - int: The offset in the shared memory block to write the record at.
+        """
+        write_position = self.write_position
+        offset = write_position % self.capacity
+        remaining = self.capacity - offset
+        if remaining < size:
+            # records do not wrap, the rest of the ring is skipped instead
+            write_position += remaining
+        self.pending_position = write_position + align(size)
+        position.pack_into(self.buffer, reserved_position_offset, self.pending_position)
+        if remaining < size and remaining >= record_header.size:
+            record_header.pack_into(self.buffer, header_size + offset, 0, padding, 0, 0)
+        return header_size + write_position % self.capacity
+
+    def commit(self):
+        """
+        Makes the record written since reserve visible to consumers.
+        """
+        self.write_position = self.pending_position
+        # published last, so consumers never read a record that is still being written
+        position.pack_into(self.buffer, write_position_offset, self.write_position)
+        self.published += 1
+
+    def publish_items(self, event, items):
+        for item in items:
+            self.publish(event, item["id"], item)
+
+    def publish_deleted(self, item_ids):
+        for item_id in item_ids:
+            self.publish("deleted_item", item_id, item_id)
+
+    def publish_trade(self, frame):
+        data = frame["data"]
+        key = data.get("item_id")
+        self.publish("trade_status", key if key is not None else data.get("id") or 0, frame)
+
+    def attach(self, gateway):
+        """
+        Publishes the events in events as a gateway receives them, one record per item.
+
+        Handlers stay registered across automatic reconnects; attach again to the new gateway after Client.reconnect.
+
+        Parameters:
+        - gateway (Gateway): The gateway to listen to.
+        """
+        self.gateway = gateway
+        self.handlers = []
+        for event in self.events:
+            if event == "deleted_item":
+                self.handlers.append(("on_deleted_item", self.publish_deleted))
+            elif event == "trade_status":
+                self.handlers.append(("on_trade_status", self.publish_trade))
+            else:
+                self.handlers.append((f"on_{event}", lambda items, event=event: self.publish_items(event, items)))
+        for event, handler in self.handlers:
+            if event == "on_trade_status":
+                gateway.on(event, handler)
+            else:
+                gateway.on_batch(event, handler)
+
+    # workers
+
+    def start_workers(self, handler, workers=None, events=None, shard=True):
+        """
+        Starts worker processes consuming the ring, each calling handler with every record it receives.
+
+        Every worker reads from the records published after this call, however long its process takes to
+        start; if the ring wraps before a worker attaches, the records it missed are counted as dropped.
+
+        Parameters:
+        - handler (function): Called with (event, data) for each record. It must be importable from a module, as the workers may be spawned.
+        - workers (int): The number of worker processes. Defaults to the number of CPUs.
+        - events (list): The events the workers subscribe to. Defaults to every published event.
+        - shard (bool): Whether each worker receives only its share of item ids, rather than every record. Defaults to True.
+
+        Returns:
+        - list: The started multiprocessing.Process objects.
+        """
+        workers = workers or multiprocessing.cpu_count()
+        start_position = self.write_position
+        for index in range(workers):
+            shards = (index, workers) if shard else None
+            process = multiprocessing.Process(target=consume, args=(self.name, handler, events, shards, start_position), name=f"fanout-{index}", daemon=True)
+            process.start()
+            self.workers.append(process)
+        return list(self.workers)
+
+    def close(self, timeout=5):
+        """
+        Marks the ring closed, waits for the workers to drain it, then frees the shared memory.
+
+        Parameters:
+        - timeout (float): The number of seconds to wait for each worker. Defaults to 5.
+        """
+        if self.gateway is not None and self.gateway.events is not None:
+            for event, handler in self.handlers:
+                self.gateway.events.off(event, handler)
+        position.pack_into(self.buffer, closed_offset, 1)
+        for process in self.workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.workers = []
+        self.buffer = None
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FanoutConsumer:
+    """
+    Reads the records of a FanoutPublisher's ring, from the point it attached at or a given start position.
+
+    Records are filtered on their header, by event and by shard of the item id, so only the records
+    subscribed to are decoded, directly from shared memory.
+
+    Usage:
+        consumer = FanoutConsumer(name, events=["new_item"], shard=(0, 4))
+        for event, item in consumer:
+            ...
+
+    Attributes:
+    - name (str): The name of the shared memory block.
+    - events (frozenset): The event codes subscribed to, None for every event.
+    - shard (tuple): (index, count) of the item ids received, None for every item.
+    - received (int): The number of records returned.
+    - dropped (int): The number of times the consumer fell a ring behind and skipped ahead.
+    """
+
+    def __init__(self, name, events=None, shard=None, codec=None, poll_interval=0.0005, start_position=None):
+        """
+        Initializes a new instance of the FanoutConsumer class, attaching to the shared memory block.
+
+        Parameters:
+        - name (str): The name of the publisher's shared memory block.
+        - events (list): The events to receive. Defaults to None, receiving every event.
+        - shard (tuple): (index, count) to only receive item ids whose shard_of is index. Defaults to None.
+        - codec (Codec): The JSON codec records are decoded with. Defaults to the fastest installed backend.
+        - poll_interval (float): The longest time in seconds slept between checks while the ring is empty. Defaults to 0.0005.
+        - start_position (int): The write position to read from, e.g. taken before the consumer's process started. Defaults to None, reading from the current one.
+
+        Returns:
+        - None
+        """
+        self.memory = attach(name)
+        self.name = name
+        self.buffer = self.memory.buf
+        found, self.capacity, write_position, _, _ = header.unpack_from(self.buffer, 0)
+        if found != magic:
+            raise ValueError(f"{name!r} is not a fanout ring")
+        self.read_position = write_position if start_position is None else start_position
+        self.events = frozenset(event_codes[event] for event in events) if events is not None else None
+        self.shard = tuple(shard) if shard is not None else None
+        codec = codec if codec is not None else default_codec
+        # the standard library does not decode from a memoryview
+        self.loads = codec.loads if codec.name != "json" else lambda view: codec.loads(bytes(view))
+        self.poll_interval = poll_interval
+        self.received = 0
+        self.dropped = 0
+
+    def write_position(self):
+        return position.unpack_from(self.buffer, write_position_offset)[0]
+
+    def overwritten(self, read_position):
+        # the publisher announces how far it is about to write before writing, so whatever lies less than a
+        # ring behind that position is intact
+        return position.unpack_from(self.buffer, reserved_position_offset)[0] - read_position > self.capacity
+
+    @property
+    def closed(self):
+        return position.unpack_from(self.buffer, closed_offset)[0] == 1
+
+    def lag(self):
+        """
+        Returns the number of bytes written to the ring that the consumer has not read yet.
+        """
+        return self.write_position() - self.read_position
+
+    def wants(self, code, key):
+        if self.events is not None and code not in self.events:
+            return False
+        return self.shard is None or shard_of(key, self.shard[1]) == self.shard[0]
+
+    def poll(self, max_records=1000):
+        """
+        Returns the records written since the last call, without waiting.
+
+        Parameters:
+        - max_records (int): The maximum number of records returned. Defaults to 1000.
+
+        Returns:
+        - list: (event, data) for each record subscribed to.
+        """
+        records = []
+        buffer = self.buffer
+        capacity = self.capacity
+        write_position = self.write_position()
+        read_position = self.read_position
+        while read_position < write_position and len(records) < max_records:
+            if self.overwritten(read_position):
+                # lapped by the publisher, whatever is left of the ring at this position is being overwritten
+                self.dropped += 1
+                read_position = self.write_position()
+                break
+            offset = read_position % capacity
+            remaining = capacity - offset
+            if remaining < record_header.size:
+                read_position += remaining
+                continue
+            start = header_size + offset
+            length, code, _, key = record_header.unpack_from(buffer, start)
+            if self.overwritten(read_position):
+                # the header may have been overwritten while it was read
+                continue
+            if code == padding:
+                read_position += remaining
+                continue
+            if self.wants(code, key):
+                try:
+                    data = self.loads(buffer[start + record_header.size:start + record_header.size + length])
+                except Exception:
+                    if self.overwritten(read_position):
+                        # a torn record, overwritten while decoding
+                        continue
+                    raise
+                if self.overwritten(read_position):
+                    # overwritten while decoding
+                    continue
+                records.append((events[code], data))
+            read_position += align(record_header.size + length)
+        self.read_position = read_position
+        self.received += len(records)
+        return records
+
+    def __iter__(self):
+        """
+        Yields (event, data) for each record subscribed to, waiting for new ones, until the ring is closed and drained.
+        """
+        delay = 0
+        while True:
+            records = self.poll()
+            if records:
+                delay = 0
+                yield from records
+                continue
+            if self.read_position >= self.write_position() and self.closed:
+                return
+            # back off gradually, so a busy ring is read without sleeping and an idle one without spinning
+            delay = min(self.poll_interval, delay * 2 or 0.00001)
+            sleep(delay)
+
+    def close(self):
+        """
+        Detaches from the shared memory block.
+        """
+        self.buffer = None
+        self.memory.close()
+
+
+def consume(name, handler, events=None, shard=None, start_position=None):
+    """
+    Calls handler with every record subscribed to until the ring is closed, the target of worker processes.
+
+    Parameters:
+    - name (str): The name of the publisher's shared memory block.
+    - handler (function): Called with (event, data) for each record.
+    - events (list): The events to receive. Defaults to None, receiving every event.
+    - shard (tuple): (index, count) of the item ids to receive. Defaults to None.
+    - start_position (int): The write position to read from. Defaults to None, reading from the current one.
+    """
+    consumer = FanoutConsumer(name, events, shard, start_position=start_position)
+    try:
+        for event, data in consumer:
+            handler(event, data)
+    finally:
+        consumer.close()
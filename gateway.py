@@ -1,16 +1,27 @@
 import socketio
+import threading
+import traceback
 from signal import SIGINT
 from os import kill, getpid, environ
 from .metadata import Metadata
-from observable import Observable
-from json import dumps
-import threading
+from .dispatcher import Dispatcher, Frame, OrderedExecutor
+from .eventqueue import EventQueue
+from .coalesce import UpdateCoalescer
+from .codec import socket_json
+from .trades import status_names, final_statuses
+from time import perf_counter
+from itertools import groupby
+from operator import itemgetter
 from urllib.parse import urlparse
 
 
 class Gateway:
-    # logger
-    def __init__(self, api_key, api_base_url, logger=False, engineio_logger=False, domain="csgoempire.com", custom_ws_url=False):
+    # socket events carrying updates to an existing item, which may be merged per item id
+    coalescable_events = ("updated_item", "auction_update")
+    # socket events carrying market listings rather than the user's own trades
+    market_events = ("new_item", "updated_item", "auction_update", "deleted_item")
+
+    def __init__(self, api_key, api_base_url, logger=False, engineio_logger=False, domain="csgoempire.com", custom_ws_url=False, metadata=None, handler_workers=0, buffered=False, queue_size=10000, overflow="block", coalesce_window=None, recorder=None, metrics=None, market_data=True):
         """
         Constructor method for Gateway class.
 
@@ -20,6 +31,16 @@ class Gateway:
         - logger (bool): Whether to enable debug logging or not. Defaults to False.
         - engineio_logger (bool): Whether to enable engineio logging or not. Defaults to False.
         - domain (str): Domain name for the server. Defaults to "csgoempire.com".
+        - custom_ws_url (bool): Whether domain is a full websocket host rather than the site domain. Defaults to False.
+        - metadata (Metadata): Metadata used to identify the socket. A new one is fetched if not provided.
+        - handler_workers (int): Number of worker threads event handlers run on, 0 to run them on the socket thread. Events of the same item or trade always run on the same worker, in order. Defaults to 0.
+        - buffered (bool): Whether to queue frames and dispatch them from a separate thread. Defaults to False.
+        - queue_size (int): The maximum number of items queued in buffered mode. Defaults to 10000.
+        - overflow (str): What to do when the queue is full, one of "block", "drop_oldest" or "coalesce". Defaults to "block".
+        - coalesce_window (float): If set, updated_item and auction_update frames are merged per item for this many seconds before being dispatched. Defaults to None.
+        - recorder (FrameRecorder): If set, every raw frame received is written to it. Defaults to None.
+        - metrics (Metrics): If set, frames received and the time spent in each event's handler are recorded. Defaults to None.
+        - market_data (bool): Whether to subscribe to market listings. Without them only the user's trade events are received, e.g. when another gateway already carries the market. Defaults to True.
         """
         self.api_key = api_key
         self.api_base_url = api_base_url
@@ -35,17 +56,30 @@ class Gateway:
         self.auth = None
         self.sio = None
         self.events = None
-        self.metadata = Metadata(self.api_key, self.api_base_url)
+        self.metadata = metadata if metadata is not None else Metadata(self.api_key, self.api_base_url)
         self.debug_logger = logger
         self.debug_engineio_logger = engineio_logger
-        self.last_status = None
+        # the last known status of each trade, keyed by trade id
+        self.last_statuses = {}
+        # set while an identify frame is awaiting its authenticated init frame
+        self.identify_pending = False
         # remove protocol from domain if exists
         parsed_url = urlparse(domain)
         if parsed_url.scheme:
             self.domain = parsed_url.netloc
         else:
             self.domain = domain
+        self.domain_scheme = parsed_url.scheme
         self.custom_websocket_url = custom_ws_url
+        self.handler_executor = OrderedExecutor(handler_workers) if handler_workers > 0 else None
+        self.queue = EventQueue(queue_size, overflow) if buffered else None
+        self.dispatch_thread = None
+        self.coalescer = UpdateCoalescer(coalesce_window, self.deliver) if coalesce_window is not None else None
+        self.recorder = recorder
+        self.metrics = metrics
+        self.market_data = market_data
+        # the handler of each socket event, built once as every frame is passed through it
+        self.handlers = self.frame_handlers()
 
     def kill_connection(self):
         """
@@ -59,17 +93,26 @@ class Gateway:
         Method that sets up the WebSocket connection and registers event handlers.
         """
         user_agent = f"{self.metadata.user_id} API Bot | Python Library"
-        self.events = Observable()
+        self.events = Dispatcher(self.handler_executor)
         if self.is_connected is False and self.socket is None:
             self.sio = socketio.Client(
                 logger=self.debug_logger,
                 engineio_logger=self.debug_engineio_logger,
                 reconnection=True,
+                json=socket_json,
             )
 
+            # handlers are registered before connecting so the connect and first init frames are not missed
+            self.sio.on("connect", handler=self.connected)
+            self.sio.on("disconnect", handler=self.disconnected)
+            self.sio.on("connect_error", handler=self.connect_error)
+            for event, handler in self.handlers.items():
+                self.sio.on(event, handler=self.receiver(event, handler), namespace="/trade")
+            self.start_dispatch()
+
             try:
                 options = {
-                    "url": f"wss://trade.{self.domain}" if self.custom_websocket_url is False else f"wss://{self.domain}",
+                    "url": self.websocket_url(),
                     "socketio_path": "/s/",
                     "headers": {"User-agent": user_agent},
                     "transports": ["websocket"],
@@ -79,26 +122,167 @@ class Gateway:
             except Exception as e:
                 print(f"WS Connection error (gateway): {e} | {options}")
 
-        self.sio.on("connect", handler=self.connected)
-        self.sio.on("disconnect", handler=self.disconnected)
-        self.sio.on("connect_error", handler=self.connect_error)
-        self.sio.on("init", handler=self.init_handler, namespace="/trade")
-        self.sio.on("new_item", handler=self.new_item_handler, namespace="/trade")
-        self.sio.on(
-            "updated_item", handler=self.updated_item_handler, namespace="/trade"
-        )
-        self.sio.on(
-            "auction_update", handler=self.auction_update_handler, namespace="/trade"
-        )
-        self.sio.on(
-            "deleted_item", handler=self.deleted_item_handler, namespace="/trade"
-        )
-        self.sio.on(
-            "trade_status", handler=self.trade_status_handler, namespace="/trade"
-        )
-        self.sio.on(
-            "deposit_failed", handler=self.failed_deposit_handler, namespace="/trade"
-        )
+    def websocket_url(self):
+        """
+        Method that returns the URL the WebSocket connects to.
+
+        Returns:
+        - str: The trade subdomain of the site, or the custom URL itself, over ws:// if it was given as http:// or ws://.
+        """
+        scheme = "ws" if self.domain_scheme in ("http", "ws") else "wss"
+        return f"{scheme}://trade.{self.domain}" if self.custom_websocket_url is False else f"{scheme}://{self.domain}"
+
+    def start_dispatch(self):
+        """
+        Method that starts the dispatch thread in buffered mode, if it is not already running.
+        """
+        if self.queue is not None and self.dispatch_thread is None:
+            if self.queue.closed:
+                self.queue = EventQueue(self.queue.maxsize, self.queue.overflow)
+            self.dispatch_thread = threading.Thread(target=self.dispatch_loop, name="gateway-dispatch", daemon=True)
+            self.dispatch_thread.start()
+
+    def frame_handlers(self):
+        """
+        Method that returns the handler for each socket event received on the /trade namespace.
+
+        Returns:
+        - dict: Handler functions keyed by socket event name, timed when metrics are enabled.
+        """
+        handlers = {
+            "init": self.init_handler,
+            "new_item": self.new_item_handler,
+            "updated_item": self.updated_item_handler,
+            "auction_update": self.auction_update_handler,
+            "deleted_item": self.deleted_item_handler,
+            "trade_status": self.trade_status_handler,
+            "deposit_failed": self.failed_deposit_handler,
+        }
+        if not self.market_data:
+            handlers = {event: handler for event, handler in handlers.items() if event not in self.market_events}
+        if self.metrics is None:
+            return handlers
+        return {event: self.metrics.timed(event, handler) for event, handler in handlers.items()}
+
+    def receiver(self, event, handler):
+        """
+        Method that returns the function registered with socketio for a socket event.
+
+        Parameters:
+        - event (str): Name of the socket event.
+        - handler (function): The handler the event is dispatched to.
+
+        Returns:
+        - function: A function recording the frame if a recorder or metrics are set, then passing it on to its handler.
+          Market frames are passed on as a Frame carrying the time they were received.
+        """
+        target = self.route(event, handler)
+        stamped = event in self.market_events
+
+        def receive(data):
+            received_at = perf_counter()
+            if self.metrics is not None:
+                self.metrics.frame(event, data)
+            if self.recorder is not None:
+                self.recorder.record(event, data)
+            if stamped:
+                data = Frame(data if isinstance(data, list) else [data], received_at)
+            target(data)
+        return receive
+
+    def route(self, event, handler):
+        """
+        Method that returns where a socket event's frames go: the handler itself, the coalescer or the queue.
+
+        Parameters:
+        - event (str): Name of the socket event.
+        - handler (function): The handler the event is dispatched to.
+
+        Returns:
+        - function: The function frames of the event are passed to.
+        """
+        if self.coalescer is not None:
+            if event in self.coalescable_events:
+                return lambda data: self.coalescer.add(event, data)
+            if event == "deleted_item":
+                # pending updates must not be delivered after the deletion
+                return lambda data: self.coalescer.delete(event, data)
+        if self.queue is None:
+            return handler
+        return lambda data: self.enqueue(event, data)
+
+    def deliver(self, event, data):
+        """
+        Method that passes a frame on to its handler, through the queue in buffered mode.
+
+        Parameters:
+        - event (str): Name of the socket event.
+        - data (any): The frame's data.
+        """
+        if self.queue is None:
+            self.handlers[event](data)
+        else:
+            self.enqueue(event, data)
+
+    def enqueue(self, event, data):
+        """
+        Method that splits a frame into items and queues them for the dispatch thread.
+
+        Parameters:
+        - event (str): Name of the socket event.
+        - data (any): The frame's data.
+        """
+        if event == "init":
+            self.queue.put(event, data)
+            return
+        received_at = getattr(data, "received_at", None)
+        data = data if isinstance(data, list) else [data]
+        # updates to the same item may be merged while queued
+        coalescable = event in self.coalescable_events
+        for item in data:
+            key = (event, item["id"]) if coalescable and isinstance(item, dict) else None
+            self.queue.put(event, item, key, received_at)
+
+    def dispatch_loop(self):
+        """
+        Method run by the dispatch thread in buffered mode, passing queued items on to their handlers.
+
+        Consecutive items of the same event are handed over as a single Frame, as if they had arrived in one,
+        received when the earliest of them was.
+        """
+        handlers = self.handlers
+        while True:
+            batch = self.queue.get_batch()
+            if batch is None:
+                return
+            for event, entries in groupby(batch, key=itemgetter(0)):
+                try:
+                    if event == "init":
+                        for _, payload, _ in entries:
+                            handlers[event](payload)
+                    else:
+                        entries = list(entries)
+                        handlers[event](Frame([payload for _, payload, _ in entries], entries[0][2]))
+                except Exception:
+                    traceback.print_exc()
+
+    def queue_stats(self):
+        """
+        Method that returns the buffered mode queue's depth and counters.
+
+        Returns:
+        - dict: The queue's counters, or None if the gateway is not buffered.
+        """
+        return self.queue.stats() if self.queue is not None else None
+
+    def coalesce_stats(self):
+        """
+        Method that returns the coalescer's counters.
+
+        Returns:
+        - dict: The number of updates received, delivered and pending, or None if coalescing is disabled.
+        """
+        return self.coalescer.stats() if self.coalescer is not None else None
 
     def identify(self):
         """
@@ -106,6 +290,7 @@ class Gateway:
         """
         if self.is_authed is False:
             self.auth = self.metadata.get_identify()
+            self.identify_pending = True
             self.send("identify", self.auth, namespace="/trade")
 
     def emit_filters(self):
@@ -130,15 +315,25 @@ class Gateway:
         """
         self.events.on(event, handler)
 
+    def on_batch(self, event, handler):
+        """
+        Method that registers a handler receiving every item of a frame in a single call.
+
+        Parameters:
+        - event (str): Name of the event to register a handler for, e.g. "on_new_item".
+        - handler (function): Handler function called with the list of items.
+        """
+        self.events.on_batch(event, handler)
+
     def get_events(self):
         """
         Method that returns the events object.
 
         Returns:
-        - events (Observable): Observable object used to register event handlers.
+        - events (Dispatcher): Dispatcher object used to register event handlers.
         """
         if self.events is None:
-            self.events = Observable()
+            self.events = Dispatcher(self.handler_executor)
         return self.events
 
     def send(self, event, data, namespace="/trade"):
@@ -150,6 +345,9 @@ class Gateway:
         - data (dict): Data to be sent with the event.
         - namespace (str): Namespace to send the event to. Defaults to "/trade".
         """
+        # there is nothing to send to without a socket, e.g. while replaying recorded frames
+        if self.sio is None:
+            return
         self.sio.emit(event, data, namespace)
 
     def dc(self):
@@ -165,6 +363,11 @@ class Gateway:
         """
         self.has_disconnected = True
         self.sio.disconnect()
+        if self.coalescer is not None:
+            self.coalescer.close()
+        if self.queue is not None:
+            self.queue.close()
+            self.dispatch_thread = None
 
     def connected(self):
         """
@@ -197,8 +400,8 @@ class Gateway:
             self.events.trigger("on_disconnected", data if data is not None else True)
 
         if not self.has_disconnected:
-            # If the user has not initiated the disconnection themselves
-            self.events = None
+            # If the user has not initiated the disconnection themselves, socketio reconnects on its own. The
+            # events object is kept, so every handler, including those of attached trackers and books, stays registered.
             self.is_reconnecting = True
 
     def connect_error(self, data):
@@ -222,10 +425,15 @@ class Gateway:
         self.events.trigger("on_init", data)
         if data["authenticated"]:
             self.is_authed = True
-            self.emit_filters()
+            if self.market_data:
+                self.emit_filters()
             self.events.trigger("on_ready", True)
         else:
             self.is_authed = False
+            if self.identify_pending:
+                # the cached socket token was rejected, fetch a new one on the next identify
+                self.metadata.invalidate()
+        self.identify_pending = False
 
     def new_item_handler(self, data):
         """
@@ -235,8 +443,7 @@ class Gateway:
         - data (dict): Data related to the new item event.
         """
         data = data if isinstance(data, list) else [data]
-        for item in data:
-            self.events.trigger("on_new_item", item)
+        self.events.trigger_batch("on_new_item", data)
 
     def updated_item_handler(self, data):
         """
@@ -246,8 +453,7 @@ class Gateway:
         - data (dict): Data related to the updated item event.
         """
         data = data if isinstance(data, list) else [data]
-        for item in data:
-            self.events.trigger("on_updated_item", item)
+        self.events.trigger_batch("on_updated_item", data)
 
     def auction_update_handler(self, data):
         """
@@ -257,8 +463,7 @@ class Gateway:
         - data (dict): Data related to the auction update event.
         """
         data = data if isinstance(data, list) else [data]
-        for item in data:
-            self.events.trigger("on_auction_update", item)
+        self.events.trigger_batch("on_auction_update", data)
 
     def deleted_item_handler(self, data):
         """
@@ -268,8 +473,7 @@ class Gateway:
         - data (dict): Data related to the deleted item event.
         """
         data = data if isinstance(data, list) else [data]
-        for item in data:
-            self.events.trigger("on_deleted_item", item)
+        self.events.trigger_batch("on_deleted_item", data)
 
     def failed_deposit_handler(self, data):
         """
@@ -279,48 +483,33 @@ class Gateway:
         - data (dict): Data related to the failed deposit event.
         """
         data = data if isinstance(data, list) else [data]
-        for item in data:
-            self.events.trigger("on_failed_deposit", item)
+        self.events.trigger_batch("on_failed_deposit", data)
 
     def trade_status_handler(self, data):
         """
         Method that handles trade status events and triggers both on_trade_status and the specific event being triggered.
 
-        If `status` is not present in `data`, it uses the last known status of the trade, or skips processing
-        if there is no last known status.
+        If `status` is not present in `data`, it uses the last known status of that trade, or skips the update
+        if the trade's status is not known yet.
 
         Parameters:
         - data (dict): A dictionary containing information about the trade status event.
         """
-        trade_status_enum = {
-            -1: "error",
-            0: "pending",
-            1: "received",
-            2: "processing",
-            3: "sending",
-            4: "confirming",
-            5: "sent",
-            6: "completed",
-            7: "declined",
-            8: "canceled",
-            9: "timedout",
-            10: "credited",
-        }
         data = data if isinstance(data, list) else [data]
 
-        # if the trade status is not in the data, use the last status
         for item in data:
-            if "status" in item['data'].keys():
-                # get the last status
+            trade_id = item["data"].get("id")
+            if "status" in item["data"]:
                 trade_status = item["data"]["status"]
-
-                # if the last status is not None, use it
-                self.last_status = trade_status
-            else:
-                if self.last_status is not None:
-                    trade_status = self.last_status
+                if trade_status in final_statuses(item.get("type")):
+                    # nothing follows a final status, so it is not needed as a fallback
+                    self.last_statuses.pop(trade_id, None)
                 else:
-                    # if the last status is None, skip processing this event until we have a status to fall back onto
-                    return
+                    self.last_statuses[trade_id] = trade_status
+            elif trade_id in self.last_statuses:
+                trade_status = self.last_statuses[trade_id]
+            else:
+                # skip the update until there is a status of this trade to fall back onto
+                continue
             self.events.trigger("on_trade_status", item)
-            self.events.trigger(f"on_trade_{trade_status_enum[trade_status]}", item)
+            self.events.trigger(f"on_trade_{status_names[trade_status]}", item)
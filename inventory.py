@@ -0,0 +1,107 @@
+import threading
+from time import monotonic
+
+
+def is_listable(item):
+    # the items get_inventory has always returned: valid, tradable and not negatively priced
+    return "invalid" not in item and item['market_value'] >= 0 and item['tradable'] is not False
+
+
+def is_sellable(item):
+    return item['tradable'] is True and item['market_value'] > 0
+
+
+class InventoryCache:
+    """
+    The user's inventory as last fetched, with the changes since the fetch before and prebuilt filtered views.
+
+    Each fetch is applied incrementally: items that did not change keep their existing objects, and only
+    added or changed items are wrapped again. The cache goes stale after a maximum age or once invalidated,
+    e.g. when a trade moves an item in or out of the inventory.
+
+    Attributes:
+    - items (dict): Every valid item as last fetched, keyed by item id, in the order the API returned them.
+    - changes (dict): The items added, removed and changed by the last fetch.
+    - fetched_at (float): The monotonic time of the last fetch, None before the first.
+    - invalidated (bool): Whether the cache was invalidated since the last fetch.
+    """
+
+    views = {"listable": is_listable, "sellable": is_sellable}
+
+    def __init__(self):
+        """
+        Initializes a new, empty instance of the InventoryCache class.
+        """
+        self.items = {}
+        self.raw = {}
+        self.indexes = {name: [] for name in self.views}
+        self.changes = {"added": [], "removed": [], "changed": []}
+        self.fetched_at = None
+        self.invalidated = False
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def is_fresh(self, max_age):
+        """
+        Returns whether the cache was fetched less than max_age seconds ago and not invalidated since.
+        """
+        return self.fetched_at is not None and not self.invalidated and monotonic() - self.fetched_at < max_age
+
+    def invalidate(self, *args):
+        """
+        Marks the cache stale, so the next read fetches the inventory again. Accepts and ignores any
+        arguments, so it can be registered as an event handler directly.
+        """
+        self.invalidated = True
+
+    def apply(self, data, wrap):
+        """
+        Replaces the cached inventory with a freshly fetched one and works out what changed.
+
+        Parameters:
+        - data (list): The items returned by trading/user/inventory.
+        - wrap (function): Called with an item's dictionary, returns the object cached for it, e.g. a Deposit.
+
+        Returns:
+        - dict: Lists of the items added, removed and changed since the previous fetch.
+        """
+        with self.lock:
+            previous_items, previous_raw = self.items, self.raw
+            items, raw = {}, {}
+            added, changed = [], []
+            for item in data:
+                if "invalid" in item:
+                    continue
+                item_id = item['id']
+                before = previous_raw.get(item_id)
+                if before is None:
+                    items[item_id] = wrap(item)
+                    added.append(items[item_id])
+                elif before != item:
+                    items[item_id] = wrap(item)
+                    changed.append(items[item_id])
+                else:
+                    items[item_id] = previous_items[item_id]
+                raw[item_id] = item
+            removed = [wrapped for item_id, wrapped in previous_items.items() if item_id not in items]
+
+            self.items, self.raw = items, raw
+            self.indexes = {name: [items[item_id] for item_id, item in raw.items() if accepts(item)] for name, accepts in self.views.items()}
+            self.changes = {"added": added, "removed": removed, "changed": changed}
+            self.fetched_at = monotonic()
+            self.invalidated = False
+            return self.changes
+
+    def view(self, name):
+        """
+        Returns the items of a prebuilt view.
+
+        Parameters:
+        - name (str): "listable" for the items get_inventory returns, or "sellable" for those also priced above 0.
+
+        Returns:
+        - list: A new list of the view's items.
+        """
+        return list(self.indexes[name])
@@ -0,0 +1,264 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+
+class MarketBook:
+    """
+    An in-memory mirror of the withdrawal market, seeded once over REST and kept current from socket events.
+
+    Items are stored by id, and every indexed field keeps a sorted list of (value, id) pairs so range
+    queries are answered with two binary searches. All methods are safe to call from strategy code while
+    the socket thread applies updates. Events received while the book is being seeded are held back and
+    applied once the fetched listing is loaded, so the listing never overwrites them.
+
+    Usage:
+        book = MarketBook()
+        book.seed(client.withdrawals)
+        book.attach(client.gateway)
+        cheap = book.by_above_recommended(high=-5)
+
+    Attributes:
+    - items (dict): The listed items, keyed by item id.
+    - index (dict): A sorted list of (value, id) pairs per indexed field.
+    - lock (threading.RLock): Guards items and index.
+    - version (int): Incremented on every change to the book.
+    """
+
+    indexed_fields = ("market_value", "above_recommended_price", "auction_ends_at")
+
+    def __init__(self):
+        """
+        Initializes a new, empty instance of the MarketBook class.
+        """
+        self.items = {}
+        self.index = {field: [] for field in self.indexed_fields}
+        self.lock = threading.RLock()
+        self.version = 0
+        # (version, MarketSnapshot) of the latest snapshot taken
+        self.latest_snapshot = None
+        # (method, payload) pairs of the events received while a seed is fetching, None when not seeding
+        self.held = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item_id):
+        return item_id in self.items
+
+    def __iter__(self):
+        with self.lock:
+            return iter(list(self.items.values()))
+
+    def get(self, item_id, default=None):
+        """
+        Returns the listed item with the given id.
+
+        Parameters:
+        - item_id (int): The id of the item.
+        - default (any): The value returned if the item is not listed. Defaults to None.
+
+        Returns:
+        - dict: The item, or default.
+        """
+        return self.items.get(item_id, default)
+
+    # seeding
+
+    def seed(self, withdrawals, **kwargs):
+        """
+        Replaces the contents of the book with a full listing fetched over REST.
+
+        Events received while the listing is fetched are applied after it is loaded, in the order received.
+        If the fetch fails, they are applied to the book as it was.
+
+        Parameters:
+        - withdrawals (Withdrawals): The withdrawals instance to fetch the listing with.
+        - **kwargs: Filters passed on to Withdrawals.get_items.
+        """
+        with self.lock:
+            self.held = []
+        items = None
+        try:
+            items = withdrawals.get_items(**kwargs)
+        finally:
+            with self.lock:
+                held, self.held = self.held, None
+                if items is not None:
+                    self.load(items)
+                for method, payload in held:
+                    method(payload)
+
+    def load(self, items):
+        """
+        Replaces the contents of the book with copies of the given items.
+
+        Parameters:
+        - items (list): The items to load.
+        """
+        with self.lock:
+            # copies, as updates are merged into the book's items in place
+            self.items = {item['id']: dict(item) for item in items}
+            self.version += 1
+            for field in self.indexed_fields:
+                self.index[field] = sorted((item[field], item_id) for item_id, item in self.items.items() if item.get(field) is not None)
+
+    def attach(self, gateway):
+        """
+        Keeps the book current from a gateway's item events.
+
+        Handlers stay registered across automatic reconnects; attach again to the new gateway after Client.reconnect.
+
+        Parameters:
+        - gateway (Gateway): The gateway to listen to.
+        """
+        gateway.on("on_new_item", self.add)
+        gateway.on("on_updated_item", self.upsert)
+        gateway.on("on_auction_update", self.update)
+        gateway.on("on_deleted_item", self.remove)
+
+    # event application
+
+    def add(self, item):
+        """
+        Adds a copy of an item to the book, replacing any item with the same id.
+
+        Parameters:
+        - item (dict): The new item.
+        """
+        with self.lock:
+            if self.held is not None:
+                self.held.append((self.add, item))
+                return
+            previous = self.items.get(item['id'])
+            if previous is not None:
+                self.unindex(previous)
+            item = dict(item)
+            self.items[item['id']] = item
+            self.version += 1
+            self.reindex(item)
+
+    def update(self, changes):
+        """
+        Merges changed fields into a listed item. Changes to items that are not listed are ignored.
+
+        Parameters:
+        - changes (dict): The changed fields, including the item id.
+        """
+        with self.lock:
+            if self.held is not None:
+                self.held.append((self.update, changes))
+                return
+            item = self.items.get(changes['id'])
+            if item is None:
+                return
+            self.unindex(item)
+            item.update(changes)
+            self.version += 1
+            self.reindex(item)
+
+    def upsert(self, item):
+        """
+        Merges a full item into the book, adding it if it is not listed yet.
+
+        Parameters:
+        - item (dict): The updated item.
+        """
+        with self.lock:
+            if self.held is not None:
+                self.held.append((self.upsert, item))
+                return
+            if item['id'] in self.items:
+                self.update(item)
+            else:
+                self.add(item)
+
+    def remove(self, item):
+        """
+        Removes an item from the book.
+
+        Parameters:
+        - item (int | dict): The id of the item, or the item itself.
+        """
+        item_id = item['id'] if isinstance(item, dict) else item
+        with self.lock:
+            if self.held is not None:
+                self.held.append((self.remove, item_id))
+                return
+            item = self.items.pop(item_id, None)
+            if item is not None:
+                self.version += 1
+                self.unindex(item)
+
+    def reindex(self, item):
+        for field in self.indexed_fields:
+            value = item.get(field)
+            if value is not None:
+                insort(self.index[field], (value, item['id']))
+
+    def unindex(self, item):
+        for field in self.indexed_fields:
+            value = item.get(field)
+            if value is None:
+                continue
+            index = self.index[field]
+            position = bisect_left(index, (value, item['id']))
+            if position < len(index) and index[position] == (value, item['id']):
+                del index[position]
+
+    # queries
+
+    def range(self, field, low=None, high=None):
+        """
+        Returns the items whose field lies between low and high, inclusive, in ascending order.
+
+        Parameters:
+        - field (str): One of indexed_fields.
+        - low (float): The lower bound, or None for no lower bound. Defaults to None.
+        - high (float): The upper bound, or None for no upper bound. Defaults to None.
+
+        Returns:
+        - list: The matching items.
+        """
+        with self.lock:
+            index = self.index[field]
+            start = 0 if low is None else bisect_left(index, (low,))
+            end = len(index) if high is None else bisect_right(index, (high, float("inf")))
+            return [self.items[item_id] for _, item_id in index[start:end]]
+
+    def by_market_value(self, low=None, high=None):
+        """
+        Returns the items with a market value between low and high, cheapest first.
+        """
+        return self.range("market_value", low, high)
+
+    def by_above_recommended(self, low=None, high=None):
+        """
+        Returns the items priced between low and high percent above the recommended price, lowest first.
+        """
+        return self.range("above_recommended_price", low, high)
+
+    def by_auction_end(self, low=None, high=None):
+        """
+        Returns the auctions ending between the low and high timestamps, soonest first.
+        """
+        return self.range("auction_ends_at", low, high)
+
+    def snapshot(self):
+        """
+        Returns the book's items as a MarketSnapshot of NumPy columns, which requires numpy.
+
+        The snapshot is rebuilt only if the book changed since the previous one was taken, so strategies can
+        ask for one on every tick. It does not change with the book: take another to see later updates.
+
+        Returns:
+        - MarketSnapshot: The listed items at the time of the call.
+        """
+        from .columnar import MarketSnapshot
+
+        with self.lock:
+            if self.latest_snapshot is not None and self.latest_snapshot[0] == self.version:
+                return self.latest_snapshot[1]
+            # copies, as the socket thread merges updates into the book's own dicts
+            snapshot = MarketSnapshot.from_items([dict(item) for item in self.items.values()])
+            self.latest_snapshot = (self.version, snapshot)
+            return snapshot
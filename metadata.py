@@ -1,18 +1,24 @@
-from ._types import Meta, User, handle_error
-import requests
+from ._types import Meta, User
+from .transport import Transport
 
+import threading
 from time import time
 
 
 class Metadata:
     """A class representing user metadata for API authorization and socket connection.
 
+    One instance is shared by a Client and its Gateway. Refreshes are single-flight: when several
+    threads find the metadata stale at once, one of them fetches it and the others wait for that result.
+
     Attributes:
         api_key (str): The user's API key.
         api_base_url (str): The base URL for API requests.
-        headers (dict): The HTTP headers used for API requests.
+        transport (Transport): The pooled HTTP transport used for API requests.
         last_update (float): The timestamp of the last update to metadata.
         metadata_update_period (int): The duration, in seconds, after which metadata is updated automatically.
+        socket_token_ttl (int): The duration, in seconds, for which the socket token is reused when identifying.
+        lock (threading.Lock): Held while metadata is being fetched.
         _user (User): An instance of a User object.
         _metadata (Meta): An instance of a Meta object.
         _socket_token (str): A token used for socket authentication.
@@ -20,13 +26,15 @@ class Metadata:
     """
 
     metadata_update_period = 60*60*6  # 6 hours
+    socket_token_ttl = 60
 
-    def __init__(self, api_key: str, api_base_url: str) -> None:
+    def __init__(self, api_key: str, api_base_url: str, transport: Transport = None) -> None:
         """Initializes Metadata object.
 
         Args:
             api_key (str): The user's API key.
             api_base_url (str): The base URL for API requests.
+            transport (Transport): A shared transport to send requests with. A new one is created if not provided.
         """
         self.api_key = api_key
         self.api_base_url = api_base_url
@@ -34,11 +42,12 @@ class Metadata:
         self._metadata = None
         self._socket_token = None
         self._socket_signature = None
-        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+        self.transport = transport if transport is not None else Transport(api_key, api_base_url)
         self.last_update = None
+        self.lock = threading.Lock()
 
         # set metadata on initialization
-        self.set_metadata()
+        self.refresh(self.metadata_update_period)
 
     def __repr__(self) -> str:
         """Returns metadata as a string."""
@@ -46,23 +55,32 @@ class Metadata:
 
     def set_metadata(self) -> None:
         """Sets metadata for the user."""
-        url = self.api_base_url + "metadata/socket"
-        response = requests.get(url, headers=self.headers)
-
-        status = response.status_code
-        response = response.json()
-
-        if status == 200:
-            self._metadata = Meta(response)
-            self._user = User(self._metadata.user)
-            self.last_update = time()
-        else:
-            handle_error(status, response, "Meta", "set_metadata")
+        response = self.transport.get("metadata/socket", "Meta", "set_metadata")
+
+        self._metadata = Meta(response)
+        self._user = User(self._metadata.user)
+        self.last_update = time()
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Returns whether metadata was fetched within the last max_age seconds."""
+        return self._metadata is not None and self.last_update is not None and time() - self.last_update <= max_age
+
+    def refresh(self, max_age: float) -> None:
+        """Fetches metadata if it is older than max_age seconds, waiting on any fetch already in flight."""
+        if self.is_fresh(max_age):
+            return
+        with self.lock:
+            # another thread may have refreshed while this one waited for the lock
+            if not self.is_fresh(max_age):
+                self.set_metadata()
+
+    def invalidate(self) -> None:
+        """Marks metadata as stale so the next access fetches it again."""
+        self.last_update = None
 
     def ensure_metadata_updated(self) -> None:
         """Checks if metadata has been updated and updates if necessary."""
-        if self._metadata is None or time() - self.last_update > self.metadata_update_period:
-            self.set_metadata()
+        self.refresh(self.metadata_update_period)
 
     @property
     def user(self) -> User:
@@ -89,11 +107,119 @@ class Metadata:
         return self._user.id
 
     def get_identify(self) -> dict:
-        """Returns a dictionary representing authentication credentials for the socket."""
-        self.set_metadata()
+        """Returns a dictionary representing authentication credentials for the socket.
+
+        The socket token is only fetched again once it is older than socket_token_ttl or has been invalidated.
+        """
+        self.refresh(self.socket_token_ttl)
+        metadata, user = self._metadata, self._user
+        auth = {
+            "uid": user.id,
+            "model": user.to_dict(),
+            "authorizationToken": metadata.socket_token,
+            "signature": metadata.socket_signature
+        }
+        return auth
+
+    @property
+    def balance(self) -> float:
+        """Returns the user's balance."""
+        self.ensure_metadata_updated()
+        return self._user.balance
+
+
+class AsyncMetadata:
+    """The asyncio counterpart of Metadata, used by AsyncClient.
+
+    Metadata is not fetched on initialization and properties never trigger a request; await
+    set_metadata() or ensure_metadata_updated() first, after which properties read the cached values.
+    Refreshes are single-flight across tasks, as in Metadata.
+
+    Attributes:
+        transport (AsyncTransport): The pooled HTTP transport used for API requests.
+        last_update (float): The timestamp of the last update to metadata.
+        metadata_update_period (int): The duration, in seconds, after which metadata is considered stale.
+        socket_token_ttl (int): The duration, in seconds, for which the socket token is reused when identifying.
+        lock (asyncio.Lock): Held while metadata is being fetched.
+        _user (User): An instance of a User object.
+        _metadata (Meta): An instance of a Meta object.
+    """
+
+    metadata_update_period = Metadata.metadata_update_period
+    socket_token_ttl = Metadata.socket_token_ttl
+
+    def __init__(self, transport) -> None:
+        """Initializes AsyncMetadata object.
+
+        Args:
+            transport (AsyncTransport): The transport to send requests with.
+        """
+        self.transport = transport
+        self._user = None
+        self._metadata = None
+        self.last_update = None
+        self.lock = None
+
+    def __repr__(self) -> str:
+        """Returns metadata as a string."""
+        return str(self._metadata)
+
+    async def set_metadata(self) -> None:
+        """Sets metadata for the user."""
+        response = await self.transport.get("metadata/socket", "Meta", "set_metadata")
+
+        self._metadata = Meta(response)
+        self._user = User(self._metadata.user)
+        self.last_update = time()
+
+    is_fresh = Metadata.is_fresh
+    invalidate = Metadata.invalidate
+
+    async def refresh(self, max_age: float) -> None:
+        """Fetches metadata if it is older than max_age seconds, waiting on any fetch already in flight."""
+        if self.is_fresh(max_age):
+            return
+        if self.lock is None:
+            from asyncio import Lock
+            self.lock = Lock()
+        async with self.lock:
+            # another task may have refreshed while this one waited for the lock
+            if not self.is_fresh(max_age):
+                await self.set_metadata()
+
+    async def ensure_metadata_updated(self) -> None:
+        """Checks if metadata has been updated and updates if necessary."""
+        await self.refresh(self.metadata_update_period)
+
+    @property
+    def user(self) -> User:
+        """Returns a User object representing the user associated with the API key."""
+        return self._user
+
+    @property
+    def socket_token(self) -> str:
+        """Returns the socket token used for socket authentication."""
+        return self._metadata.socket_token
+
+    @property
+    def socket_signature(self) -> str:
+        """Returns the socket signature used for socket authentication."""
+        return self._metadata.socket_signature
+
+    @property
+    def user_id(self) -> str:
+        """Returns the user ID associated with the API key."""
+        return self._user.id
+
+    async def get_identify(self) -> dict:
+        """Returns a dictionary representing authentication credentials for the socket.
+
+        The socket token is only fetched again once it is older than socket_token_ttl or has been invalidated.
+        """
+        await self.refresh(self.socket_token_ttl)
         auth = {
             "uid": self.user_id,
-            "model": self.user,
+            "model": self.user.to_dict(),
             "authorizationToken": self.socket_token,
             "signature": self.socket_signature
         }
@@ -102,5 +228,4 @@ class Metadata:
     @property
     def balance(self) -> float:
         """Returns the user's balance."""
-        self.ensure_metadata_updated()
         return self._user.balance
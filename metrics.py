@@ -0,0 +1,271 @@
+import threading
+from bisect import bisect_left
+from time import monotonic, perf_counter
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram of durations in seconds.
+
+    Attributes:
+    - bounds (tuple): The upper bound of each bucket, in increasing order. Larger values fall in a final, unbounded bucket.
+    - counts (list): The number of values in each bucket, including the unbounded one.
+    - sum (float): The sum of all values.
+    - count (int): The number of values.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimates a quantile as the upper bound of the bucket it falls in.
+
+        Parameters:
+        - q (float): The quantile, between 0 and 1.
+
+        Returns:
+        - float: The estimate, None if nothing was observed or the quantile falls in the unbounded bucket.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def cumulative(self):
+        """
+        Returns (upper bound, number of values at or below it) pairs, ending with ("+Inf", count).
+        """
+        pairs = []
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            pairs.append((bound, seen))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+def endpoint_label(endpoint):
+    """
+    Replaces the ids in an endpoint with {id}, so every call to the same route shares one label.
+
+    Parameters:
+    - endpoint (str): The endpoint, relative to api_base_url, e.g. "trading/deposit/123/bid".
+
+    Returns:
+    - str: The route, e.g. "trading/deposit/{id}/bid".
+    """
+    return "/".join("{id}" if part.isdigit() else part for part in endpoint.split("/"))
+
+
+class Metrics:
+    """
+    Latency and throughput measurements shared by a client's transport and gateway.
+
+    Nothing is measured unless a Metrics instance is passed to them, so instrumentation costs a single
+    None check per request and per frame when disabled.
+
+    Usage:
+        client = Client(token, metrics=True)
+        ...
+        client.metrics.snapshot()
+        print(client.metrics.prometheus())
+
+    Attributes:
+    - buckets (tuple): The histogram bucket bounds, in seconds.
+    - started (float): The monotonic time measurements started or were last reset at.
+
+    Methods:
+    - request(method, endpoint, status, seconds): Records one HTTP exchange.
+    - retry(method, endpoint): Records a request retried after a 429.
+    - wait(budget, seconds): Records time spent waiting on a rate limit budget.
+    - decode(method, endpoint, seconds): Records time spent decoding a response.
+    - frame(event, data): Records a received socket frame.
+    - handler(event, seconds): Records time spent in a socket event's handler.
+    - timed(event, handler): Wraps a handler so its execution time is recorded.
+    - snapshot(): Returns every measurement as a dictionary.
+    - prometheus(prefix="csgoempire"): Returns every measurement in the Prometheus text format.
+    - reset(): Clears every measurement.
+    """
+
+    default_buckets = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets=default_buckets):
+        """
+        Initializes a new instance of the Metrics class.
+
+        Parameters:
+        - buckets (tuple): The histogram bucket bounds, in seconds. Defaults to default_buckets.
+
+        Returns:
+        - None
+        """
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = monotonic()
+            self.request_seconds = {}
+            self.statuses = {}
+            self.retries = {}
+            self.wait_seconds = {}
+            self.decode_seconds = {}
+            self.frames = {}
+            self.items = {}
+            self.handler_seconds = {}
+
+    def observe(self, table, key, seconds):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def request(self, method, endpoint, status, seconds):
+        key = (method, endpoint_label(endpoint))
+        with self.lock:
+            self.observe(self.request_seconds, key, seconds)
+            self.statuses[key + (status,)] = self.statuses.get(key + (status,), 0) + 1
+
+    def retry(self, method, endpoint):
+        key = (method, endpoint_label(endpoint))
+        with self.lock:
+            self.retries[key] = self.retries.get(key, 0) + 1
+
+    def wait(self, budget, seconds):
+        with self.lock:
+            self.observe(self.wait_seconds, budget, seconds)
+
+    def decode(self, method, endpoint, seconds):
+        with self.lock:
+            self.observe(self.decode_seconds, (method, endpoint_label(endpoint)), seconds)
+
+    def frame(self, event, data):
+        items = len(data) if isinstance(data, list) else 1
+        with self.lock:
+            self.frames[event] = self.frames.get(event, 0) + 1
+            self.items[event] = self.items.get(event, 0) + items
+
+    def handler(self, event, seconds):
+        with self.lock:
+            self.observe(self.handler_seconds, event, seconds)
+
+    def timed(self, event, handler):
+        """
+        Wraps a handler so its execution time is recorded under event.
+
+        Parameters:
+        - event (str): The name of the socket event.
+        - handler (function): The handler to wrap.
+
+        Returns:
+        - function: The wrapped handler.
+        """
+        def timed_handler(data):
+            start = perf_counter()
+            try:
+                return handler(data)
+            finally:
+                self.handler(event, perf_counter() - start)
+        return timed_handler
+
+    def snapshot(self):
+        """
+        Returns every measurement, with latencies in seconds and socket rates per second since started.
+
+        Returns:
+        - dict: The measurements, grouped as requests, rate_limits, events and handlers.
+        """
+        with self.lock:
+            elapsed = max(monotonic() - self.started, 1e-9)
+            requests = {}
+            for (method, endpoint), histogram in self.request_seconds.items():
+                requests[f"{method} {endpoint}"] = {
+                    "latency": histogram.snapshot(),
+                    "statuses": {status: count for (m, e, status), count in self.statuses.items() if (m, e) == (method, endpoint)},
+                    "retries": self.retries.get((method, endpoint), 0),
+                    "decode": self.decode_seconds[(method, endpoint)].snapshot() if (method, endpoint) in self.decode_seconds else None,
+                }
+            return {
+                "elapsed": elapsed,
+                "requests": requests,
+                "rate_limits": {budget: histogram.snapshot() for budget, histogram in self.wait_seconds.items()},
+                "events": {
+                    event: {"frames": frames, "items": self.items[event], "frames_per_s": frames / elapsed, "items_per_s": self.items[event] / elapsed}
+                    for event, frames in self.frames.items()
+                },
+                "handlers": {event: histogram.snapshot() for event, histogram in self.handler_seconds.items()},
+            }
+
+    def prometheus(self, prefix="csgoempire"):
+        """
+        Returns every measurement in the Prometheus text exposition format.
+
+        Parameters:
+        - prefix (str): Prepended to every metric name. Defaults to "csgoempire".
+
+        Returns:
+        - str: The exposition, ready to be served from a /metrics endpoint.
+        """
+        lines = []
+
+        def histograms(name, help, label_names, table):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, histogram in table.items():
+                labels = format_labels(label_names, key if isinstance(key, tuple) else (key,))
+                for bound, count in histogram.cumulative():
+                    lines.append(f"{prefix}_{name}_bucket{{{labels},le=\"{bound}\"}} {count}")
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {histogram.count}")
+
+        def counters(name, help, label_names, table):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, count in table.items():
+                lines.append(f"{prefix}_{name}{{{format_labels(label_names, key if isinstance(key, tuple) else (key,))}}} {count}")
+
+        with self.lock:
+            histograms("request_seconds", "Duration of HTTP exchanges with the API.", ("method", "endpoint"), self.request_seconds)
+            counters("responses_total", "Responses received by status code.", ("method", "endpoint", "status"), self.statuses)
+            counters("retries_total", "Requests retried after a 429 response.", ("method", "endpoint"), self.retries)
+            histograms("decode_seconds", "Duration of decoding response bodies.", ("method", "endpoint"), self.decode_seconds)
+            histograms("ratelimit_wait_seconds", "Time spent waiting on rate limit budgets.", ("budget",), self.wait_seconds)
+            counters("socket_frames_total", "Socket frames received by event.", ("event",), self.frames)
+            counters("socket_items_total", "Items received in socket frames by event.", ("event",), self.items)
+            histograms("handler_seconds", "Duration of socket event handlers.", ("event",), self.handler_seconds)
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(names, values):
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
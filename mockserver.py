@@ -0,0 +1,380 @@
+"""
+A local stand-in for the CSGOEmpire REST API and trade socket, for testing and load testing without the live site.
+
+Serves the endpoints the library uses under /api/v2/ and the socket.io /trade namespace under /s/, backed by a
+generated market. Latency, 429 responses and the rate of socket events are configurable.
+
+Run it on its own:
+
+    python -m csgoempire.mockserver --port 8080 --latency 0.05 --throttle-rate 0.01 --event-rate 20
+
+or in the background of a script or benchmark:
+
+    with MockServer(event_rate=20) as server:
+        client = Client("a" * 32, domain=server.url, ws_url=server.url)
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+import socketio
+from aiohttp import web
+
+from .codec import socket_json
+
+
+class MockServer:
+    """
+    A REST and socket.io server imitating CSGOEmpire, running on aiohttp.
+
+    Attributes:
+    - host (str): The interface the server listens on.
+    - port (int): The port the server listens on, set once started when 0 was given.
+    - latency (float): Seconds every REST response is delayed by.
+    - jitter (float): Up to this many extra seconds are added to the latency at random.
+    - throttle_rate (float): The fraction of REST requests answered with 429.
+    - retry_after (int): The Retry-After header sent with a 429.
+    - event_rate (float): Socket frames broadcast per second to identified clients, 0 for none.
+    - items_per_frame (int): Items in each new_item, updated_item and auction_update frame.
+    - items (dict): The market, listed items keyed by id.
+    - inventory (list): The user's inventory.
+    - deposits (dict): The user's active deposits keyed by id.
+    - stats (dict): Counters of requests, 429 responses, socket connections and frames sent.
+    """
+
+    user = {"id": 1, "steam_id": "76561198000000000", "steam_name": "mock", "balance": 1000000, "steam_api_key": "mock"}
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, throttle_rate=0.0, retry_after=1, event_rate=0.0, items_per_frame=1, market_size=5000, inventory_size=200, seed=None):
+        """
+        Initializes a new instance of the MockServer class and generates its market.
+
+        Parameters:
+        - host (str): The interface to listen on. Defaults to "127.0.0.1".
+        - port (int): The port to listen on, 0 for any free port. Defaults to 0.
+        - latency (float): Seconds every REST response is delayed by. Defaults to 0.
+        - jitter (float): Up to this many extra seconds are added to the latency at random. Defaults to 0.
+        - throttle_rate (float): The fraction of REST requests answered with 429. Defaults to 0.
+        - retry_after (int): The Retry-After header sent with a 429. Defaults to 1.
+        - event_rate (float): Socket frames broadcast per second to identified clients, 0 for none. Defaults to 0.
+        - items_per_frame (int): Items in each new_item, updated_item and auction_update frame. Defaults to 1.
+        - market_size (int): The number of items listed on the market. Defaults to 5000.
+        - inventory_size (int): The number of items in the user's inventory. Defaults to 200.
+        - seed (int): Seeds the generated data, latency jitter and throttling. Defaults to None.
+
+        Returns:
+        - None
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.event_rate = event_rate
+        self.items_per_frame = items_per_frame
+        self.random = random.Random(seed)
+        self.next_id = 1
+        self.items = {}
+        for _ in range(market_size):
+            item = self.generate_item()
+            self.items[item["id"]] = item
+        self.inventory = [self.generate_item(tradable=self.random.random() > 0.2) for _ in range(inventory_size)]
+        self.deposits = {}
+        self.stats = {"requests": 0, "throttled": 0, "connections": 0, "frames": 0}
+
+        self.sio = socketio.AsyncServer(async_mode="aiohttp", cors_allowed_origins="*", json=socket_json)
+        self.app = web.Application()
+        self.sio.attach(self.app, socketio_path="s")
+        self.app.middlewares.append(self.middleware)
+        self.app.add_routes([
+            web.get("/api/v2/metadata/socket", self.metadata),
+            web.get("/api/v2/trading/items", self.market_items),
+            web.get("/api/v2/trading/user/inventory", self.user_inventory),
+            web.get("/api/v2/trading/user/trades", self.user_trades),
+            web.post("/api/v2/trading/deposit", self.deposit),
+            web.post("/api/v2/trading/deposit/{id}/bid", self.bid),
+            web.post("/api/v2/trading/deposits/{id}/cancel", self.cancel),
+            web.post("/api/v2/trading/deposits/{id}/sell", self.sell),
+        ])
+        self.sio.on("connect", self.connect, namespace="/trade")
+        self.sio.on("identify", self.identify, namespace="/trade")
+        self.sio.on("filters", self.filters, namespace="/trade")
+        self.app.on_startup.append(self.start_events)
+        self.app.on_cleanup.append(self.stop_events)
+
+        self.runner = None
+        self.emitter = None
+        self.loop = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def generate_item(self, tradable=True):
+        item_id = self.next_id
+        self.next_id += 1
+        market_value = self.random.randint(10, 500000)
+        return {
+            "id": item_id,
+            "market_name": f"Mock Item {item_id % 500}",
+            "market_value": market_value,
+            "suggested_price": market_value,
+            "above_recommended_price": round(self.random.uniform(-10, 30), 2),
+            "auction_ends_at": int(time.time()) + self.random.randint(60, 3600),
+            "auction_highest_bid": None,
+            "auction_number_of_bids": 0,
+            "published_at": time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime()),
+            "tradable": tradable,
+            "wear": round(self.random.random(), 4),
+        }
+
+    # rest api
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        if not request.path.startswith("/api/"):
+            return await handler(request)
+        self.stats["requests"] += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"success": False, "message": "Unauthenticated."}, status=401)
+        if self.throttle_rate and self.random.random() < self.throttle_rate:
+            self.stats["throttled"] += 1
+            return web.json_response({"success": False, "message": "Too Many Attempts."}, status=429, headers={"Retry-After": str(self.retry_after)})
+        return await handler(request)
+
+    async def metadata(self, request):
+        return web.json_response({"user": self.user, "socket_token": "mock-token", "socket_signature": "mock-signature"})
+
+    async def market_items(self, request):
+        query = request.query
+        per_page = int(query.get("per_page", 2500))
+        page = int(query.get("page", 1))
+        items = self.items.values()
+        if "search" in query:
+            search = query["search"].lower()
+            items = [item for item in items if search in item["market_name"].lower()]
+        if "price_min" in query:
+            items = [item for item in items if item["market_value"] >= float(query["price_min"])]
+        if "price_max" in query:
+            items = [item for item in items if item["market_value"] <= float(query["price_max"])]
+        if query.get("auction") == "yes":
+            items = [item for item in items if item["auction_ends_at"] is not None]
+        if "price_max_above" in query:
+            items = [item for item in items if item["above_recommended_price"] <= float(query["price_max_above"])]
+        items = list(items)
+        if query.get("order"):
+            # order names the field, sort the direction
+            items.sort(key=lambda item: item.get(query["order"]) or 0, reverse=query.get("sort", "asc") == "desc")
+        last_page = max(1, -(-len(items) // per_page))
+        data = items[(page - 1) * per_page:page * per_page]
+        return web.json_response({"current_page": page, "per_page": per_page, "last_page": last_page, "total": len(items), "data": data})
+
+    async def user_inventory(self, request):
+        return web.json_response({"success": True, "updatedAt": int(time.time()), "allowUpdate": True, "data": self.inventory})
+
+    async def user_trades(self, request):
+        return web.json_response({"success": True, "data": {"deposits": list(self.deposits.values()), "withdrawals": []}})
+
+    async def deposit(self, request):
+        body = await request.json()
+        inventory = {item["id"]: item for item in self.inventory}
+        listings = body.get("items", [])
+        # a batch is accepted or rejected as a whole, so every item is checked before anything is deposited
+        for listing in listings:
+            item = inventory.get(listing.get("id"))
+            if item is None or not item["tradable"]:
+                return web.json_response({"success": False, "message": f"Item {listing.get('id')} can not be deposited."}, status=400)
+        deposits = []
+        for listing in listings:
+            item = inventory[listing["id"]]
+            deposit = {"id": self.next_id, "item_id": item["id"], "market_name": item["market_name"], "market_value": listing.get("coin_value", item["market_value"]), "status": 2, "status_message": "Processing"}
+            self.next_id += 1
+            self.deposits[deposit["id"]] = deposit
+            deposits.append(deposit)
+        return web.json_response({"success": True, "deposits": deposits})
+
+    async def bid(self, request):
+        item = self.items.get(int(request.match_info["id"]))
+        if item is None:
+            return web.json_response({"success": False, "message": "Item not found."}, status=404)
+        body = await request.json()
+        bid_value = body.get("bid_value", 0)
+        if bid_value <= (item["auction_highest_bid"] or item["market_value"] - 1):
+            return web.json_response({"success": False, "message": "Bid is too low."}, status=400)
+        item["auction_highest_bid"] = bid_value
+        item["auction_number_of_bids"] += 1
+        return web.json_response({"success": True, "auction_data": {"id": item["id"], "auction_highest_bid": bid_value, "auction_highest_bidder": self.user["id"], "auction_number_of_bids": item["auction_number_of_bids"], "auction_ends_at": item["auction_ends_at"]}})
+
+    async def cancel(self, request):
+        deposit = self.deposits.pop(int(request.match_info["id"]), None)
+        if deposit is None:
+            return web.json_response({"success": False, "message": "Deposit not found."}, status=404)
+        return web.json_response({"success": True})
+
+    async def sell(self, request):
+        deposit = self.deposits.get(int(request.match_info["id"]))
+        if deposit is None:
+            return web.json_response({"success": False, "message": "Deposit not found."}, status=404)
+        deposit["status"] = 3
+        return web.json_response({"success": True})
+
+    # trade socket
+
+    async def connect(self, sid, environ, auth=None):
+        self.stats["connections"] += 1
+        await self.sio.emit("init", {"authenticated": False, "serverTime": int(time.time() * 1000)}, to=sid, namespace="/trade")
+
+    async def identify(self, sid, data):
+        authenticated = isinstance(data, dict) and data.get("authorizationToken") == "mock-token"
+        if authenticated:
+            await self.sio.enter_room(sid, "trade", namespace="/trade")
+        await self.sio.emit("init", {"authenticated": authenticated, "serverTime": int(time.time() * 1000), "id": self.user["id"], "steam_name": self.user["steam_name"]}, to=sid, namespace="/trade")
+
+    async def filters(self, sid, data):
+        pass
+
+    def next_frame(self):
+        """
+        Generates a random socket frame from the market, updating the market to match.
+
+        Returns:
+        - tuple: The event name and its data.
+        """
+        roll = self.random.random()
+        if roll < 0.35 or len(self.items) < self.items_per_frame:
+            items = [self.generate_item() for _ in range(self.items_per_frame)]
+            self.items.update((item["id"], item) for item in items)
+            return "new_item", items
+        listed = self.random.sample(list(self.items), self.items_per_frame)
+        if roll < 0.7:
+            updates = []
+            for item_id in listed:
+                item = self.items[item_id]
+                item["market_value"] = max(1, item["market_value"] + self.random.randint(-50, 50))
+                updates.append({"id": item_id, "market_value": item["market_value"], "above_recommended_price": item["above_recommended_price"]})
+            return "updated_item", updates
+        if roll < 0.9:
+            updates = []
+            for item_id in listed:
+                item = self.items[item_id]
+                item["auction_highest_bid"] = (item["auction_highest_bid"] or item["market_value"]) + 1
+                item["auction_number_of_bids"] += 1
+                updates.append({"id": item_id, "above_recommended_price": item["above_recommended_price"], "auction_highest_bid": item["auction_highest_bid"], "auction_highest_bidder": 0, "auction_number_of_bids": item["auction_number_of_bids"], "auction_ends_at": item["auction_ends_at"]})
+            return "auction_update", updates
+        for item_id in listed:
+            del self.items[item_id]
+        return "deleted_item", listed
+
+    async def start_events(self, app):
+        if self.event_rate > 0:
+            self.emitter = asyncio.ensure_future(self.emit_events())
+
+    async def stop_events(self, app):
+        if self.emitter is not None:
+            self.emitter.cancel()
+            self.emitter = None
+
+    async def emit_events(self):
+        interval = 1 / self.event_rate
+        next_at = time.monotonic()
+        while True:
+            event, data = self.next_frame()
+            await self.sio.emit(event, data, room="trade", namespace="/trade")
+            self.stats["frames"] += 1
+            next_at += interval
+            await asyncio.sleep(max(0, next_at - time.monotonic()))
+
+    # lifecycle
+
+    async def start_async(self):
+        """
+        Starts serving on the running event loop.
+        """
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    async def stop_async(self):
+        """
+        Stops serving and closes every connection.
+        """
+        if self.runner is not None:
+            await self.sio.shutdown()
+            await self.runner.cleanup()
+            self.runner = None
+
+    def start(self):
+        """
+        Starts serving from a background thread with its own event loop, returning once the server is listening.
+
+        Returns:
+        - MockServer: The server itself.
+        """
+        started = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.start_async())
+            started.set()
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.stop_async())
+            # let tasks still owned by closed connections, e.g. pings, finish cancelling
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name="mock-server", daemon=True)
+        self.thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        """
+        Stops a server started with start().
+        """
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a local stand-in for the CSGOEmpire API and trade socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every REST response is delayed by")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds of latency")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of REST requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--event-rate", type=float, default=0.0, help="socket frames per second")
+    parser.add_argument("--items-per-frame", type=int, default=1)
+    parser.add_argument("--market-size", type=int, default=5000)
+    parser.add_argument("--inventory-size", type=int, default=200)
+    parser.add_argument("--seed", type=int)
+    options = vars(parser.parse_args())
+    host, port = options.pop("host"), options.pop("port")
+
+    server = MockServer(host, port, **options)
+    print(f"Serving on {server.url}")
+    web.run_app(server.app, host=host, port=port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future
+
+from .client import Client
+from .codec import codec as default_codec
+from .domains import normalize_domain
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .transport import Transport
+
+
+class FairScheduler:
+    """
+    Runs calls made on behalf of many accounts on a shared set of workers, taking turns between accounts.
+
+    Each account has its own queue. Workers go round the accounts with calls queued, and take the next
+    call of the first account whose rate limit budget for it is free, so an account with a long queue
+    or an exhausted budget never holds up calls for the others. When every account's budget is
+    exhausted, the call that becomes free soonest is taken.
+
+    Attributes:
+    - workers (int): The number of worker threads, i.e. the number of calls in flight at once.
+    - queues (dict): The calls queued for each account, keyed by account.
+    - completed (dict): The number of calls completed for each account, keyed by account.
+    """
+
+    def __init__(self, workers=8):
+        """
+        Initializes a new instance of the FairScheduler class and starts its workers.
+
+        Parameters:
+        - workers (int): The number of worker threads. Defaults to 8.
+
+        Returns:
+        - None
+        """
+        self.workers = workers
+        self.queues = {}
+        self.ratelimiters = {}
+        self.completed = {}
+        # accounts with calls queued, in the order they take their turn
+        self.turns = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.threads = [threading.Thread(target=self.work, name=f"pool-{index}", daemon=True) for index in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def add(self, account, ratelimiter):
+        """
+        Registers an account and the rate limiter its calls are made under.
+        """
+        with self.condition:
+            self.queues.setdefault(account, deque())
+            self.ratelimiters[account] = ratelimiter
+            self.completed.setdefault(account, 0)
+
+    def submit(self, account, budget, function, *args, **kwargs):
+        """
+        Queues a call on behalf of an account.
+
+        Parameters:
+        - account: The account, as registered with add.
+        - budget (str): The rate limit budget the call spends, used to pick accounts that can go right away.
+        - function (function): The function to call with args and kwargs.
+
+        Returns:
+        - concurrent.futures.Future: Resolved with the function's result or exception.
+        """
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("The scheduler is closed")
+            queue = self.queues[account]
+            if not queue:
+                self.turns.append(account)
+            queue.append((budget, function, args, kwargs, future))
+            self.condition.notify()
+        return future
+
+    def pending(self):
+        """
+        Returns the number of calls queued for each account with any.
+        """
+        with self.condition:
+            return {account: len(queue) for account, queue in self.queues.items() if queue}
+
+    def next_call(self):
+        # called holding the condition, with at least one account waiting for its turn
+        soonest, soonest_wait = None, None
+        for position, account in enumerate(self.turns):
+            budget = self.queues[account][0][0]
+            wait = self.ratelimiters[account].bucket(budget).wait_time()
+            if wait == 0:
+                soonest = position
+                break
+            if soonest_wait is None or wait < soonest_wait:
+                soonest, soonest_wait = position, wait
+        account = self.turns[soonest]
+        del self.turns[soonest]
+        queue = self.queues[account]
+        call = queue.popleft()
+        if queue:
+            # back of the line, behind every other account
+            self.turns.append(account)
+        return account, call
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.turns and not self.closed:
+                    self.condition.wait()
+                if not self.turns:
+                    return
+                account, (budget, function, args, kwargs, future) = self.next_call()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            with self.condition:
+                self.completed[account] += 1
+
+    def close(self, wait=True):
+        """
+        Stops the workers once every queued call has run.
+
+        Parameters:
+        - wait (bool): Whether to block until the workers have stopped. Defaults to True.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+
+class ClientPool:
+    """
+    Many accounts, each with its own Client, sharing one process's connections, codec and socket.
+
+    Every account keeps its own API key, rate limits, metadata and trade tracking, while the REST calls
+    of all accounts go over a single connection pool and are run by a FairScheduler taking turns between
+    them. Clients are created concurrently, so their metadata is fetched in parallel rather than one
+    account after another. With share_market_socket, only the first account's socket subscribes to
+    market listings; the sockets of the other accounts carry nothing but their own trade events.
+
+    Usage:
+        pool = ClientPool(tokens, socket_enabled=True)
+        pool.market.on("on_new_item", handle_item)
+        balances = pool.map(lambda client: client.get_balance())
+        future = pool.submit(tokens[0], lambda client: client.withdrawals.bid(item_id, amount), budget="bid")
+
+    Attributes:
+    - clients (dict): The Client of every account, keyed by its API key, in the order given.
+    - adapter (HTTPAdapter): The connection pool shared by every account. Each account's session mounts it
+      and keeps its own cookies.
+    - codec (Codec): The JSON codec shared by every account.
+    - scheduler (FairScheduler): Runs the calls submitted to the pool.
+    - market (Gateway): The gateway receiving market listings, None if sockets are disabled.
+    - metrics (Metrics): Records the REST calls and socket frames of every account when set.
+
+    Methods:
+    - submit(token, function, *args, budget="default", **kwargs): Calls function with an account's client on the scheduler.
+    - map(function, *args, budget="default", **kwargs): Calls function with every account's client and returns the results.
+    - close(): Disconnects every socket, stops the scheduler and closes the shared connections.
+    """
+
+    def __init__(self, tokens, domain="https://csgoempire.com", ws_url=None, socket_enabled=False, share_market_socket=True, workers=8, pool_size=None, timeout=Transport.default_timeout, budgets=None, codec=None, metrics=False, client_options=None):
+        """
+        Initializes a new instance of the ClientPool class, creating a Client for every API key.
+
+        Parameters:
+        - tokens (list): The API keys of the accounts.
+        - domain (str): The domain to connect to. Defaults to "https://csgoempire.com".
+        - ws_url (str): A custom websocket host. Defaults to None.
+        - socket_enabled (bool): Whether each account opens a socket. Defaults to False.
+        - share_market_socket (bool): Whether market listings are received on the first account's socket only. Defaults to True.
+        - workers (int): The number of calls in flight at once across every account. Defaults to 8.
+        - pool_size (int): The maximum number of keep-alive connections held open. Defaults to workers.
+        - timeout (float | tuple): The (connect, read) timeout in seconds. Defaults to (3.05, 10).
+        - budgets (dict): Rate limit budgets overriding RateLimiter.default_budgets, applied to each account separately. Defaults to None.
+        - codec (Codec): The JSON codec to use. Defaults to the fastest installed backend.
+        - metrics (bool | Metrics): A Metrics instance, or True for a new one, shared by every account. Defaults to False.
+        - client_options (dict): Extra keyword arguments for every Client, e.g. {"handler_workers": 2}. Defaults to None.
+
+        Returns:
+        - None
+        """
+        if not tokens:
+            raise ValueError("At least one API key is required")
+
+        self.domain = normalize_domain(domain)
+        self.api_base_url = f"{self.domain}/api/v2/"
+        self.codec = codec if codec is not None else default_codec
+        self.metrics = Metrics() if metrics is True else metrics or None
+        self.adapter = Transport.create_adapter(pool_size if pool_size is not None else workers)
+        self.scheduler = FairScheduler(workers)
+        self.market = None
+        self.clients = {}
+
+        client_options = client_options or {}
+        transports = {}
+        for token in tokens:
+            ratelimiter = RateLimiter(budgets)
+            transports[token] = Transport(token, self.api_base_url, timeout=timeout, ratelimiter=ratelimiter, metrics=self.metrics, codec=self.codec, adapter=self.adapter)
+            self.scheduler.add(token, ratelimiter)
+
+        def create(token, index):
+            options = dict(client_options)
+            if share_market_socket and index > 0:
+                options["gateway_options"] = {**options.get("gateway_options", {}), "market_data": False}
+            return Client(token, domain=domain, ws_url=ws_url, socket_enabled=socket_enabled, metrics=self.metrics or False, transport=transports[token], **options)
+
+        # every client fetches its own metadata, on the scheduler so the accounts are set up in parallel
+        futures = {token: self.scheduler.submit(token, "default", create, token, index) for index, token in enumerate(tokens)}
+        # every client is waited for, so those created after one fails are closed with the rest
+        error = None
+        for token, future in futures.items():
+            try:
+                self.clients[token] = future.result()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            self.close()
+            raise error
+
+        if socket_enabled:
+            self.market = next(iter(self.clients.values())).gateway
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __iter__(self):
+        return iter(self.clients.values())
+
+    def __getitem__(self, token):
+        return self.clients[token]
+
+    def submit(self, token, function, *args, budget="default", **kwargs):
+        """
+        Calls a function with an account's client on the scheduler.
+
+        Parameters:
+        - token (str): The account's API key.
+        - function (function): Called with the client, then args and kwargs.
+        - budget (str): The rate limit budget the call spends, e.g. "bid" or "items". Defaults to "default".
+
+        Returns:
+        - concurrent.futures.Future: Resolved with the function's result or exception.
+        """
+        return self.scheduler.submit(token, budget, function, self.clients[token], *args, **kwargs)
+
+    def map(self, function, *args, budget="default", **kwargs):
+        """
+        Calls a function with every account's client and waits for the results.
+
+        Parameters:
+        - function (function): Called with each client, then args and kwargs.
+        - budget (str): The rate limit budget each call spends. Defaults to "default".
+
+        Returns:
+        - dict: The result of each account keyed by API key, or the exception it raised.
+        """
+        futures = {token: self.submit(token, function, *args, budget=budget, **kwargs) for token in self.clients}
+        results = {}
+        for token, future in futures.items():
+            try:
+                results[token] = future.result()
+            except Exception as e:
+                results[token] = e
+        return results
+
+    def close(self):
+        """
+        Disconnects every socket, stops the scheduler and closes the shared connections.
+        """
+        for client in self.clients.values():
+            gateway = getattr(client, "gateway", None)
+            if gateway is not None:
+                try:
+                    gateway.disconnect()
+                except Exception:
+                    traceback.print_exc()
+        self.scheduler.close()
+        self.adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
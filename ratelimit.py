@@ -0,0 +1,240 @@
+import threading
+from time import monotonic, sleep, time
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket used to space out requests to a rate limited endpoint.
+
+    Tokens are reserved rather than waited for, so concurrent callers are handed consecutive slots
+    instead of racing for the next free one.
+
+    Attributes:
+    - rate (float): The number of tokens currently added per second.
+    - base_rate (float): The configured rate, which rate recovers towards after backing off.
+    - capacity (int): The maximum number of tokens held, i.e. the allowed burst.
+    - tokens (float): The number of tokens currently available, negative when slots are reserved ahead.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        Initializes a new instance of the TokenBucket class.
+
+        Parameters:
+        - rate (float): The number of tokens added per second.
+        - capacity (int): The maximum number of tokens held. Defaults to 1.
+
+        Returns:
+        - None
+        """
+        self.rate = rate
+        self.base_rate = rate
+        self.min_rate = rate / 16
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def per(cls, requests, seconds, capacity=None):
+        """
+        Creates a bucket allowing a number of requests per period.
+
+        Parameters:
+        - requests (int): The number of requests allowed per period.
+        - seconds (float): The length of the period in seconds.
+        - capacity (int): The allowed burst. Defaults to requests.
+
+        Returns:
+        - TokenBucket: The new bucket.
+        """
+        return cls(requests / seconds, capacity if capacity is not None else requests)
+
+    def refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """
+        Takes a token, reserving a future one if none is available.
+
+        Returns:
+        - float: The number of seconds to wait before the reserved slot is reached.
+        """
+        with self.lock:
+            self.refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def wait_time(self):
+        """
+        Returns how long a reservation made now would wait, without reserving.
+
+        Returns:
+        - float: The number of seconds.
+        """
+        with self.lock:
+            self.refill()
+            return max(0, (1 - self.tokens) / self.rate) if self.tokens < 1 else 0
+
+    def acquire(self):
+        """
+        Blocks until a token is available and takes it.
+
+        Returns:
+        - float: The number of seconds waited.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+    def pause(self, delay):
+        """
+        Holds back every following reservation for at least the given number of seconds.
+
+        Parameters:
+        - delay (float): The number of seconds to hold back.
+        """
+        with self.lock:
+            self.refill()
+            self.tokens = min(self.tokens, 1 - delay * self.rate)
+
+    def backoff(self, delay, factor):
+        """
+        Slows the refill rate after the endpoint reported it was exceeded, then pauses.
+
+        Parameters:
+        - delay (float): The number of seconds to hold back.
+        - factor (float): The factor the rate is multiplied by, between 0 and 1.
+        """
+        with self.lock:
+            self.refill()
+            self.rate = max(self.min_rate, self.rate * factor)
+            self.tokens = min(self.tokens, 1 - delay * self.rate)
+
+    def recover(self, factor):
+        """
+        Moves the refill rate back towards base_rate after a successful request.
+
+        Parameters:
+        - factor (float): The factor the rate is multiplied by, greater than 1.
+        """
+        if self.rate < self.base_rate:
+            with self.lock:
+                self.refill()
+                self.rate = min(self.base_rate, self.rate * factor)
+
+
+class RateLimiter:
+    """
+    The rate limits applied to every REST call, with a separate budget per endpoint group.
+
+    Calls wait for their budget rather than fail. When the API still answers with 429 the budget is
+    paused for as long as the response asks and its rate is halved, then recovers gradually with every
+    successful call.
+
+    Attributes:
+    - buckets (dict): A TokenBucket per budget name.
+
+    Methods:
+    - reserve(name): Reserves a slot and returns how long to wait for it.
+    - acquire(name): Blocks until a slot is available and returns how long it waited.
+    - succeeded(name, headers): Records a successful call.
+    - throttled(name, headers): Records a 429 and returns how long the budget is paused.
+    """
+
+    # (requests per second, burst) for each budget, calls without a specific budget use "default"
+    default_budgets = {
+        "default": (2, 5),
+        "bid": (2, 5),
+        "listing": (1, 3),
+        "inventory": (1 / 5, 2),
+        "items": (1 / 3.4, 2),
+        "search": (1 / 3.1, 2),
+    }
+    backoff_factor = 0.5
+    recovery_factor = 1.1
+    default_retry_after = 1
+
+    def __init__(self, budgets=None):
+        """
+        Initializes a new instance of the RateLimiter class.
+
+        Parameters:
+        - budgets (dict): (requests per second, burst) pairs overriding default_budgets by name. Defaults to None.
+
+        Returns:
+        - None
+        """
+        budgets = {**self.default_budgets, **(budgets or {})}
+        self.buckets = {name: TokenBucket(rate, capacity) for name, (rate, capacity) in budgets.items()}
+
+    def bucket(self, name):
+        return self.buckets.get(name) or self.buckets["default"]
+
+    def reserve(self, name):
+        return self.bucket(name).reserve()
+
+    def acquire(self, name):
+        return self.bucket(name).acquire()
+
+    def succeeded(self, name, headers):
+        """
+        Records a successful call, pausing the budget if the headers say it is used up.
+
+        Parameters:
+        - name (str): The budget the call was made under.
+        - headers (Mapping): The response headers.
+        """
+        bucket = self.bucket(name)
+        bucket.recover(self.recovery_factor)
+        if headers.get("X-RateLimit-Remaining") == "0":
+            delay = self.retry_after(headers)
+            if delay is not None:
+                bucket.pause(delay)
+
+    def throttled(self, name, headers):
+        """
+        Records a call rejected with HTTP 429.
+
+        Parameters:
+        - name (str): The budget the call was made under.
+        - headers (Mapping): The response headers.
+
+        Returns:
+        - float: The number of seconds the budget is paused for.
+        """
+        delay = self.retry_after(headers)
+        if delay is None:
+            delay = self.default_retry_after
+        self.bucket(name).backoff(delay, self.backoff_factor)
+        return delay
+
+    @staticmethod
+    def retry_after(headers):
+        """
+        Reads how long to wait from Retry-After or X-RateLimit-Reset.
+
+        Parameters:
+        - headers (Mapping): The response headers.
+
+        Returns:
+        - float: The number of seconds to wait, or None if the headers do not say.
+        """
+        for header in ("Retry-After", "X-RateLimit-Reset"):
+            value = headers.get(header)
+            if value is None:
+                continue
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+            # resets may be given as a unix timestamp rather than a number of seconds
+            if value > 1e9:
+                value -= time()
+            return max(0.0, value)
+        return None
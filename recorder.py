@@ -0,0 +1,120 @@
+import gzip
+import threading
+from time import monotonic_ns, sleep
+
+from .codec import codec as default_codec
+
+
+class FrameRecorder:
+    """
+    Appends every raw frame a Gateway receives to a file, for replaying later with replay().
+
+    Each frame is written as one compact JSON line, [nanoseconds since recording started, event, data],
+    timestamped with the monotonic clock and encoded with the same codec as live frames. Paths ending in
+    .gz are gzip compressed.
+
+    Usage:
+        gateway.recorder = FrameRecorder("burst.jsonl.gz")
+        ...
+        gateway.recorder.close()
+
+    Attributes:
+    - path (str): The file frames are written to.
+    - frames (int): The number of frames written.
+    """
+
+    def __init__(self, path, codec=None):
+        """
+        Initializes a new instance of the FrameRecorder class, opening path for appending.
+
+        Parameters:
+        - path (str): The file frames are written to.
+        - codec (Codec): The JSON codec frames are encoded with. Defaults to the fastest installed backend.
+
+        Returns:
+        - None
+        """
+        self.path = path
+        self.dumps = (codec if codec is not None else default_codec).dumps
+        self.file = gzip.open(path, "ab") if path.endswith(".gz") else open(path, "ab")
+        self.started = monotonic_ns()
+        self.lock = threading.Lock()
+        self.frames = 0
+
+    def record(self, event, data):
+        """
+        Writes a single frame.
+
+        Parameters:
+        - event (str): The name of the socket event.
+        - data (any): The frame's data, as received.
+        """
+        line = self.dumps([monotonic_ns() - self.started, event, data])
+        with self.lock:
+            self.file.write(line + b"\n")
+            self.frames += 1
+
+    def close(self):
+        """
+        Flushes and closes the file.
+        """
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_frames(path, codec=None):
+    """
+    Reads frames written by FrameRecorder.
+
+    Parameters:
+    - path (str): The recorded file.
+    - codec (Codec): The JSON codec frames are decoded with. Defaults to the fastest installed backend.
+
+    Yields:
+    - tuple: (nanoseconds since recording started, event, data) for each frame, in recorded order.
+    """
+    loads = (codec if codec is not None else default_codec).loads
+    with (gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")) as file:
+        for line in file:
+            if line.strip():
+                timestamp, event, data = loads(line)
+                yield timestamp, event, data
+
+
+def replay(path, gateway, speed=None):
+    """
+    Feeds a recorded file back through a gateway's frame handlers, without a connection.
+
+    Frames pass through the same path as live frames, including buffering and coalescing when the gateway has them enabled.
+
+    Parameters:
+    - path (str): The recorded file.
+    - gateway (Gateway): The gateway to replay into. Its events object is created if needed.
+    - speed (float): Replay at this multiple of the recorded speed, e.g. 1.0 for real time. Defaults to None, replaying as fast as possible.
+
+    Returns:
+    - int: The number of frames replayed.
+    """
+    gateway.get_events()
+    gateway.start_dispatch()
+    receivers = {event: gateway.receiver(event, handler) for event, handler in gateway.handlers.items()}
+
+    frames = 0
+    started = monotonic_ns()
+    for timestamp, event, data in read_frames(path):
+        receiver = receivers.get(event)
+        if receiver is None:
+            continue
+        if speed is not None:
+            delay = (timestamp / speed - (monotonic_ns() - started)) / 1e9
+            if delay > 0:
+                sleep(delay)
+        receiver(data)
+        frames += 1
+    return frames
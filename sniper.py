@@ -0,0 +1,278 @@
+import threading
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from operator import ge, le
+from time import perf_counter
+
+
+def is_in(value, names):
+    return value in names
+
+
+def is_not_in(value, names):
+    return value not in names
+
+
+class Rule:
+    """
+    A filter for listed items, compiled into a tuple of checks when the Sniper is created.
+
+    Only the conditions that are set are compiled in, so an unused bound costs nothing per item.
+
+    Attributes:
+    - name (str): Identifies the rule in decisions.
+    - price_min (int): The lowest market_value accepted, in coin cents.
+    - price_max (int): The highest market_value accepted, in coin cents.
+    - above_min (float): The lowest above_recommended_price accepted, in percent.
+    - above_max (float): The highest above_recommended_price accepted, in percent.
+    - names (set): If set, only items whose market_name is in it are accepted.
+    - exclude_names (set): Items whose market_name is in it are rejected.
+    - max_bid (int): Bids above this amount are not placed.
+    """
+
+    def __init__(self, name=None, price_min=None, price_max=None, above_min=None, above_max=None, names=None, exclude_names=None, max_bid=None):
+        """
+        Initializes a new instance of the Rule class. Every condition defaults to None, accepting any value.
+        """
+        self.name = name
+        self.price_min = price_min
+        self.price_max = price_max
+        self.above_min = above_min
+        self.above_max = above_max
+        self.names = frozenset(names) if names is not None else None
+        self.exclude_names = frozenset(exclude_names) if exclude_names is not None else None
+        self.max_bid = max_bid
+
+    def compile(self):
+        """
+        Compiles the rule's conditions into a function.
+
+        Returns:
+        - function: Called with an item, returns whether the rule accepts it.
+        """
+        # attribute holding the bound, item field it is checked against, and how; an item missing the field,
+        # or with it null, fails the check
+        bounds = (
+            ("price_min", "market_value", ge),
+            ("price_max", "market_value", le),
+            ("above_min", "above_recommended_price", ge),
+            ("above_max", "above_recommended_price", le),
+            ("names", "market_name", is_in),
+            ("exclude_names", "market_name", is_not_in),
+        )
+        checks = tuple(
+            (field, compare, getattr(self, attribute))
+            for attribute, field, compare in bounds
+            if getattr(self, attribute) is not None
+        )
+
+        def accepts(item):
+            for field, compare, bound in checks:
+                value = item.get(field)
+                if value is None or not compare(value, bound):
+                    return False
+            return True
+        return accepts
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+def default_bid(item):
+    """
+    Returns the amount to bid on an item: its market value, or one more than the highest bid.
+    """
+    highest = item.get("auction_highest_bid")
+    return highest + 1 if highest else item["market_value"]
+
+
+class Sniper:
+    """
+    Bids on new listings matching a set of rules, from the socket frame straight to the bid request.
+
+    Every item of a new_item frame is checked against the compiled rules on the socket thread. Bids
+    on matching items are sent from a small pool of workers over connections opened ahead of time, so
+    neither filtering the rest of the frame nor the bid itself waits on a handshake. Each decision is
+    kept with its timing breakdown.
+
+    Usage:
+        sniper = Sniper(client.withdrawals, [Rule("cheap", price_max=5000, above_max=-3)])
+        sniper.warm()
+        sniper.attach(client.gateway)
+        ...
+        sniper.stats()
+
+    Attributes:
+    - withdrawals (Withdrawals): Used to place bids.
+    - rules (list): The rules, checked in order; the first rule that accepts an item decides.
+    - bid_amount (function): Called with an item, returns the amount to bid.
+    - dry_run (bool): Whether decisions are recorded without placing bids.
+    - decisions (collections.deque): The most recent decisions.
+    - on_decision (function): Called with every decision once its bid completes, if set.
+    """
+
+    def __init__(self, withdrawals, rules, bid_amount=default_bid, max_workers=4, dry_run=False, max_decisions=10000, on_decision=None, max_seen=100000):
+        """
+        Initializes a new instance of the Sniper class.
+
+        Parameters:
+        - withdrawals (Withdrawals): Used to place bids.
+        - rules (list): The rules, checked in order.
+        - bid_amount (function): Called with an item, returns the amount to bid. Defaults to default_bid.
+        - max_workers (int): The number of bids that can be in flight at once. Defaults to 4.
+        - dry_run (bool): Whether to record decisions without placing bids. Defaults to False.
+        - max_decisions (int): The number of recent decisions kept. Defaults to 10000.
+        - on_decision (function): Called with every decision once its bid completes. Defaults to None.
+        - max_seen (int): The number of ids bid on that are remembered before the oldest are forgotten. Defaults to 100000.
+
+        Returns:
+        - None
+        """
+        self.withdrawals = withdrawals
+        self.rules = list(rules)
+        self.compiled = [(rule, rule.compile()) for rule in self.rules]
+        self.bid_amount = bid_amount
+        self.max_workers = max_workers
+        self.dry_run = dry_run
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sniper")
+        self.decisions = deque(maxlen=max_decisions)
+        self.on_decision = on_decision
+        self.gateway = None
+        # ids already bid on, so an item listed again in a later frame is not bid on twice
+        self.seen = OrderedDict()
+        self.max_seen = max_seen
+        self.lock = threading.Lock()
+        self.checked = 0
+
+    def warm(self):
+        """
+        Opens a pooled connection for every worker ahead of the first bid.
+
+        Call it again after a long quiet period, as idle connections may be closed by the server.
+        """
+        self.withdrawals.transport.warm(self.max_workers)
+
+    def attach(self, gateway):
+        """
+        Starts checking every new_item frame received by a gateway.
+
+        Handlers stay registered across automatic reconnects; attach again to the new gateway after Client.reconnect.
+
+        Parameters:
+        - gateway (Gateway): The gateway to listen to.
+        """
+        self.gateway = gateway
+        gateway.on_batch("on_new_item", self.on_items)
+
+    def match(self, item):
+        """
+        Returns the first rule accepting an item.
+
+        Parameters:
+        - item (dict): The listed item.
+
+        Returns:
+        - Rule: The rule, or None if no rule accepts the item.
+        """
+        for rule, accepts in self.compiled:
+            try:
+                if accepts(item):
+                    return rule
+            except TypeError:
+                # a field of the wrong type fails this rule, the next ones may still accept the item
+                continue
+        return None
+
+    def on_items(self, items):
+        """
+        Checks a frame of new items against the rules and sends a bid for every match.
+
+        Parameters:
+        - items (Frame): The items of a new_item frame.
+        """
+        received = getattr(items, "received_at", None)
+        for item in items:
+            self.checked += 1
+            rule = self.match(item)
+            if rule is None:
+                continue
+            amount = self.bid_amount(item)
+            if rule.max_bid is not None and amount > rule.max_bid:
+                continue
+            with self.lock:
+                if item["id"] in self.seen:
+                    continue
+                self.seen[item["id"]] = None
+                if len(self.seen) > self.max_seen:
+                    self.seen.popitem(last=False)
+            matched = perf_counter()
+            decision = {
+                "item_id": item["id"],
+                "rule": rule.name,
+                "amount": amount,
+                "success": None,
+                "error": None,
+                # perf_counter times, converted to durations once the bid completes
+                "received": received if received is not None else matched,
+                "matched": matched,
+            }
+            self.executor.submit(self.bid, decision)
+
+    def bid(self, decision):
+        sent = perf_counter()
+        waited = 0
+        if self.dry_run:
+            decision["success"] = True
+        else:
+            try:
+                self.withdrawals.bid(decision["item_id"], decision["amount"])
+                decision["success"] = True
+            except Exception as e:
+                decision["success"] = False
+                decision["error"] = str(e)
+            # the wait this worker's bid actually slept for, measured by the transport
+            waited = self.withdrawals.transport.last_wait()
+        completed = perf_counter()
+
+        received = decision.pop("received")
+        matched = decision.pop("matched")
+        decision["timings_us"] = {
+            "match": round((matched - received) * 1e6, 1),
+            "queue": round((sent - matched) * 1e6, 1),
+            "rate_limit": round(waited * 1e6, 1),
+            "bid": round((completed - sent - waited) * 1e6, 1),
+            "total": round((completed - received) * 1e6, 1),
+        }
+        self.decisions.append(decision)
+        if self.on_decision is not None:
+            try:
+                self.on_decision(decision)
+            except Exception:
+                traceback.print_exc()
+
+    def stats(self):
+        """
+        Summarizes the decisions kept.
+
+        Returns:
+        - dict: The number of items checked, bids placed and won, and the median and worst timing of each stage in microseconds.
+        """
+        decisions = list(self.decisions)
+        summary = {
+            "checked": self.checked,
+            "bids": len(decisions),
+            "succeeded": sum(1 for decision in decisions if decision["success"]),
+        }
+        for stage in ("match", "queue", "rate_limit", "bid", "total"):
+            values = sorted(decision["timings_us"][stage] for decision in decisions)
+            summary[stage] = {"p50_us": values[len(values) // 2], "max_us": values[-1]} if values else None
+        return summary
+
+    def close(self):
+        """
+        Stops accepting bids and waits for those in flight.
+        """
+        if self.gateway is not None and self.gateway.events is not None:
+            self.gateway.events.off("on_new_item", self.on_items)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,42 @@
+import threading
+
+from ..coalesce import UpdateCoalescer
+
+
+def test_deletion_waits_for_the_window_being_delivered():
+    delivered = []
+    delivering = threading.Event()
+    release = threading.Event()
+
+    def flush(event, items):
+        if event == "updated_item":
+            delivering.set()
+            release.wait(5)
+        delivered.append((event, list(items)))
+
+    coalescer = UpdateCoalescer(60, flush)
+    coalescer.add("updated_item", {"id": 7, "market_value": 1})
+    flushing = threading.Thread(target=coalescer.flush_pending)
+    flushing.start()
+    delivering.wait(5)
+    # the update has been taken off pending but not delivered yet
+    deleting = threading.Thread(target=coalescer.delete, args=("deleted_item", [7]))
+    deleting.start()
+    release.set()
+    flushing.join()
+    deleting.join()
+    coalescer.close()
+
+    assert delivered == [("updated_item", [{"id": 7, "market_value": 1}]), ("deleted_item", [7])]
+
+
+def test_deletion_drops_pending_updates():
+    delivered = []
+    coalescer = UpdateCoalescer(60, lambda event, items: delivered.append((event, items)))
+    coalescer.add("updated_item", [{"id": 7, "market_value": 1}, {"id": 8, "market_value": 2}])
+    coalescer.add("updated_item", {"id": 8, "above_recommended_price": 3})
+    coalescer.delete("deleted_item", 7)
+    coalescer.close()
+
+    assert delivered == [("deleted_item", 7), ("updated_item", [{"id": 8, "market_value": 2, "above_recommended_price": 3}])]
+    assert delivered[1][1].received_at is None
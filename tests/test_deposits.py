@@ -0,0 +1,129 @@
+import asyncio
+
+from .._types import Deposit, InvalidApiKey
+from ..async_client import AsyncClient
+from ..deposits import Deposits
+from ..mockserver import MockServer
+from ..ratelimit import RateLimiter
+from ..transport import Transport
+
+api_key = "0" * 32
+unlimited = {name: (1e9, 1e9) for name in RateLimiter.default_budgets}
+
+
+def deposits_for(server, **options):
+    api_base_url = f"{server.url}/api/v2/"
+    return Deposits(api_key, api_base_url, Transport(api_key, api_base_url, ratelimiter=RateLimiter(unlimited), **options))
+
+
+def test_list_items_reports_each_item_of_a_rejected_batch():
+    with MockServer(market_size=0, inventory_size=30, seed=0) as server:
+        deposits = deposits_for(server)
+        results = deposits.list_items([(item, 0) for item in server.inventory], batch_size=10)
+        deposits.transport.close()
+
+    assert [result["id"] for result in results] == [item["id"] for item in server.inventory]
+    for item, result in zip(server.inventory, results):
+        assert result["success"] is item["tradable"]
+        assert (result["error"] is None) is item["tradable"]
+    # every tradable item is deposited exactly once
+    deposited = sorted(deposit["item_id"] for deposit in server.deposits.values())
+    assert deposited == sorted(item["id"] for item in server.inventory if item["tradable"])
+
+
+def test_list_items_stops_on_rate_limit():
+    with MockServer(market_size=0, inventory_size=30, throttle_rate=1.0, seed=0) as server:
+        deposits = deposits_for(server, max_retries=0)
+        results = deposits.list_items([(item, 0) for item in server.inventory], batch_size=10)
+        deposits.transport.close()
+        requests = server.stats["requests"]
+
+    assert requests == 1
+    assert len(results) == 30
+    assert not any(result["success"] for result in results)
+    assert all(":429:" in result["error"] for result in results)
+
+
+class FailingTransport:
+    """
+    Accepts the first listing request and fails the next with a connection error.
+    """
+
+    def __init__(self):
+        self.sent = 0
+
+    def post(self, *args, **kwargs):
+        self.sent += 1
+        if self.sent > 1:
+            raise ConnectionError("connection reset")
+
+
+def test_list_items_keeps_earlier_results_when_the_connection_fails():
+    deposits = Deposits(api_key, "http://127.0.0.1/api/v2/", FailingTransport())
+    items = [({"id": item_id, "market_value": 100}, 0) for item_id in range(25)]
+    results = deposits.list_items(items, batch_size=10)
+
+    assert deposits.transport.sent == 2
+    assert [result["success"] for result in results] == [True] * 10 + [False] * 15
+    assert results[-1]["error"] == "ConnectionError: connection reset"
+
+
+def test_async_list_items_reports_each_item_of_a_rejected_batch():
+    async def list_inventory(server):
+        async with AsyncClient(api_key, domain=server.url, ws_url=server.url, socket_enabled=False) as client:
+            client.transport.ratelimiter = RateLimiter(unlimited)
+            return await client.list_items([(item, 0) for item in server.inventory], batch_size=10)
+
+    with MockServer(market_size=0, inventory_size=30, seed=0) as server:
+        results = asyncio.run(list_inventory(server))
+
+    assert [result["success"] for result in results] == [item["tradable"] for item in server.inventory]
+    assert len(server.deposits) == sum(item["tradable"] for item in server.inventory)
+
+
+class FlakyDeposit(dict):
+    """
+    A deposit whose cancel fails with the given exception, or succeeds without one.
+    """
+
+    def __init__(self, deposit_id, error=None):
+        super().__init__(id=deposit_id)
+        self.error = error
+
+    def cancel(self):
+        if self.error is not None:
+            raise self.error
+
+
+def test_bulk_report_records_every_failure_per_deposit():
+    deposits = Deposits(api_key, "http://127.0.0.1/api/v2/", FailingTransport())
+    batch = [FlakyDeposit(1), FlakyDeposit(2, TimeoutError("read timed out")), FlakyDeposit(3, InvalidApiKey("Deposits:cancel:401: Unauthenticated.")), FlakyDeposit(4, ConnectionError())]
+    report = deposits.cancel_many(batch)
+
+    assert report["succeeded"] == [1]
+    assert report["failed"] == {
+        2: "TimeoutError: read timed out",
+        3: "Deposits:cancel:401: Unauthenticated.",
+        4: "ConnectionError",
+    }
+
+
+def test_inventory_cache_goes_stale_after_listing_and_cancelling():
+    with MockServer(market_size=0, inventory_size=10, seed=0) as server:
+        deposits = deposits_for(server)
+        listable = deposits.get_inventory()
+        assert deposits.inventory.is_fresh(deposits.inventory_ttl)
+
+        listable[0].list_item(0)
+        assert not deposits.inventory.is_fresh(deposits.inventory_ttl)
+
+        listable = deposits.get_inventory()
+        assert deposits.inventory.is_fresh(deposits.inventory_ttl)
+        deposits.list_items([(item, 0) for item in listable[1:3]])
+        assert not deposits.inventory.is_fresh(deposits.inventory_ttl)
+
+        deposits.get_inventory()
+        deposit_id = next(iter(server.deposits))
+        assert Deposit(deposits.transport, {"id": deposit_id}, inventory=deposits.inventory).cancel()
+        assert not deposits.inventory.is_fresh(deposits.inventory_ttl)
+        deposits.transport.close()
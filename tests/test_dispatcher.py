@@ -0,0 +1,45 @@
+import random
+import threading
+import time
+
+from ..dispatcher import Dispatcher, Frame, OrderedExecutor
+
+
+def test_events_of_an_item_stay_in_order_on_workers():
+    executor = OrderedExecutor(4)
+    events = Dispatcher(executor)
+    seen = {}
+    lock = threading.Lock()
+    jitter = random.Random(0)
+
+    def record(name):
+        def handler(item):
+            item_id = item["id"] if isinstance(item, dict) else item
+            time.sleep(jitter.random() / 1000)
+            with lock:
+                seen.setdefault(item_id, []).append(name)
+        return handler
+
+    events.on("on_new_item", record("new"))
+    events.on("on_updated_item", record("updated"))
+    events.on("on_deleted_item", record("deleted"))
+    item_ids = list(range(50))
+    for start in range(0, 50, 10):
+        events.trigger_batch("on_new_item", [{"id": item_id} for item_id in item_ids[start:start + 10]])
+    events.trigger_batch("on_updated_item", [{"id": item_id} for item_id in item_ids])
+    events.trigger_batch("on_deleted_item", item_ids)
+    executor.shutdown(wait=True)
+
+    assert seen == {item_id: ["new", "updated", "deleted"] for item_id in item_ids}
+
+
+def test_batch_handlers_on_workers_keep_the_receive_time():
+    executor = OrderedExecutor(2)
+    events = Dispatcher(executor)
+    frames = []
+    events.on_batch("on_new_item", frames.append)
+    events.trigger_batch("on_new_item", Frame([{"id": item_id} for item_id in range(10)], 12.5))
+    executor.shutdown(wait=True)
+
+    assert sorted(item["id"] for frame in frames for item in frame) == list(range(10))
+    assert all(frame.received_at == 12.5 for frame in frames)
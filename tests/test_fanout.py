@@ -0,0 +1,27 @@
+import multiprocessing
+
+from ..fanout import FanoutConsumer, FanoutPublisher
+
+received = multiprocessing.Queue()
+
+
+def forward(event, data):
+    received.put(data["id"])
+
+
+def test_consumer_reads_from_its_start_position():
+    with FanoutPublisher(capacity=64 * 1024) as publisher:
+        start_position = publisher.write_position
+        publisher.publish_items("new_item", [{"id": item_id} for item_id in range(10)])
+        consumer = FanoutConsumer(publisher.name, start_position=start_position)
+        assert [data["id"] for _, data in consumer.poll()] == list(range(10))
+        assert consumer.dropped == 0
+        consumer.close()
+
+
+def test_workers_receive_records_published_before_they_attach():
+    with FanoutPublisher(capacity=64 * 1024) as publisher:
+        publisher.start_workers(forward, workers=2, events=["new_item"])
+        # published right away, before the worker processes have attached
+        publisher.publish_items("new_item", [{"id": item_id} for item_id in range(20)])
+        assert sorted(received.get(timeout=10) for _ in range(20)) == list(range(20))
@@ -0,0 +1,53 @@
+import threading
+
+from ..market import MarketBook
+
+
+class SlowWithdrawals:
+    """
+    Returns a fixed listing, once released, so events can arrive while a seed is fetching.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def get_items(self, **kwargs):
+        self.fetching.set()
+        self.release.wait(5)
+        return self.items
+
+
+def item(item_id, market_value=100):
+    return {"id": item_id, "market_value": market_value, "above_recommended_price": 0, "auction_ends_at": None}
+
+
+def test_events_during_seed_are_applied_after_the_listing():
+    book = MarketBook()
+    withdrawals = SlowWithdrawals([item(1), item(2), item(3)])
+    seeding = threading.Thread(target=book.seed, args=(withdrawals,))
+    seeding.start()
+    withdrawals.fetching.wait(5)
+    book.remove(2)
+    book.add(item(4))
+    book.update({"id": 1, "market_value": 50})
+    withdrawals.release.set()
+    seeding.join()
+
+    assert sorted(book.items) == [1, 3, 4]
+    assert book.get(1)["market_value"] == 50
+    assert [listed["id"] for listed in book.by_market_value()] == [1, 3, 4]
+
+
+def test_book_does_not_change_the_callers_items():
+    items = [item(1)]
+    book = MarketBook()
+    book.load(items)
+    new = item(2)
+    book.add(new)
+    book.update({"id": 1, "market_value": 50})
+    book.update({"id": 2, "market_value": 60})
+
+    assert items[0]["market_value"] == 100
+    assert new["market_value"] == 100
@@ -0,0 +1,23 @@
+import pytest
+
+from .._types import RequestError
+from ..mockserver import MockServer
+from ..ratelimit import RateLimiter
+from ..transport import Transport
+
+api_key = "0" * 32
+unlimited = {name: (1e9, 1e9) for name in RateLimiter.default_budgets}
+
+
+def test_rejected_deposit_batch_changes_nothing():
+    with MockServer(market_size=0, inventory_size=20, seed=0) as server:
+        transport = Transport(api_key, f"{server.url}/api/v2/", ratelimiter=RateLimiter(unlimited))
+        tradable = [item for item in server.inventory if item["tradable"]]
+        untradable = next(item for item in server.inventory if not item["tradable"])
+        items = [{"id": item["id"], "custom_price_percentage": 0, "coin_value": item["market_value"]} for item in (tradable[0], untradable)]
+        with pytest.raises(RequestError):
+            transport.post("trading/deposit", "Deposits", "list_items", data={"items": items})
+        assert server.deposits == {}
+        transport.post("trading/deposit", "Deposits", "list_items", data={"items": items[:1]})
+        assert [deposit["item_id"] for deposit in server.deposits.values()] == [tradable[0]["id"]]
+        transport.close()
@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from .. import pool
+
+
+class FakeGateway:
+    def __init__(self):
+        self.disconnected = False
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class FakeClient:
+    """
+    Stands in for Client, failing for the "bad" token once the other clients have started being created.
+    """
+
+    created = []
+    started = threading.Barrier(3)
+
+    def __init__(self, token, **kwargs):
+        FakeClient.started.wait(5)
+        if token == "bad":
+            raise RuntimeError("metadata unavailable")
+        self.gateway = FakeGateway()
+        FakeClient.created.append(self)
+
+
+def test_every_created_client_is_closed_when_one_fails(monkeypatch):
+    monkeypatch.setattr(pool, "Client", FakeClient)
+    with pytest.raises(RuntimeError):
+        pool.ClientPool(["bad", "good", "also good"], domain="http://127.0.0.1", workers=3)
+
+    assert len(FakeClient.created) == 2
+    assert all(client.gateway.disconnected for client in FakeClient.created)
@@ -0,0 +1,19 @@
+import pytest
+
+from .. import codec
+from ..recorder import FrameRecorder, read_frames
+
+
+@pytest.mark.parametrize("name", ["frames.jsonl", "frames.jsonl.gz"])
+def test_recorded_frames_read_back(tmp_path, name):
+    path = str(tmp_path / name)
+    frames = [("new_item", [{"id": 1, "market_name": "AK", "market_value": 1000}]), ("deleted_item", [1])]
+    with FrameRecorder(path) as recorder:
+        for event, data in frames:
+            recorder.record(event, data)
+
+    read = list(read_frames(path))
+    assert [(event, data) for _, event, data in read] == frames
+    assert read[0][0] <= read[1][0]
+    # files written by any backend read back with any other
+    assert [(event, data) for _, event, data in read_frames(path, codec.select("json"))] == frames
@@ -0,0 +1,56 @@
+from ..dispatcher import Frame
+from ..mockserver import MockServer
+from ..ratelimit import RateLimiter
+from ..sniper import Rule, Sniper
+from ..transport import Transport
+from ..withdrawals import Withdrawals
+
+api_key = "0" * 32
+
+
+def item(**fields):
+    return {"id": 1, "market_name": "AK", "market_value": 1000, "above_recommended_price": -5, **fields}
+
+
+def test_rule_checks_each_set_bound():
+    accepts = Rule(price_min=500, price_max=2000, above_max=-3, names={"AK"}, exclude_names={"M4"}).compile()
+    assert accepts(item())
+    assert not accepts(item(market_value=100))
+    assert not accepts(item(market_value=5000))
+    assert not accepts(item(above_recommended_price=0))
+    assert not accepts(item(market_name="AWP"))
+    assert Rule().compile()({})
+
+
+def test_rule_fails_on_missing_or_null_field():
+    accepts = Rule(above_max=-3).compile()
+    assert not accepts(item(above_recommended_price=None))
+    assert not accepts({"id": 1})
+
+
+def test_later_rules_are_checked_when_an_earlier_one_cannot_be():
+    sniper = Sniper(None, [Rule("discount", above_max=-3), Rule("wanted", names={"AK"}), Rule("any")], dry_run=True)
+    try:
+        assert sniper.match(item(above_recommended_price=None)).name == "wanted"
+        assert sniper.match(item(above_recommended_price="-5", market_name="AWP")).name == "any"
+    finally:
+        sniper.close()
+
+
+def test_bid_timings_use_the_rate_limit_wait_of_each_bid():
+    with MockServer(market_size=10, inventory_size=0, seed=0) as server:
+        api_base_url = f"{server.url}/api/v2/"
+        # one bid at once every 0.2 seconds
+        transport = Transport(api_key, api_base_url, ratelimiter=RateLimiter({"bid": (5, 1)}))
+        sniper = Sniper(Withdrawals(api_key, api_base_url, transport=transport), [Rule()], max_workers=3)
+        items = [{**server.items[item_id], "auction_highest_bid": None} for item_id in list(server.items)[:3]]
+        sniper.on_items(Frame(items))
+        sniper.close()
+        transport.close()
+
+    waits = sorted(decision["timings_us"]["rate_limit"] for decision in sniper.decisions)
+    assert all(decision["success"] for decision in sniper.decisions)
+    assert waits[0] < 50000
+    assert 150000 < waits[1] < 250000
+    assert 350000 < waits[2] < 450000
+    assert all(decision["timings_us"]["bid"] >= 0 for decision in sniper.decisions)
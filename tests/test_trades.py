@@ -0,0 +1,62 @@
+import threading
+
+from ..gateway import Gateway
+from ..market import MarketBook
+from ..trades import TradeTracker
+
+
+def status(trade_id, code, trade_type="deposit"):
+    return {"type": trade_type, "data": {"id": trade_id, "item_id": 100 + trade_id, "status": code}}
+
+
+def test_deposit_is_credited_after_completing():
+    tracker = TradeTracker()
+    for code in (2, 6, 10):
+        tracker.update(status(1, code))
+    assert tracker.get(1).status_name == "credited"
+    assert tracker.get(1).is_final
+
+
+def test_withdrawal_ends_when_completed():
+    tracker = TradeTracker()
+    tracker.update(status(2, 6, "withdrawal"))
+    assert tracker.get(2).is_final
+
+
+def test_waiting_for_credit_does_not_return_on_completion():
+    tracker = TradeTracker()
+    tracker.update(status(1, 2))
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(tracker.wait_for(1, "credited", timeout=5)))
+    waiter.start()
+    tracker.update(status(1, 6))
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    tracker.update(status(1, 10))
+    waiter.join(5)
+    assert result[0].status_name == "credited"
+
+
+class Metadata:
+    user_id = 1
+
+
+def test_handlers_survive_an_automatic_reconnect():
+    gateway = Gateway(api_key="0" * 32, api_base_url="", metadata=Metadata())
+    events = gateway.get_events()
+    tracker = TradeTracker()
+    tracker.attach(gateway)
+    book = MarketBook()
+    book.attach(gateway)
+    reconnects = []
+    gateway.on("on_reconnect", reconnects.append)
+
+    gateway.disconnected("transport close")
+    gateway.connected()
+    gateway.new_item_handler([{"id": 1, "market_value": 100}])
+    gateway.trade_status_handler(status(3, 2))
+
+    assert gateway.events is events
+    assert reconnects == [True]
+    assert 1 in book
+    assert tracker.get(3).status_name == "processing"
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from .._types import InvalidApiKey, RequestError
+from ..async_transport import AsyncTransport
+from ..mockserver import MockServer
+from ..transport import Transport
+
+api_key = "0" * 32
+
+
+async def empty_error(request):
+    return web.Response(status=502)
+
+
+async def error_without_message(request):
+    return web.json_response({"success": False}, status=401)
+
+
+@pytest.fixture
+def server():
+    server = MockServer(market_size=0, inventory_size=0, seed=0)
+    server.app.router.add_get("/api/v2/empty", empty_error)
+    server.app.router.add_get("/api/v2/no-message", error_without_message)
+    with server:
+        yield server
+
+
+def test_error_without_a_body_raises_the_api_error(server):
+    transport = Transport(api_key, f"{server.url}/api/v2/")
+    with pytest.raises(RequestError, match="Test:empty:502: no error message") as raised:
+        transport.get("empty", "Test", "empty")
+    assert raised.value.status == 502
+    with pytest.raises(InvalidApiKey, match="Test:no_message:401: no error message"):
+        transport.get("no-message", "Test", "no_message")
+    transport.close()
+
+
+def test_async_error_without_a_body_raises_the_api_error(server):
+    async def request(endpoint):
+        transport = AsyncTransport(api_key, f"{server.url}/api/v2/")
+        try:
+            await transport.get(endpoint, "Test", endpoint.replace("-", "_"))
+        finally:
+            await transport.close()
+
+    with pytest.raises(RequestError, match="Test:empty:502: no error message"):
+        asyncio.run(request("empty"))
+    with pytest.raises(InvalidApiKey, match="Test:no_message:401: no error message"):
+        asyncio.run(request("no-message"))
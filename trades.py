@@ -0,0 +1,370 @@
+import threading
+import traceback
+from collections import OrderedDict
+from time import time
+
+status_names = {
+    -1: "error",
+    0: "pending",
+    1: "received",
+    2: "processing",
+    3: "sending",
+    4: "confirming",
+    5: "sent",
+    6: "completed",
+    7: "declined",
+    8: "canceled",
+    9: "timedout",
+    10: "credited",
+}
+status_codes = {name: code for code, name in status_names.items()}
+
+# statuses a trade moves through in order, any of which may be skipped
+progress = (0, 1, 2, 3, 4, 5, 6, 10)
+# statuses that end a trade, however far it got
+failures = frozenset((-1, 7, 8, 9))
+final = failures | {6, 10}
+# a deposit is credited to the seller after it completes, so only crediting ends it
+deposit_final = failures | {10}
+
+
+def final_statuses(trade_type):
+    """
+    Returns the statuses that end a trade of the given type.
+    """
+    return deposit_final if trade_type == "deposit" else final
+
+
+def status_code(status):
+    """
+    Returns the numeric code of a status given by name or code.
+    """
+    return status_codes[status] if isinstance(status, str) else status
+
+
+def is_valid_transition(current, status):
+    """
+    Returns whether a trade may move from one status to another.
+
+    A trade moves forward through progress, skipping statuses when frames are missed, or fails from any
+    status that is not final. Nothing follows a final status, except credited following completed.
+
+    Parameters:
+    - current (int): The trade's current status code, None if it is not known yet.
+    - status (int): The new status code.
+
+    Returns:
+    - bool: Whether the transition is valid.
+    """
+    if current is None:
+        return True
+    if current == status_codes["completed"] and status == status_codes["credited"]:
+        return True
+    if current in final:
+        return False
+    if status in failures:
+        return True
+    return status in progress and progress.index(status) > progress.index(current)
+
+
+class Trade:
+    """
+    The known state of a single trade.
+
+    Attributes:
+    - id (int): The trade id.
+    - type (str): "deposit" or "withdrawal".
+    - item_id (int): The id of the traded item.
+    - status (int): The current status code.
+    - data (dict): The data of the latest accepted status frame.
+    - history (list): (status code, unix time) for every accepted status.
+    """
+
+    __slots__ = ("id", "type", "item_id", "status", "data", "history")
+
+    def __init__(self, trade_id, trade_type=None, item_id=None):
+        self.id = trade_id
+        self.type = trade_type
+        self.item_id = item_id
+        self.status = None
+        self.data = None
+        self.history = []
+
+    @property
+    def status_name(self):
+        return status_names.get(self.status)
+
+    @property
+    def is_final(self):
+        return self.status in final_statuses(self.type)
+
+    def to_dict(self):
+        return {"id": self.id, "type": self.type, "item_id": self.item_id, "status": self.status, "status_name": self.status_name, "data": self.data, "history": list(self.history)}
+
+    def __repr__(self):
+        return f"Trade(id={self.id!r}, type={self.type!r}, status={self.status_name!r})"
+
+
+class TradeTracker:
+    """
+    The state of every trade seen on the socket, updated from trade_status and deposit_failed frames.
+
+    Trades are looked up by trade id or item id without a request. Status frames that would move a trade
+    backwards or out of a final status, e.g. when frames arrive out of order, are rejected. Callers can
+    block, await or register callbacks until a trade reaches a status, instead of polling
+    get_active_deposits.
+
+    Usage:
+        tracker = TradeTracker()
+        tracker.attach(client.gateway)
+        trade = tracker.wait_for(trade_id, "sent", timeout=300)
+
+    Attributes:
+    - trades (dict): Every tracked trade, keyed by trade id.
+    - items (dict): The latest trade of each item, keyed by item id.
+    - rejected (int): The number of status frames rejected as invalid transitions.
+    - max_finished (int): The number of trades in a final status kept before the oldest are forgotten.
+    """
+
+    def __init__(self, max_finished=10000):
+        """
+        Initializes a new, empty instance of the TradeTracker class.
+
+        Parameters:
+        - max_finished (int): The number of trades in a final status kept. Defaults to 10000.
+
+        Returns:
+        - None
+        """
+        self.trades = {}
+        self.items = {}
+        self.finished = OrderedDict()
+        self.max_finished = max_finished
+        self.rejected = 0
+        self.condition = threading.Condition()
+        self.callbacks = ()
+        # asyncio waiters as (trade id, wanted status codes, future)
+        self.waiters = []
+
+    def __len__(self):
+        return len(self.trades)
+
+    def get(self, trade_id):
+        """
+        Returns the trade with the given id, or None if it has not been seen.
+        """
+        return self.trades.get(trade_id)
+
+    def by_item(self, item_id):
+        """
+        Returns the latest trade of the given item, or None if it has not been seen.
+        """
+        return self.items.get(item_id)
+
+    def active(self):
+        """
+        Returns every trade that has not reached a final status.
+        """
+        with self.condition:
+            return [trade for trade in self.trades.values() if not trade.is_final]
+
+    # updating
+
+    def attach(self, gateway):
+        """
+        Keeps the tracker current from a gateway's trade events.
+
+        Handlers stay registered across automatic reconnects. Client.reconnect replaces the gateway and attaches the client's tracker to the new one.
+
+        Parameters:
+        - gateway (Gateway): The gateway to listen to.
+        """
+        gateway.on("on_trade_status", self.update)
+        gateway.on("on_failed_deposit", self.fail)
+
+    def load(self, deposits):
+        """
+        Adds trades fetched over REST, e.g. from get_active_deposits, so frames for them are validated.
+
+        Parameters:
+        - deposits (list): Deposits or trade dictionaries with an id, item_id and status.
+        """
+        for deposit in deposits:
+            self.apply(deposit["id"], "deposit", deposit.get("item_id"), deposit.get("status"), dict(deposit) if isinstance(deposit, dict) else deposit.to_dict())
+
+    def update(self, frame):
+        """
+        Applies a trade_status frame.
+
+        Parameters:
+        - frame (dict): The frame, with the trade type and its data, including the trade id and usually its status.
+
+        Returns:
+        - bool: Whether the frame changed the trade's status.
+        """
+        data = frame["data"]
+        return self.apply(data.get("id"), frame.get("type"), data.get("item_id"), data.get("status"), data)
+
+    def fail(self, data):
+        """
+        Applies a deposit_failed frame, moving the deposit to the error status.
+
+        Parameters:
+        - data (dict): The frame's data, with the deposit id or item id.
+
+        Returns:
+        - bool: Whether the frame changed the trade's status.
+        """
+        trade_id = data.get("id")
+        if trade_id is None and data.get("item_id") in self.items:
+            trade_id = self.items[data["item_id"]].id
+        return self.apply(trade_id, "deposit", data.get("item_id"), status_codes["error"], data)
+
+    def apply(self, trade_id, trade_type, item_id, status, data):
+        """
+        Moves a trade to a status if the transition is valid, then wakes its waiters.
+
+        Parameters:
+        - trade_id (int): The trade id.
+        - trade_type (str): "deposit" or "withdrawal".
+        - item_id (int): The id of the traded item, if known.
+        - status (int): The new status code, None if the frame does not include one.
+        - data (dict): The data the status arrived with.
+
+        Returns:
+        - bool: Whether the trade's status changed.
+        """
+        if trade_id is None:
+            return False
+        with self.condition:
+            trade = self.trades.get(trade_id)
+            if trade is None:
+                trade = self.trades[trade_id] = Trade(trade_id, trade_type, item_id)
+            if item_id is not None:
+                trade.item_id = item_id
+                self.items[item_id] = trade
+            if trade_type is not None:
+                trade.type = trade_type
+
+            previous = trade.status
+            if status is None or status == previous:
+                # frames without a status, or repeating it, only carry new details of the current one
+                if data is not None and trade.data is not None:
+                    trade.data = {**trade.data, **data}
+                return False
+            if not is_valid_transition(previous, status):
+                self.rejected += 1
+                return False
+
+            trade.status = status
+            trade.data = data
+            trade.history.append((status, time()))
+            if trade.is_final:
+                self.finish(trade)
+            self.condition.notify_all()
+            waiters = self.waiters
+            callbacks = self.callbacks
+
+        for waiter in list(waiters):
+            self.resolve(waiter, trade)
+        for callback in callbacks:
+            try:
+                callback(trade, previous)
+            except Exception:
+                traceback.print_exc()
+        return True
+
+    def finish(self, trade):
+        self.finished[trade.id] = trade
+        while len(self.finished) > self.max_finished:
+            trade_id, forgotten = self.finished.popitem(last=False)
+            self.trades.pop(trade_id, None)
+            if self.items.get(forgotten.item_id) is forgotten:
+                del self.items[forgotten.item_id]
+
+    # waiting
+
+    def on_change(self, callback):
+        """
+        Registers a callback called with (trade, previous status code) after every accepted status change.
+
+        Parameters:
+        - callback (function): The callback.
+
+        Returns:
+        - function: The callback, so this can be used as a decorator.
+        """
+        with self.condition:
+            self.callbacks = self.callbacks + (callback,)
+        return callback
+
+    @staticmethod
+    def wanted_codes(statuses):
+        statuses = statuses if isinstance(statuses, (list, tuple, set, frozenset)) else [statuses]
+        return frozenset(status_code(status) for status in statuses)
+
+    @staticmethod
+    def reached(trade, wanted):
+        # a final status ends the wait even if it is not one of the wanted ones
+        return trade is not None and (trade.status in wanted or trade.is_final)
+
+    def wait_for(self, trade_id, statuses, timeout=None):
+        """
+        Blocks until a trade reaches one of the given statuses, or any final status.
+
+        Parameters:
+        - trade_id (int): The trade id.
+        - statuses (str | int | list): The status, or statuses, by name or code.
+        - timeout (float): The maximum number of seconds to wait. Defaults to None, waiting indefinitely.
+
+        Returns:
+        - Trade: The trade, whose status tells which status was reached, or None if the timeout expired first.
+        """
+        wanted = self.wanted_codes(statuses)
+        with self.condition:
+            if self.condition.wait_for(lambda: self.reached(self.trades.get(trade_id), wanted), timeout):
+                return self.trades[trade_id]
+            return None
+
+    async def wait(self, trade_id, statuses, timeout=None):
+        """
+        Waits without blocking the event loop until a trade reaches one of the given statuses, or any final status.
+
+        Parameters:
+        - trade_id (int): The trade id.
+        - statuses (str | int | list): The status, or statuses, by name or code.
+        - timeout (float): The maximum number of seconds to wait. Defaults to None, waiting indefinitely.
+
+        Returns:
+        - Trade: The trade, or None if the timeout expired first.
+        """
+        import asyncio
+
+        wanted = self.wanted_codes(statuses)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (trade_id, wanted, future)
+        with self.condition:
+            trade = self.trades.get(trade_id)
+            if self.reached(trade, wanted):
+                return trade
+            self.waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self.condition:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+
+    def resolve(self, waiter, trade):
+        trade_id, wanted, future = waiter
+        if trade.id != trade_id or not self.reached(trade, wanted):
+            return
+
+        def set_result():
+            if not future.done():
+                future.set_result(trade)
+
+        future.get_loop().call_soon_threadsafe(set_result)
@@ -0,0 +1,213 @@
+import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from time import perf_counter
+from ._types import handle_error
+from .ratelimit import RateLimiter
+from .codec import codec as default_codec
+
+
+class Transport:
+    """
+    A pooled HTTP transport shared by every REST call made on behalf of a single API key.
+
+    Connections are kept alive between calls, so after the first request to the API every
+    following request skips the TCP and TLS handshake. Every request waits on its budget in the
+    rate limiter, and requests rejected with HTTP 429 are retried once the budget allows it.
+
+    Attributes:
+    - api_key (str): The API key used for authentication.
+    - api_base_url (str): The base URL for API requests.
+    - headers (dict): The headers sent with every request.
+    - timeout (float | tuple): The (connect, read) timeout applied to every request.
+    - session (requests.Session): The underlying session, with its own cookies and a connection pool possibly shared with other transports.
+    - ratelimiter (RateLimiter): The rate limits applied to every request.
+    - max_retries (int): The number of times a request rejected with HTTP 429 is retried.
+    - metrics (Metrics): Records latency, status codes, retries, rate limit waits and decode time when set.
+    - codec (Codec): Encodes request bodies and decodes responses.
+
+    Methods:
+    - request(method, endpoint, class_name, function_name, params=None, data=None, budget="default"): Sends a request and returns the decoded response.
+    - get(endpoint, class_name, function_name, params=None, budget="default"): Sends a GET request.
+    - post(endpoint, class_name, function_name, data=None, budget="default"): Sends a POST request.
+    - last_wait(): Returns how long the calling thread's latest request waited on its rate limit budget.
+    - warm(connections=1): Opens pooled connections ahead of time.
+    - close(): Closes all pooled connections.
+    """
+
+    default_pool_size = 10
+    default_timeout = (3.05, 10)
+    default_max_retries = 3
+
+    def __init__(self, api_key, api_base_url, pool_size=default_pool_size, timeout=default_timeout, ratelimiter=None, max_retries=default_max_retries, metrics=None, codec=None, adapter=None):
+        """
+        Initializes a new instance of the Transport class.
+
+        Parameters:
+        - api_key (str): The API key used for authentication.
+        - api_base_url (str): The base URL for API requests.
+        - pool_size (int): The maximum number of keep-alive connections held open. Defaults to 10.
+        - timeout (float | tuple): The (connect, read) timeout in seconds. Defaults to (3.05, 10).
+        - ratelimiter (RateLimiter): The rate limits to apply. A new one with the default budgets is created if not provided.
+        - max_retries (int): The number of times a request rejected with HTTP 429 is retried. Defaults to 3.
+        - metrics (Metrics): Records every request when set. Defaults to None.
+        - codec (Codec): The JSON codec to use. Defaults to the fastest installed backend.
+        - adapter (HTTPAdapter): A connection pool shared with other transports, e.g. by a ClientPool. The
+          session keeps its own headers and cookies, so nothing set for one API key is sent with another's
+          requests. A new adapter with pool_size connections is created if not provided.
+
+        Returns:
+        - None
+        """
+        self.api_key = api_key
+        self.api_base_url = api_base_url
+        self.timeout = timeout
+        self.ratelimiter = ratelimiter if ratelimiter is not None else RateLimiter()
+        self.max_retries = max_retries
+        self.metrics = metrics
+        self.codec = codec if codec is not None else default_codec
+        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+        # the rate limit wait of each thread's latest request, as requests share the transport across threads
+        self.waits = threading.local()
+
+        self.shared_adapter = adapter is not None
+        self.adapter = adapter if adapter is not None else self.create_adapter(pool_size)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    @staticmethod
+    def create_adapter(pool_size=default_pool_size):
+        """
+        Creates a connection pool keeping up to pool_size connections alive per host.
+
+        Parameters:
+        - pool_size (int): The maximum number of keep-alive connections held open. Defaults to 10.
+
+        Returns:
+        - HTTPAdapter: The new adapter.
+        """
+        return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def request(self, method, endpoint, class_name, function_name, params=None, data=None, budget="default"):
+        """
+        Sends a request to the API and returns the decoded response.
+
+        Parameters:
+        - method (str): The HTTP method to use.
+        - endpoint (str): The endpoint, relative to api_base_url.
+        - class_name (str): The name of the calling class, used in error messages.
+        - function_name (str): The name of the calling function, used in error messages.
+        - params (dict): Query string parameters. Defaults to None.
+        - data (dict): The JSON body to send. Defaults to None.
+        - budget (str): The rate limit budget the request counts against. Defaults to "default".
+
+        Returns:
+        - dict: The decoded response if the request is successful, otherwise raises an error.
+        """
+        url = self.api_base_url + endpoint
+        body = self.codec.dumps(data) if data is not None else None
+
+        metrics = self.metrics
+        waits = self.waits
+        waits.seconds = 0
+        for attempt in range(self.max_retries + 1):
+            if metrics is None:
+                waits.seconds += self.ratelimiter.acquire(budget)
+                response = self.session.request(method, url, params=params, data=body, timeout=self.timeout)
+            else:
+                started = perf_counter()
+                waits.seconds += self.ratelimiter.acquire(budget)
+                sent = perf_counter()
+                response = self.session.request(method, url, params=params, data=body, timeout=self.timeout)
+                metrics.wait(budget, sent - started)
+                metrics.request(method, endpoint, response.status_code, perf_counter() - sent)
+            if response.status_code != 429:
+                break
+            if metrics is not None and attempt < self.max_retries:
+                metrics.retry(method, endpoint)
+            self.ratelimiter.throttled(budget, response.headers)
+
+        status = response.status_code
+        headers = response.headers
+        content = response.content
+        if metrics is None:
+            response = self.codec.loads(content) if content else None
+        else:
+            started = perf_counter()
+            response = self.codec.loads(content) if content else None
+            metrics.decode(method, endpoint, perf_counter() - started)
+
+        if status == 200:
+            self.ratelimiter.succeeded(budget, headers)
+            return response
+        else:
+            handle_error(status, response if response is not None else {}, class_name, function_name, RateLimiter.retry_after(headers))
+
+    def last_wait(self):
+        """
+        Returns how long the calling thread's latest request waited on its rate limit budget, including retries.
+
+        Returns:
+        - float: The number of seconds waited, 0 if the thread has not sent a request.
+        """
+        return getattr(self.waits, "seconds", 0)
+
+    def warm(self, connections=1):
+        """
+        Opens pooled connections ahead of time, so the next requests skip the TCP and TLS handshake.
+
+        Warming is best effort; connections that fail to open are opened by the next request instead.
+
+        Parameters:
+        - connections (int): The number of connections to open, at most the pool size. Defaults to 1.
+        """
+        def open_connection(_):
+            try:
+                self.session.head(self.api_base_url, timeout=self.timeout)
+            except requests.RequestException:
+                pass
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(open_connection, range(connections)))
+
+    def get(self, endpoint, class_name, function_name, params=None, budget="default"):
+        """
+        Sends a GET request to the API.
+
+        Parameters:
+        - endpoint (str): The endpoint, relative to api_base_url.
+        - class_name (str): The name of the calling class, used in error messages.
+        - function_name (str): The name of the calling function, used in error messages.
+        - params (dict): Query string parameters. Defaults to None.
+        - budget (str): The rate limit budget the request counts against. Defaults to "default".
+
+        Returns:
+        - dict: The decoded response.
+        """
+        return self.request("GET", endpoint, class_name, function_name, params=params, budget=budget)
+
+    def post(self, endpoint, class_name, function_name, data=None, budget="default"):
+        """
+        Sends a POST request to the API.
+
+        Parameters:
+        - endpoint (str): The endpoint, relative to api_base_url.
+        - class_name (str): The name of the calling class, used in error messages.
+        - function_name (str): The name of the calling function, used in error messages.
+        - data (dict): The JSON body to send. Defaults to None.
+        - budget (str): The rate limit budget the request counts against. Defaults to "default".
+
+        Returns:
+        - dict: The decoded response.
+        """
+        return self.request("POST", endpoint, class_name, function_name, data=data, budget=budget)
+
+    def close(self):
+        """
+        Closes all pooled connections, unless the adapter is shared, in which case its owner closes it.
+        """
+        if not self.shared_adapter:
+            self.session.close()
@@ -1,7 +1,6 @@
-import requests
-import json
-from ._types import handle_error
-from time import sleep, time
+from ._types import Item
+from .transport import Transport
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Withdrawals(dict):
@@ -11,7 +10,7 @@ class Withdrawals(dict):
     Attributes:
         api_key (str): The API key used for authorization.
         api_base_url (str): The base URL for the trading API.
-        headers (dict): Headers for making API requests with the API key.
+        transport (Transport): The pooled HTTP transport used for API requests.
 
     Methods:
         bid(item_id: int, amount: int) -> bool:
@@ -24,7 +23,8 @@ class Withdrawals(dict):
 
         get_items(per_page: int = 2500, page: int = 1, search: str = "", order: str = "market_value", 
                   sort="desc", auction: str = "yes", price_min: int = 1, price_max: int = 100000,
-                  price_max_above: int = 15) -> list:
+                  price_max_above: int = 15, concurrent: bool = False, max_workers: int = 4, columnar: bool = False,
+                  compact: bool = False) -> list:
             Get a list of listed items with the specified filters.
             Parameters:
                 per_page (int): Number of items per page.
@@ -36,16 +36,28 @@ class Withdrawals(dict):
                 price_min (int): Minimum price for items.
                 price_max (int): Maximum price for items.
                 price_max_above (int): Maximum price above the market value.
+                concurrent (bool): Whether to fetch the remaining pages concurrently.
+                max_workers (int): Maximum number of pages fetched at once in concurrent mode.
+                columnar (bool): Whether to return a MarketSnapshot instead of a list. Requires numpy.
+                compact (bool): Whether to return items as slotted Item models instead of dicts.
             Returns:
-                A list of items matching the specified filters.
+                A list of items matching the specified filters, or a MarketSnapshot of them.
+
+        iter_items(..., by_page: bool = False) -> generator:
+            Lazily iterate over listed items, taking the same filters as get_items.
+            Parameters:
+                by_page (bool): Whether to yield whole pages instead of single items.
+            Returns:
+                A generator yielding items, or lists of items, as each page arrives.
     """
-    def __init__(self, api_key, api_base_url, *args, **kwargs):
+    def __init__(self, api_key, api_base_url, *args, transport=None, **kwargs):
         """
         Initializes a new instance of the Withdrawals class.
 
         Parameters:
         - api_key (str): The API key used for authentication.
         - api_base_url (str): The base URL for API requests.
+        - transport (Transport): A shared transport to send requests with. A new one is created if not provided.
         - *args: Variable-length argument list.
         - **kwargs: Arbitrary keyword arguments.
 
@@ -56,7 +68,7 @@ class Withdrawals(dict):
         self.__dict__ = self
         self.api_key = api_key
         self.api_base_url = api_base_url
-        self.headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+        self.transport = transport if transport is not None else Transport(api_key, api_base_url)
 
     def __getattr__(self, attr):
         return self[attr]
@@ -72,22 +84,70 @@ class Withdrawals(dict):
         Returns:
         - True if the bid is successful, otherwise raises an error.
         """
-        url = f"{self.api_base_url}trading/deposit/{item_id}/bid"
         data = {"bid_value": amount}
-        response = requests.post(url, headers=self.headers, data=json.dumps(data))
+        self.transport.post(f"trading/deposit/{item_id}/bid", "Withdrawal", "bid", data=data, budget="bid")
+        return True
 
-        status = response.status_code
-        response = response.json()
+    @staticmethod
+    def build_params(per_page, search, order, sort, auction, price_min, price_max, price_max_above):
+        """
+        Build the query parameters shared by every page of a get_items request.
 
-        if status == 200:
-            return True
-        else:
-            handle_error(status, response, "Withdrawal", "bid")
+        Returns:
+        - dict: The query parameters, without the page number.
+        """
+        base_params = {
+            "per_page": per_page,
+            "order": order,
+            "sort": sort,
+            "auction": auction,
+            "price_min": price_min,
+            "price_max": price_max,
+            "price_max_above": price_max_above
+        }
 
-    def get_items(self, per_page: int = 2500, page: int = 1, search: str = "", order: str = "market_value", sort="desc", auction: str = "yes", price_min: int = 1, price_max: int = 100000, price_max_above: int = 15):
+        if search:
+            base_params["search"] = search
+        return base_params
+
+    def get_page(self, base_params, page):
+        """
+        Fetch a single page of listed items once the rate limit allows it.
+
+        Parameters:
+        - base_params (dict): The query parameters built by build_params.
+        - page (int): The page number to fetch.
+
+        Returns:
+        - dict: The decoded page, including its data and last_page.
+        """
+        budget = "search" if "search" in base_params else "items"
+        return self.transport.get("trading/items", "Withdrawal", "get_items", params={**base_params, "page": page}, budget=budget)
+
+    @staticmethod
+    def page_items(response, compact=False):
+        """
+        Returns the items of a decoded page, as Item models if compact is set.
+
+        Each page is converted as it arrives, so the decoded dicts of only one page are held at a time
+        rather than those of the whole listing.
+
+        Parameters:
+        - response (dict): The decoded page.
+        - compact (bool): Whether to convert the items into Item models. Defaults to False.
+
+        Returns:
+        - list: The page's items.
+        """
+        return list(map(Item, response['data'])) if compact else response['data']
+
+    def get_items(self, per_page: int = 2500, page: int = 1, search: str = "", order: str = "market_value", sort="desc", auction: str = "yes", price_min: int = 1, price_max: int = 100000, price_max_above: int = 15, concurrent: bool = False, max_workers: int = 4, columnar: bool = False, compact: bool = False):
         """
         Get a list of listed items with the specified filters.
 
+        The first page reports how many pages there are. In concurrent mode the remaining pages are then
+        requested in parallel, each one waiting on the rate limit, and merged back in page order.
+
         Parameters:
         - per_page (int): Number of items per page.
         - page (int): The page number to fetch.
@@ -98,51 +158,63 @@ class Withdrawals(dict):
         - price_min (int): Minimum price for items.
         - price_max (int): Maximum price for items.
         - price_max_above (int): Maximum price above the market value.
+        - concurrent (bool): Whether to fetch the remaining pages concurrently. Defaults to False.
+        - max_workers (int): Maximum number of pages fetched at once in concurrent mode. Defaults to 4.
+        - columnar (bool): Whether to return the items as a MarketSnapshot of NumPy columns, which requires numpy. Defaults to False.
+        - compact (bool): Whether to return the items as slotted Item models, which hold a large listing in less memory than dicts at the cost of converting every page. Defaults to False.
 
         Returns:
-        - A list of items matching the specified filters.
+        - A list of items matching the specified filters, or a MarketSnapshot of them if columnar is set.
         """
-        items = []
-        base_params = {
-            "per_page": per_page,
-            "order": order,
-            "sort": sort,
-            "auction": auction,
-            "price_min": price_min,
-            "price_max": price_max,
-            "price_max_above": price_max_above
-        }
-
-        if search:
-            base_params["search"] = search
+        base_params = self.build_params(per_page, search, order, sort, auction, price_min, price_max, price_max_above)
 
-        response = requests.get(f"{self.api_base_url}trading/items", headers=self.headers, params={**base_params, "page": page})
-        status = response.status_code
+        response = self.get_page(base_params, page)
+        items = self.page_items(response, compact)
+        pages = range(page + 1, response['last_page'] + 1)
 
-        if status == 200:
-            response = response.json()
-            items.extend(response['data'])
-            total_pages = response['last_page']
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for response in executor.map(lambda i: self.get_page(base_params, i), pages):
+                    items.extend(self.page_items(response, compact))
         else:
-            response = response.json()
-            handle_error(status, response, "Withdrawal", "get_items")
+            for i in pages:
+                items.extend(self.page_items(self.get_page(base_params, i), compact))
 
-        for i in range(page + 1, total_pages + 1):
-            ratelimit_delay = 3.1 if search else 3.4
+        if columnar:
+            from .columnar import MarketSnapshot
+            return MarketSnapshot.from_items(items)
+        return items
 
-            start = int(time())
-            response = requests.get(f"{self.api_base_url}trading/items", headers=self.headers, params={**base_params, "page": i})
-            status = response.status_code
+    def iter_items(self, per_page: int = 2500, page: int = 1, search: str = "", order: str = "market_value", sort="desc", auction: str = "yes", price_min: int = 1, price_max: int = 100000, price_max_above: int = 15, by_page: bool = False):
+        """
+        Lazily iterate over listed items with the specified filters.
 
-            if status == 200:
-                response = response.json()
-                items.extend(response['data'])
-            else:
-                response = response.json()
-                handle_error(status, response, "Withdrawal", "bid")
+        Pages are only requested as the previous one is consumed, so the first item is available after a
+        single round-trip and only one page is held in memory at a time.
 
-            delta = int(time()) - start
-            if delta < ratelimit_delay:
-                sleep(ratelimit_delay - delta)
+        Parameters:
+        - per_page (int): Number of items per page.
+        - page (int): The page number to start from.
+        - search (str): A search string to filter items by.
+        - order (str): The ordering criteria for items.
+        - sort (str): The sorting order (asc or desc).
+        - auction (str): Whether or not to include auction items.
+        - price_min (int): Minimum price for items.
+        - price_max (int): Maximum price for items.
+        - price_max_above (int): Maximum price above the market value.
+        - by_page (bool): Whether to yield whole pages instead of single items. Defaults to False.
 
-        return items
+        Yields:
+        - dict | list: Each item, or each page of items if by_page is set.
+        """
+        base_params = self.build_params(per_page, search, order, sort, auction, price_min, price_max, price_max_above)
+
+        last_page = page
+        while page <= last_page:
+            response = self.get_page(base_params, page)
+            last_page = response['last_page']
+            if by_page:
+                yield response['data']
+            else:
+                yield from response['data']
+            page += 1